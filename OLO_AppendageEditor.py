@@ -1,14 +1,217 @@
 import json
-import copy
-import math
-import torch
 import numpy as np
-from .util import scale
+from .pose_view import is_frame_sequence
+from .pose_tracking import person_track_id
+
+# Keypoint fields edited for the hands; the wrist (point 0) is the pivot
+HAND_FIELDS = {"left_hand": "hand_left_keypoints_2d", "right_hand": "hand_right_keypoints_2d"}
+
+
+def _gather_field(frames, field, person_indices=None):
+    """
+    Collect one keypoint field of the selected people of every frame into a padded array.
+
+    Args:
+        frames: list of POSE_KEYPOINT frame dicts
+        field: keypoint field name, e.g. "pose_keypoints_2d"
+        person_indices: people to collect, None for everyone
+
+    Returns:
+        targets: (M, 2) array of (frame index, person index)
+        points: (M, K, 3) keypoints, zero padded
+        lengths: (M,) number of complete keypoints each target has
+        lists: the original keypoint lists, one per target
+        track_ids: (M,) tracked person "id" of each target, -1 when the person has none
+    """
+    targets, lists, track_ids = [], [], []
+    for i, frame in enumerate(frames):
+        people = frame.get('people') if isinstance(frame, dict) else None
+        if not people:
+            continue
+        candidates = range(len(people)) if person_indices is None else [p for p in person_indices if p < len(people)]
+        for p in candidates:
+            person = people[p]
+            values = person.get(field) if isinstance(person, dict) else None
+            if values:
+                targets.append((i, p))
+                lists.append(values)
+                track_id = person_track_id(person)
+                track_ids.append(-1 if track_id is None else track_id)
+
+    lengths = np.array([len(values) // 3 for values in lists], dtype=np.int64)
+    points = np.zeros((len(lists), int(lengths.max()) if len(lists) else 0, 3), dtype=np.float64)
+    if lengths.sum():
+        flat = [value for values, n in zip(lists, lengths.tolist()) for value in values[:n * 3]]
+        rows = np.repeat(np.arange(len(lists)), lengths)
+        cols = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        points[rows, cols] = np.array(flat, dtype=np.float64).reshape(-1, 3)
+    return np.array(targets, dtype=np.int64).reshape(-1, 2), points, lengths, lists, np.array(track_ids, dtype=np.int64)
+
+
+def transform_appendage(points, lengths, point_indices, pivot_index, params, bidirectional_scale, active):
+    """
+    Rotate, scale and offset one appendage of every target in a single array pass.
+
+    The pivot is the pivot keypoint when it is present and confident, otherwise the mean of the
+    valid appendage keypoints. Keypoints with confidence <= 0 are never moved.
+
+    Args:
+        points: (M, K, 3) keypoints, updated in place
+        lengths: (M,) number of keypoints each target actually has
+        point_indices: keypoint indices that belong to the appendage
+        pivot_index: preferred pivot keypoint index, or None
+        params: (M, 4) per-target scale, x_offset, y_offset and rotation (degrees)
+        bidirectional_scale: if false the pivot keypoint itself is not scaled
+        active: (M,) targets this edit applies to
+
+    Returns:
+        (M, K) mask of the keypoints that were transformed
+    """
+    M, K = points.shape[:2]
+    moved = np.zeros((M, K), dtype=bool)
+    point_indices = np.array([k for k in point_indices if k < K], dtype=np.int64)
+    if not M or not len(point_indices):
+        return moved
+
+    valid = (np.arange(K) < lengths[:, None]) & (points[..., 2] > 0)
+    selected = valid[:, point_indices]
+    xy = points[:, point_indices, :2]
+
+    count = selected.sum(axis=1)
+    pivot = (xy * selected[..., None]).sum(axis=1) / np.maximum(count, 1)[:, None]
+    has_pivot = count > 0
+    if pivot_index is not None and pivot_index < K:
+        pivot = np.where(valid[:, pivot_index, None], points[:, pivot_index, :2], pivot)
+        has_pivot |= valid[:, pivot_index]
+    # Identity parameters leave the target untouched, so it is not copied on write back
+    identity = (params == (1.0, 0.0, 0.0, 0.0)).all(axis=1)
+    selected &= (active & has_pivot & ~identity)[:, None]
+
+    scale, x_offset, y_offset, rotation = (column[:, None] for column in params.T)
+    pivot = pivot[:, None]
+    rel = xy - pivot
+    rad = np.radians(rotation)
+    cos_r, sin_r = np.cos(rad), np.sin(rad)
+    rotated = np.stack([rel[..., 0] * cos_r - rel[..., 1] * sin_r,
+                        rel[..., 0] * sin_r + rel[..., 1] * cos_r], axis=-1) + pivot
+    xy = np.where((rotation != 0.0)[..., None], rotated, xy)
+
+    scaling = scale != 1.0
+    if not bidirectional_scale:
+        # Unidirectional scaling - only scale away from body, the pivot keypoint stays put
+        scaling = scaling & (point_indices != pivot_index)
+    xy = np.where(scaling[..., None], (xy - pivot) * scale[..., None] + pivot, xy)
+    xy = xy + np.stack([x_offset, y_offset], axis=-1)
+
+    points[:, point_indices, :2] = np.where(selected[..., None], xy, points[:, point_indices, :2])
+    moved[:, point_indices] = selected
+    return moved
+
+
+# Per-frame parameters of an edit, in the column order of transform_appendage's params
+PARAMETER_KEYS = ("scale", "x_offset", "y_offset", "rotation")
+
+KEYFRAME_INTERPOLATIONS = ["linear", "smoothstep", "cubic"]
+
+
+def evaluate_keyframes(keyframes, length, interpolation="linear"):
+    """
+    Evaluate a keyframe curve for every output frame in one vectorized pass.
+
+    Frames before the first keyframe hold its value, frames after the last keyframe hold the last value.
+    "cubic" is a Catmull-Rom style Hermite spline through the keyframes (one-sided tangents at the ends).
+
+    Args:
+        keyframes: sequence of (frame, value) pairs, in any order; the last value wins for duplicate frames
+        length: number of output frames
+        interpolation: "linear", "smoothstep" or "cubic"
+
+    Returns:
+        (length,) float array
+    """
+    if interpolation not in KEYFRAME_INTERPOLATIONS:
+        raise ValueError(f"Unknown keyframe interpolation: {interpolation}")
+    keys = np.asarray(keyframes, dtype=np.float64).reshape(-1, 2)
+    if not len(keys):
+        raise ValueError("Keyframe curve needs at least one (frame, value) pair")
+
+    # Sort by frame; for duplicate frames the last given value wins
+    order = np.argsort(keys[:, 0], kind="stable")
+    keys = keys[order]
+    last = np.append(keys[1:, 0] != keys[:-1, 0], True)
+    frames, values = keys[last, 0], keys[last, 1]
+    if len(frames) == 1:
+        return np.full(length, values[0])
+
+    x = np.arange(length, dtype=np.float64)
+    seg = np.clip(np.searchsorted(frames, x, side="right") - 1, 0, len(frames) - 2)
+    f0, f1 = frames[seg], frames[seg + 1]
+    v0, v1 = values[seg], values[seg + 1]
+    t = np.clip((x - f0) / (f1 - f0), 0.0, 1.0)
+
+    if interpolation == "smoothstep":
+        t = t * t * (3.0 - 2.0 * t)
+    if interpolation != "cubic":
+        return v0 + (v1 - v0) * t
+
+    tangents = np.gradient(values, frames)
+    span = f1 - f0
+    t2, t3 = t * t, t * t * t
+    return ((2 * t3 - 3 * t2 + 1) * v0 + (t3 - 2 * t2 + t) * span * tangents[seg]
+            + (-2 * t3 + 3 * t2) * v1 + (t3 - t2) * span * tangents[seg + 1])
+
+
+def _write_back(frames, field, targets, lists, points, lengths, moved, copied):
+    """
+    Store the transformed keypoints copy-on-write: only the frames, people lists and person dicts
+    that actually change are copied, everything else stays shared with the input.
+    """
+    copied_frames, copied_people = copied
+    rows = np.nonzero(moved.any(axis=1))[0]
+    xs = points[rows, :, 0].tolist()
+    ys = points[rows, :, 1].tolist()
+    for m, i, p, x, y in zip(rows.tolist(), *targets[rows].T.tolist(), xs, ys):
+        if i not in copied_frames:
+            frame = dict(frames[i])
+            frame['people'] = list(frame['people'])
+            frames[i] = frame
+            copied_frames.add(i)
+        people = frames[i]['people']
+        if (i, p) not in copied_people:
+            people[p] = dict(people[p])
+            copied_people.add((i, p))
+
+        values = list(lists[m])
+        n = int(lengths[m])
+        values[0:n * 3:3] = x[:n]
+        values[1:n * 3:3] = y[:n]
+        people[p][field] = values
+
 
 class OLO_AppendageEditor:
     # 节点元数据
     NODE_NAME = "OLO_AppendageEditor"
     NODE_CATEGORY = "OLO/pose"
+
+    APPENDAGE_TYPES = [
+        "left_upper_arm", "left_forearm", "left_full_arm",
+        "right_upper_arm", "right_forearm", "right_full_arm",
+        "left_upper_leg", "left_lower_leg", "left_full_leg",
+        "right_upper_leg", "right_lower_leg", "right_full_leg",
+        "left_hand", "right_hand", "left_foot", "right_foot",
+        "torso", "shoulders"
+    ]
+
+    # Fields an edit in the edit program may set, with their defaults
+    EDIT_DEFAULTS = {
+        "scale": 1.0,
+        "x_offset": 0.0,
+        "y_offset": 0.0,
+        "rotation": 0.0,
+        "bidirectional_scale": False,
+        "person_index": -1,
+        "person_id": -1,
+    }
     
     @staticmethod
     def normalize_scale_parameter(scale_param, target_length, behavior):
@@ -23,11 +226,10 @@ class OLO_AppendageEditor:
         Returns:
             List of floats with length determined by behavior
         """
-        # Convert single value to list
+        # A single value applies to every frame
         if not isinstance(scale_param, (list, tuple)):
-            scale_list = [scale_param]
-        else:
-            scale_list = list(scale_param)
+            return [scale_param] * target_length
+        scale_list = list(scale_param)
 
         if len(scale_list) == target_length:
             return scale_list
@@ -76,14 +278,7 @@ class OLO_AppendageEditor:
         return {
             "required": {
                 "POSE_KEYPOINT": ("POSE_KEYPOINT",),
-                "appendage_type": ([
-                    "left_upper_arm", "left_forearm", "left_full_arm",
-                    "right_upper_arm", "right_forearm", "right_full_arm",
-                    "left_upper_leg", "left_lower_leg", "left_full_leg",
-                    "right_upper_leg", "right_lower_leg", "right_full_leg",
-                    "left_hand", "right_hand", "left_foot", "right_foot",
-                    "torso", "shoulders"
-                ], {
+                "appendage_type": (s.APPENDAGE_TYPES, {
                     "default": "left_upper_arm"
                 }),
             },
@@ -122,7 +317,34 @@ class OLO_AppendageEditor:
                     "max": 100,
                     "tooltip": "Person to edit (-1 for all people)"
                 }),
+                "person_id": ("INT", {
+                    "default": -1,
+                    "min": -1,
+                    "max": 100000,
+                    "tooltip": "Tracked person ID to edit (the \"id\" assigned by OLO_PoseTracker). Overrides person_index; -1 uses person_index."
+                }),
                 "list_mismatch_behavior": (["truncate", "loop", "repeat"], {"default": "loop", "tooltip": "Truncate: Truncate the list to the shortest length. Loop: Loop the list to the longest length. Repeat: Repeat the list to the longest length."}),
+
+                "appendage_edits": ("STRING", {
+                    "multiline": True,
+                    "default": "",
+                    "tooltip": "Optional JSON list of extra edits applied after the edit above in the same pass, e.g. "
+                               "[{\"type\": \"left_forearm\", \"scale\": 1.2}, {\"type\": \"right_forearm\", \"rotation\": -15, \"person_index\": 0}]. "
+                               "Each edit accepts type, scale, x_offset, y_offset, rotation, bidirectional_scale, person_index and person_id; "
+                               "scale/offset/rotation may be per-frame lists or keyframe curves "
+                               "({\"keyframes\": [[0, 1.0], [199, 1.5]], \"interpolation\": \"smoothstep\"})."
+                }),
+                "keyframes": ("STRING", {
+                    "multiline": True,
+                    "default": "",
+                    "tooltip": "Optional JSON keyframe curves for the edit above, overriding the widget values, e.g. "
+                               "{\"rotation\": [[0, 0], [199, -90]], \"scale\": [[0, 1.0], [100, 1.3]]}. "
+                               "Frames before the first / after the last keyframe hold its value."
+                }),
+                "keyframe_interpolation": (KEYFRAME_INTERPOLATIONS, {
+                    "default": "linear",
+                    "tooltip": "Interpolation between keyframes: linear, smoothstep (ease in/out per segment) or cubic (smooth spline through all keyframes)."
+                }),
             },
         }
 
@@ -131,134 +353,160 @@ class OLO_AppendageEditor:
     FUNCTION = "edit_appendage"
     CATEGORY = "OLO/pose"
 
-    def edit_appendage(self, POSE_KEYPOINT, appendage_type, scale=1.0, x_offset=0.0, y_offset=0.0, rotation=0.0, bidirectional_scale=False, person_index=-1, list_mismatch_behavior="loop"):
-        if POSE_KEYPOINT is None:
-            return (None,)
-
-        # Deep copy to avoid modifying the original
-        pose_data = copy.deepcopy(POSE_KEYPOINT)
-        if not isinstance(pose_data, list):
-            pose_data = [pose_data]
-
-        pose_count = len(pose_data)
-
-        # Normalize scale parameters to handle lists vs single floats using the original node's methods
-        scale_params = [scale, x_offset, y_offset, rotation]
-        output_length = self.determine_output_length(scale_params, pose_count, list_mismatch_behavior)
-
-        scale_list = self.normalize_scale_parameter(scale, output_length, list_mismatch_behavior)
-        x_offset_list = self.normalize_scale_parameter(x_offset, output_length, list_mismatch_behavior)
-        y_offset_list = self.normalize_scale_parameter(y_offset, output_length, list_mismatch_behavior)
-        rotation_list = self.normalize_scale_parameter(rotation, output_length, list_mismatch_behavior)
-
-        # Process each frame with its corresponding parameter values
-        output_pose_data = []
+    @staticmethod
+    def output_frame_indices(output_length, pose_count, behavior):
+        """Map every output index to the input frame it is built from."""
+        indices = np.arange(output_length)
+        if pose_count == 0:
+            return indices[:0]
+        if behavior == "loop":
+            return indices % pose_count
+        return np.minimum(indices, pose_count - 1)
 
-        for i in range(output_length):
-            # Get the pose data for this index
-            pose_idx = i if i < pose_count else pose_count - 1
-            if list_mismatch_behavior == "loop" and pose_count > 0:
-                pose_idx = i % pose_count
+    @classmethod
+    def parse_edit_program(cls, appendage_edits):
+        """
+        Parse the appendage_edits input into a list of edit dicts.
 
-            # Get current frame and parameter values
-            current_frame = copy.deepcopy(pose_data[pose_idx])
-            current_scale = scale_list[i]
-            current_x_offset = x_offset_list[i]
-            current_y_offset = y_offset_list[i]
-            current_rotation = rotation_list[i]
+        Accepts a JSON string, a single edit dict or a list of edit dicts. Missing fields take
+        the values in EDIT_DEFAULTS; the appendage may be given as "type" or "appendage_type".
+        """
+        if appendage_edits is None:
+            return []
+        if isinstance(appendage_edits, str):
+            if not appendage_edits.strip():
+                return []
+            try:
+                appendage_edits = json.loads(appendage_edits)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"appendage_edits is not valid JSON: {e}")
+        if isinstance(appendage_edits, dict):
+            appendage_edits = [appendage_edits]
+        if not isinstance(appendage_edits, (list, tuple)):
+            raise ValueError("appendage_edits must be a list of edits")
+
+        edits = []
+        for i, entry in enumerate(appendage_edits):
+            if not isinstance(entry, dict):
+                raise ValueError(f"appendage_edits[{i}] must be an object")
+            appendage_type = entry.get("type", entry.get("appendage_type"))
+            if appendage_type not in cls.APPENDAGE_TYPES:
+                raise ValueError(f"appendage_edits[{i}]: unknown appendage type {appendage_type!r}")
+            unknown = set(entry) - set(cls.EDIT_DEFAULTS) - {"type", "appendage_type"}
+            if unknown:
+                raise ValueError(f"appendage_edits[{i}]: unknown fields {sorted(unknown)}")
+            edit = dict(cls.EDIT_DEFAULTS)
+            edit.update((key, entry[key]) for key in cls.EDIT_DEFAULTS if key in entry)
+            edit["appendage_type"] = appendage_type
+            edits.append(edit)
+        return edits
 
-            # Apply transformations to this frame
-            if 'people' in current_frame:
-                people_to_edit = range(len(current_frame['people'])) if person_index == -1 else [person_index]
+    @staticmethod
+    def parse_keyframes(keyframes, interpolation="linear"):
+        """
+        Parse the keyframes input into {parameter: {"keyframes": [...], "interpolation": ...}}.
+        """
+        if keyframes is None or (isinstance(keyframes, str) and not keyframes.strip()):
+            return {}
+        if isinstance(keyframes, str):
+            try:
+                keyframes = json.loads(keyframes)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"keyframes is not valid JSON: {e}")
+        if not isinstance(keyframes, dict):
+            raise ValueError("keyframes must map parameter names to [frame, value] pairs")
+
+        curves = {}
+        for key, curve in keyframes.items():
+            if key not in PARAMETER_KEYS:
+                raise ValueError(f"keyframes: unknown parameter {key!r}")
+            curves[key] = curve if isinstance(curve, dict) else {"keyframes": curve, "interpolation": interpolation}
+        return curves
+
+    def resolve_parameter(self, param, output_length, behavior):
+        """Expand a parameter (single value, per-frame list or keyframe curve) to one value per output frame."""
+        if isinstance(param, dict):
+            if "keyframes" not in param:
+                raise ValueError("Keyframe curve must have a \"keyframes\" list")
+            return evaluate_keyframes(param["keyframes"], output_length, param.get("interpolation", "linear"))
+        return np.array(self.normalize_scale_parameter(param, output_length, behavior), dtype=np.float64)
+
+    def edit_appendage(self, POSE_KEYPOINT, appendage_type, scale=1.0, x_offset=0.0, y_offset=0.0, rotation=0.0, bidirectional_scale=False, person_index=-1, list_mismatch_behavior="loop", appendage_edits="", keyframes="", keyframe_interpolation="linear", person_id=-1):
+        if POSE_KEYPOINT is None:
+            return (None,)
 
-                for person_idx in people_to_edit:
-                    if person_idx >= len(current_frame['people']):
-                        continue
+        pose_data = POSE_KEYPOINT if is_frame_sequence(POSE_KEYPOINT) else [POSE_KEYPOINT]
+        pose_count = len(pose_data)
 
-                    person = current_frame['people'][person_idx]
+        # The widget edit comes first, then the edit program; all of them share one copy of the frames
+        edits = [dict(appendage_type=appendage_type, scale=scale, x_offset=x_offset, y_offset=y_offset, rotation=rotation,
+                      bidirectional_scale=bidirectional_scale, person_index=person_index, person_id=person_id)]
+        edits[0].update(self.parse_keyframes(keyframes, keyframe_interpolation))
+        edits += self.parse_edit_program(appendage_edits)
 
-                    if appendage_type in ["left_hand", "right_hand"]:
-                        self._edit_hand_appendage(person, appendage_type, current_scale, current_x_offset, current_y_offset, current_rotation, bidirectional_scale)
-                    else:
-                        self._edit_body_appendage(person, appendage_type, current_scale, current_x_offset, current_y_offset, current_rotation, bidirectional_scale)
+        # Normalize scale parameters to handle lists vs single floats using the original node's methods;
+        # keyframe curves do not set the output length, they are evaluated over it
+        scale_params = [edit[key] for edit in edits for key in PARAMETER_KEYS]
+        output_length = self.determine_output_length(scale_params, pose_count, list_mismatch_behavior)
 
-            output_pose_data.append(current_frame)
+        # Output frames share the input frames; only edited frames are copied when written back
+        frame_indices = self.output_frame_indices(output_length, pose_count, list_mismatch_behavior)
+        output_pose_data = [pose_data[idx] for idx in frame_indices.tolist()]
 
+        for edit in edits:
+            params = [self.resolve_parameter(edit[key], output_length, list_mismatch_behavior) for key in PARAMETER_KEYS]
+            edit["params"] = np.stack(params, axis=1)[:len(output_pose_data)]
+        self._apply_edits(output_pose_data, edits)
         return (output_pose_data,)
 
-    def _edit_hand_appendage(self, person, appendage_type, scale_factor, x_offset, y_offset, rotation, bidirectional_scale):
-        """Edit hand appendages using hand keypoints."""
-        keypoint_field = "hand_left_keypoints_2d" if appendage_type == "left_hand" else "hand_right_keypoints_2d"
-
-        if keypoint_field not in person or not person[keypoint_field]:
-            return
-
-        keypoints = person[keypoint_field]
-
-        # Use wrist (first point) as pivot for hands
-        if len(keypoints) >= 3 and keypoints[2] > 0:
-            pivot = [keypoints[0], keypoints[1]]
-        else:
-            # Calculate center of mass if wrist not available
-            pivot = self._calculate_center_of_mass(keypoints)
-            if pivot is None:
-                return
-
-        # Apply transformations
-        new_keypoints = self._apply_transformations(keypoints, scale_factor, x_offset, y_offset, rotation, pivot, bidirectional_scale)
-        person[keypoint_field] = new_keypoints
+    def _appendage_keypoints(self, appendage_type):
+        """Return (keypoint field, appendage keypoint indices, pivot index) for an appendage type."""
+        if appendage_type in HAND_FIELDS:
+            return HAND_FIELDS[appendage_type], None, 0
+        appendage_indices, pivot_index = self._get_appendage_indices(appendage_type)
+        return "pose_keypoints_2d", appendage_indices, pivot_index
 
-    def _edit_body_appendage(self, person, appendage_type, scale_factor, x_offset, y_offset, rotation, bidirectional_scale):
-        """Edit body appendages (arms, legs, feet) using body pose keypoints."""
-        if 'pose_keypoints_2d' not in person or not person['pose_keypoints_2d']:
-            return
+    def _apply_edits(self, frames, edits):
+        """
+        Apply appendage edits to the output frames in place.
 
-        keypoints = person['pose_keypoints_2d']
+        Each keypoint field is gathered into one array for all frames and people, the edits
+        touching it are applied in order, and the result is written back once.
 
-        # Get keypoint indices for the specific appendage
-        appendage_indices, pivot_index = self._get_appendage_indices(appendage_type)
-        if not appendage_indices:
-            return
-
-        # Calculate pivot point for the appendage
-        pivot = self._calculate_appendage_pivot(keypoints, appendage_indices, pivot_index)
-        if pivot is None:
-            return
-
-        # Apply transformations only to the appendage keypoints
-        new_keypoints = keypoints[:]
-
-        for i in range(0, len(keypoints), 3):
-            keypoint_idx = i // 3
-            if keypoint_idx in appendage_indices and len(keypoints) > i+2:
-                x, y, conf = keypoints[i], keypoints[i+1], keypoints[i+2]
-
-                if conf > 0:
-                    # Apply rotation
-                    if rotation != 0.0:
-                        rad = math.radians(rotation)
-                        cos_r, sin_r = math.cos(rad), math.sin(rad)
-                        rel_x, rel_y = x - pivot[0], y - pivot[1]
-                        x = rel_x * cos_r - rel_y * sin_r + pivot[0]
-                        y = rel_x * sin_r + rel_y * cos_r + pivot[1]
-
-                    # Apply scaling with directional control
-                    if scale_factor != 1.0:
-                        if bidirectional_scale:
-                            scaled_point = scale([x, y], scale_factor, pivot)
-                            x, y = scaled_point[0], scaled_point[1]
-                        else:
-                            # Unidirectional scaling - only scale away from body
-                            x, y = self._apply_unidirectional_scale([x, y], scale_factor, pivot, keypoint_idx, pivot_index)
-
-                    # Apply offset
-                    x += x_offset
-                    y += y_offset
-
-                new_keypoints[i] = x
-                new_keypoints[i+1] = y
-
-        person['pose_keypoints_2d'] = new_keypoints
+        Args:
+            frames: output frame list, its entries are replaced by copies when edited
+            edits: list of dicts with appendage_type, params ((frames, 4) scale / x_offset /
+                y_offset / rotation), bidirectional_scale, person_index (-1 for everyone) and person_id
+                (tracked "id" to edit, overrides person_index; -1 to ignore)
+        """
+        by_field = {}
+        for edit in edits:
+            field, appendage_indices, pivot_index = self._appendage_keypoints(edit["appendage_type"])
+            if appendage_indices is not None and not appendage_indices:
+                continue
+            by_field.setdefault(field, []).append((edit, appendage_indices, pivot_index))
+
+        copied = (set(), set())
+        for field, field_edits in by_field.items():
+            person_indices = {edit["person_index"] if edit.get("person_id", -1) == -1 else -1 for edit, _, _ in field_edits}
+            person_indices = None if -1 in person_indices else sorted(person_indices)
+            targets, points, lengths, lists, track_ids = _gather_field(frames, field, person_indices)
+            if not len(targets):
+                continue
+
+            moved = np.zeros(points.shape[:2], dtype=bool)
+            for edit, appendage_indices, pivot_index in field_edits:
+                if appendage_indices is None:
+                    appendage_indices = range(points.shape[1])
+                if edit.get("person_id", -1) != -1:
+                    active = track_ids == edit["person_id"]
+                elif edit["person_index"] != -1:
+                    active = targets[:, 1] == edit["person_index"]
+                else:
+                    active = np.ones(len(targets), dtype=bool)
+                moved |= transform_appendage(points, lengths, appendage_indices, pivot_index,
+                                             edit["params"][targets[:, 0]], edit["bidirectional_scale"], active)
+            _write_back(frames, field, targets, lists, points, lengths, moved, copied)
 
     def _get_appendage_indices(self, appendage_type):
         """Get OpenPose keypoint indices for specific appendages and their pivot points."""
@@ -294,96 +542,3 @@ class OLO_AppendageEditor:
 
         result = appendage_map.get(appendage_type, ([], None))
         return result[0], result[1]
-
-    def _calculate_appendage_pivot(self, keypoints, appendage_indices, pivot_index):
-        """Calculate pivot point for body appendage using specified pivot index."""
-        if pivot_index is not None:
-            # Use specific pivot point (e.g., shoulder for upper arm, elbow for forearm)
-            i = pivot_index * 3
-            if len(keypoints) > i+2 and keypoints[i+2] > 0:
-                return [keypoints[i], keypoints[i+1]]
-
-        # Fallback to center of mass if pivot point not available
-        valid_points = []
-        for idx in appendage_indices:
-            i = idx * 3
-            if len(keypoints) > i+2 and keypoints[i+2] > 0:
-                valid_points.append([keypoints[i], keypoints[i+1]])
-
-        if not valid_points:
-            return None
-
-        pivot_x = sum(p[0] for p in valid_points) / len(valid_points)
-        pivot_y = sum(p[1] for p in valid_points) / len(valid_points)
-        return [pivot_x, pivot_y]
-
-    def _apply_unidirectional_scale(self, point, scale_factor, pivot, keypoint_idx, pivot_index):
-        """Apply scaling only in the direction away from the body/pivot."""
-        x, y = point
-
-        if keypoint_idx == pivot_index:
-            # Don't scale the pivot point itself
-            return x, y
-
-        # Calculate direction vector from pivot to point
-        dx = x - pivot[0]
-        dy = y - pivot[1]
-
-        # Scale only the distance, keeping direction
-        distance = math.sqrt(dx*dx + dy*dy)
-        if distance > 0:
-            new_distance = distance * scale_factor
-            scale_ratio = new_distance / distance
-
-            new_x = pivot[0] + dx * scale_ratio
-            new_y = pivot[1] + dy * scale_ratio
-            return new_x, new_y
-
-        return x, y
-
-    def _calculate_center_of_mass(self, keypoints):
-        """Calculate center of mass from valid keypoints."""
-        valid_points = []
-        for i in range(0, len(keypoints), 3):
-            if len(keypoints) > i+2 and keypoints[i+2] > 0:
-                valid_points.append([keypoints[i], keypoints[i+1]])
-
-        if not valid_points:
-            return None
-
-        pivot_x = sum(p[0] for p in valid_points) / len(valid_points)
-        pivot_y = sum(p[1] for p in valid_points) / len(valid_points)
-        return [pivot_x, pivot_y]
-
-    def _apply_transformations(self, keypoints, scale_factor, x_offset, y_offset, rotation, pivot, bidirectional_scale):
-        """Apply transformations to all keypoints."""
-        new_keypoints = []
-        for i in range(0, len(keypoints), 3):
-            if len(keypoints) > i+2:
-                x, y, conf = keypoints[i], keypoints[i+1], keypoints[i+2]
-
-                if conf > 0:
-                    # Apply rotation
-                    if rotation != 0.0:
-                        rad = math.radians(rotation)
-                        cos_r, sin_r = math.cos(rad), math.sin(rad)
-                        rel_x, rel_y = x - pivot[0], y - pivot[1]
-                        x = rel_x * cos_r - rel_y * sin_r + pivot[0]
-                        y = rel_x * sin_r + rel_y * cos_r + pivot[1]
-
-                    # Apply scaling
-                    if scale_factor != 1.0:
-                        if bidirectional_scale:
-                            scaled_point = scale([x, y], scale_factor, pivot)
-                            x, y = scaled_point[0], scaled_point[1]
-                        else:
-                            # For hands, use unidirectional scaling from wrist
-                            x, y = self._apply_unidirectional_scale([x, y], scale_factor, pivot, i//3, 0)
-
-                    # Apply offset
-                    x += x_offset
-                    y += y_offset
-
-                new_keypoints.extend([x, y, conf])
-
-        return new_keypoints
\ No newline at end of file
@@ -2,7 +2,15 @@ import math
 import numpy as np
 import torch
 import cv2
-import matplotlib.colors
+from .keypoint_schema import KEYPOINT_SCHEMAS, BODY18, WHOLEBODY134
+from .render_quality import RENDER_QUALITY_MODES, RENDER_QUALITY_TOOLTIP, get_render_quality
+from .util import images_to_tensor
+from .render_cache import ByteLRUCache, pack_layer, unpack_layer
+from .pose_composite import resize_images, pose_mask, composite_pose, coverage_composite
+from .pose_view import is_frame_sequence
+from .pose_tracking import person_track_id
+from .pose_sequence import PoseSequence
+from .pose_io import track_id_array
 
 def _to_array_3(flat, n):
     """将扁平列表转换为3列数组
@@ -14,7 +22,7 @@ def _to_array_3(flat, n):
     Returns:
         np.array: 转换后的数组
     """
-    arr = np.array(flat, dtype=np.float32).reshape(n, 3)
+    arr = np.array(flat[:n * 3], dtype=np.float32).reshape(n, 3)
     return arr
 
 def _safe_array_3(flat, n):
@@ -31,37 +39,128 @@ def _safe_array_3(flat, n):
         return np.zeros((n, 3), dtype=np.float32)
     return _to_array_3(flat, n)
 
-def _denorm_xy(arr, w, h):
-    """将归一化的坐标反归一化到实际图像尺寸
+def _denorm_parts(arr, part_starts, w, h):
+    """按部位将归一化的坐标反归一化到实际图像尺寸
+
+    每个部位单独判断：部位内坐标最大值不超过 1.0 时视为归一化坐标。所有部位一次完成，不再逐段调用。
 
     Args:
         arr: 包含坐标的数组
+        part_starts: 各部位的起始下标
         w: 图像宽度
         h: 图像高度
 
     Returns:
         np.array: 反归一化后的数组
     """
-    if arr[:, :2].max() <= 1.0:
-        arr[:, 0] *= w
-        arr[:, 1] *= h
+    part_max = np.maximum.reduceat(arr[:, :2].max(axis=1), part_starts)
+    part_sizes = np.diff(np.append(part_starts, len(arr)))
+    normalized = np.repeat(part_max <= 1.0, part_sizes)
+    arr[normalized, 0] *= w
+    arr[normalized, 1] *= h
     return arr
 
-def _in_bounds(x, y, W, H):
-    """检查坐标是否在图像边界内
+def _draw_limbs(canvas, xy, valid, edges, colors, stickwidth, quality):
+    """批量计算所有有效肢体的椭圆参数后逐个填充，长度不足 1 像素的肢体跳过"""
+    edge_ids = np.nonzero(valid[edges].all(axis=1))[0]
+    if not len(edge_ids):
+        return
+    ends = xy[edges[edge_ids]]  # (肢体数, 2, 2)
+    Y, X = ends[:, :, 0], ends[:, :, 1]
+    mX, mY = (X[:, 0] + X[:, 1]) / 2, (Y[:, 0] + Y[:, 1]) / 2
+    dX, dY = X[:, 0] - X[:, 1], Y[:, 0] - Y[:, 1]
+    length = (dX ** 2 + dY ** 2) ** 0.5
+    angle = np.degrees(np.arctan2(dX.astype(np.float64), dY.astype(np.float64)))
+    keep = length >= 1.0
+    stickwidth = int(quality.fixed(int(stickwidth)))
+    for i, cx, cy, half_length, a in zip(edge_ids[keep].tolist(), quality.fixed(mY[keep]).tolist(), quality.fixed(mX[keep]).tolist(),
+                                         quality.fixed(length[keep] / 2).tolist(), angle[keep].astype(int).tolist()):
+        polygon = cv2.ellipse2Poly((cx, cy), (half_length, stickwidth), a, 0, 360, 1)
+        cv2.fillConvexPoly(canvas, polygon, colors[i % len(colors)], lineType=quality.line_type, shift=quality.shift)
+
+def _in_bounds_mask(points, W, H, drop_origin):
+    """批量检查坐标是否在图像边界内，drop_origin 为 True 时还要求坐标大于 0.01"""
+    x, y = points[:, 0], points[:, 1]
+    mask = (0 <= x) & (x < W) & (0 <= y) & (y < H)
+    if drop_origin:
+        mask &= (x > 0.01) & (y > 0.01)
+    return mask
+
+def _draw_lines(canvas, xy, points, valid, edges, colors, thickness, max_length, quality):
+    """绘制两端都有效、都在画布内且长度不超过 max_length 的连线，判断使用整数坐标，绘制按质量模式使用亚像素坐标"""
+    H, W = canvas.shape[:2]
+    ends = points[edges]  # (连线数, 2, 2)
+    length = np.sqrt(((ends[:, 1] - ends[:, 0]) ** 2).sum(axis=1))
+    inside = _in_bounds_mask(points, W, H, True)
+    keep = valid[edges].all(axis=1) & (length <= max_length) & inside[edges].all(axis=1)
+    draw_ends = quality.fixed(xy)[edges]
+    for ie in np.nonzero(keep)[0].tolist():
+        (x1, y1), (x2, y2) = draw_ends[ie].tolist()
+        cv2.line(canvas, (x1, y1), (x2, y2), colors[ie], thickness=thickness, lineType=quality.line_type, shift=quality.shift)
+
+def _draw_points(canvas, xy, points, valid, colors, radius, drop_origin, quality):
+    H, W = canvas.shape[:2]
+    keep = valid & _in_bounds_mask(points, W, H, drop_origin)
+    centers = quality.fixed(xy)
+    radius = int(quality.fixed(radius))
+    for i in np.nonzero(keep)[0].tolist():
+        cv2.circle(canvas, tuple(centers[i].tolist()), radius, colors[i % len(colors)], thickness=-1,
+                   lineType=quality.line_type, shift=quality.shift)
+
+# 直线颜色按 uint8 截断，与原先逐条计算 hsv_to_rgb 后 astype(np.uint8) 的结果一致
+_LINE_COLORS = {
+    part.name: [tuple(int(c) for c in np.array(color).astype(np.uint8)) for color in part.edge_colors]
+    for schema in KEYPOINT_SCHEMAS.values() for part in schema.parts if part.edge_style == "line"
+}
+
+def draw_schema_keypoints(canvas, schema, keypoints, valid, stickwidth, radius=None, line_thickness=2, max_line_length=None,
+                          quality=None):
+    """按关键点方案依次绘制各部位的连线和关键点
 
     Args:
-        x: x坐标
-        y: y坐标
-        W: 图像宽度
-        H: 图像高度
+        canvas: 画布图像
+        schema: KeypointSchema
+        keypoints: (schema.num_points, 2) 关键点坐标
+        valid: (schema.num_points,) 有效关键点掩码
+        stickwidth: 椭圆肢体的宽度
+        radius: 关键点半径，None 时使用各部位的默认半径
+        line_thickness: 直线连线的粗细
+        max_line_length: 直线连线的最大长度，超过时不绘制
+        quality: 绘制质量，决定线型和是否使用亚像素坐标；各尺寸参数已按内部分辨率换算
 
     Returns:
-        bool: 是否在边界内
+        np.array: 绘制后的图像
     """
-    return (x > 0.01) and (y > 0.01) and (0 <= x < W) and (0 <= y < H)
+    quality = get_render_quality(quality)
+    points = keypoints.astype(int)
+    if max_line_length is None:
+        max_line_length = np.inf
+    for part in schema.parts:
+        part_xy = keypoints[part.start:part.stop]
+        part_points = points[part.start:part.stop]
+        part_valid = valid[part.start:part.stop]
+        if len(part.edges):
+            if part.edge_style == "limb":
+                _draw_limbs(canvas, part_xy, part_valid, part.edges, part.edge_colors, stickwidth, quality)
+            else:
+                _draw_lines(canvas, part_xy, part_points, part_valid, part.edges, _LINE_COLORS[part.name],
+                            line_thickness, max_line_length, quality)
+        _draw_points(canvas, part_xy, part_points, part_valid, part.point_colors,
+                     quality.size(part.radius) if radius is None else radius, part.drop_origin, quality)
+    return canvas
+
+def _output_size(H, W, quality):
+    """由内部绘制分辨率推算输出分辨率"""
+    if quality.scale == 1.0:
+        return H, W
+    return int(round(H / quality.scale)), int(round(W / quality.scale))
 
-def draw_body17_keypoints_openpose_style(canvas, keypoints, scores=None, threshold=0.3, scale_for_xinsr=False):
+def _valid_mask(scores, threshold, n):
+    if scores is None:
+        return np.ones(n, dtype=bool)
+    return ~(scores[:n] < threshold)
+
+def draw_body17_keypoints_openpose_style(canvas, keypoints, scores=None, threshold=0.3, scale_for_xinsr=False, quality=None):
     """使用OpenPose风格绘制17点身体关键点
 
     Args:
@@ -77,8 +176,9 @@ def draw_body17_keypoints_openpose_style(canvas, keypoints, scores=None, thresho
     H, W, C = canvas.shape
     if keypoints is None or len(keypoints) < 18 or scores is None or len(scores) < 18:
         return canvas
-    candidate = keypoints[:18].copy()
-    candidate_scores = scores[:18].copy()
+    # 线宽和半径按输出分辨率计算，再换算到内部绘制分辨率
+    quality = get_render_quality(quality)
+    H, W = _output_size(H, W, quality)
     avg_size = (H + W) / 2.0
     base_stickwidth = max(1, int(avg_size / 256))
     circle_radius = max(2, int(avg_size / 192))
@@ -88,44 +188,10 @@ def draw_body17_keypoints_openpose_style(canvas, keypoints, scores=None, thresho
         xinsr_stick_scale = 1 if target_max_side < 500 else min(2 + (target_max_side // 1000), 7)
         stickwidth = base_stickwidth * xinsr_stick_scale
 
-    # 定义身体部位连接顺序
-    limbSeq = [
-        [2, 3], [2, 6], [3, 4], [4, 5], [6, 7], [7, 8],
-        [2, 9], [9, 10], [10, 11], [2, 12], [12, 13], [13, 14],
-        [2, 1], [1, 15], [15, 17], [1, 16], [16, 18]
-    ]
-
-    # 定义颜色
-    colors = [
-        [255, 0, 0], [255, 85, 0], [255, 170, 0], [255, 255, 0], [170, 255, 0],
-        [85, 255, 0], [0, 255, 0], [0, 255, 85], [0, 255, 170], [0, 255, 255],
-        [0, 170, 255], [0, 85, 255], [0, 0, 255], [85, 0, 255], [170, 0, 255],
-        [255, 0, 255], [255, 0, 170], [255, 0, 85]
-    ]
-
-    # 绘制连接线
-    for i, limb in enumerate(limbSeq):
-        idx1, idx2 = limb[0] - 1, limb[1] - 1
-        if idx1 < 0 or idx2 < 0 or idx1 >= 18 or idx2 >= 18: continue
-        if candidate_scores[idx1] < threshold or candidate_scores[idx2] < threshold: continue
-        Y, X = candidate[[idx1, idx2], 0], candidate[[idx1, idx2], 1]
-        mX, mY = float(np.mean(X)), float(np.mean(Y))
-        length = float(((X[0] - X[1]) ** 2 + (Y[0] - Y[1]) ** 2) ** 0.5)
-        if length < 1.0: continue
-        angle = math.degrees(math.atan2(X[0] - X[1], Y[0] - Y[1]))
-        polygon = cv2.ellipse2Poly((int(mY), int(mX)), (int(length / 2), int(stickwidth)), int(angle), 0, 360, 1)
-        cv2.fillConvexPoly(canvas, polygon, colors[i % len(colors)])
-
-    # 绘制关键点
-    for i in range(18):
-        if candidate_scores[i] < threshold: continue
-        x, y = int(candidate[i][0]), int(candidate[i][1])
-        if 0 <= x < W and 0 <= y < H:
-            cv2.circle(canvas, (x, y), circle_radius, colors[i % len(colors)], thickness=-1)
-
-    return canvas
+    return draw_schema_keypoints(canvas, BODY18, keypoints[:18], _valid_mask(scores, threshold, 18),
+                                 quality.size(stickwidth), radius=quality.size(circle_radius), quality=quality)
 
-def draw_wholebody_keypoints_openpose_style(canvas, keypoints, scores=None, threshold=0.3, scale_for_xinsr=False):
+def draw_wholebody_keypoints_openpose_style(canvas, keypoints, scores=None, threshold=0.3, scale_for_xinsr=False, quality=None):
     """使用OpenPose风格绘制全身关键点
 
     Args:
@@ -139,10 +205,12 @@ def draw_wholebody_keypoints_openpose_style(canvas, keypoints, scores=None, thre
         np.array: 绘制后的图像
     """
     H, W, C = canvas.shape
-    if keypoints is None or len(keypoints) < 134:
+    if keypoints is None or len(keypoints) < WHOLEBODY134.num_points:
         return canvas
 
     max_hand_dist = math.sqrt(W**2 + H**2) / 5.0
+    quality = get_render_quality(quality)
+    H, W = _output_size(H, W, quality)
     base_stickwidth = 4
     stickwidth = base_stickwidth
     if scale_for_xinsr:
@@ -150,108 +218,10 @@ def draw_wholebody_keypoints_openpose_style(canvas, keypoints, scores=None, thre
         xinsr_stick_scale = 1 if target_max_side < 500 else min(2 + (target_max_side // 1000), 7)
         stickwidth = base_stickwidth * xinsr_stick_scale
 
-    # 身体部位连接顺序
-    body_limbSeq = [
-        [2, 3], [2, 6], [3, 4], [4, 5], [6, 7], [7, 8],
-        [2, 9], [9, 10], [10, 11], [2, 12], [12, 13], [13, 14],
-        [2, 1], [1, 15], [15, 17], [1, 16], [16, 18]
-    ]
-
-    # 手部连接顺序
-    hand_edges = [
-        [0, 1], [1, 2], [2, 3], [3, 4], [0, 5], [5, 6], [6, 7], [7, 8],
-        [0, 9], [9, 10], [10, 11], [11, 12], [0, 13], [13, 14], [14, 15], [15, 16],
-        [0, 17], [17, 18], [18, 19], [19, 20]
-    ]
-
-    # 定义颜色
-    colors = [
-        [255, 0, 0], [255, 85, 0], [255, 170, 0], [255, 255, 0], [170, 255, 0],
-        [85, 255, 0], [0, 255, 0], [0, 255, 85], [0, 255, 170], [0, 255, 255],
-        [0, 170, 255], [0, 85, 255], [0, 0, 255], [85, 0, 255], [170, 0, 255],
-        [255, 0, 255], [255, 0, 170], [255, 0, 85]
-    ]
-
-    # 绘制身体
-    if len(keypoints) >= 18:
-        for i, limb in enumerate(body_limbSeq):
-            idx1, idx2 = limb[0] - 1, limb[1] - 1
-            if idx1 < 0 or idx2 < 0 or idx1 >= 18 or idx2 >= 18: continue
-            if scores is not None and (scores[idx1] < threshold or scores[idx2] < threshold): continue
-            Y, X = np.array([keypoints[idx1][0], keypoints[idx2][0]], dtype=np.float32), np.array([keypoints[idx1][1], keypoints[idx2][1]], dtype=np.float32)
-            mX, mY = float(np.mean(X)), float(np.mean(Y))
-            length = float(((X[0] - X[1]) ** 2 + (Y[0] - Y[1]) ** 2) ** 0.5)
-            if length < 1.0: continue
-            angle = math.degrees(math.atan2(X[0] - X[1], Y[0] - Y[1]))
-            polygon = cv2.ellipse2Poly((int(mY), int(mX)), (int(length / 2), int(stickwidth)), int(angle), 0, 360, 1)
-            cv2.fillConvexPoly(canvas, polygon, colors[i % len(colors)])
-
-        # 绘制身体关键点
-        for i in range(18):
-            if scores is not None and scores[i] < threshold: continue
-            x, y = int(keypoints[i][0]), int(keypoints[i][1])
-            if 0 <= x < W and 0 <= y < H:
-                cv2.circle(canvas, (x, y), 4, colors[i % len(colors)], thickness=-1)
-
-    # 绘制面部关键点
-    if len(keypoints) >= 24:
-        for i in range(18, 24):
-            if scores is not None and scores[i] < threshold: continue
-            x, y = int(keypoints[i][0]), int(keypoints[i][1])
-            if 0 <= x < W and 0 <= y < H:
-                cv2.circle(canvas, (x, y), 4, colors[i % len(colors)], thickness=-1)
-
-    # 绘制脚关键点
-    if len(keypoints) >= 92:
-        for i in range(24, 92):
-            if scores is not None and scores[i] < threshold: continue
-            x, y = int(keypoints[i][0]), int(keypoints[i][1])
-            if _in_bounds(x, y, W, H):
-                cv2.circle(canvas, (x, y), 3, (255, 255, 255), thickness=-1)
-
-    # 绘制左手
-    if len(keypoints) >= 113:
-        for ie, edge in enumerate(hand_edges):
-            idx1, idx2 = 92 + edge[0], 92 + edge[1]
-            if scores is not None and (scores[idx1] < threshold or scores[idx2] < threshold): continue
-            x1, y1 = int(keypoints[idx1][0]), int(keypoints[idx1][1])
-            x2, y2 = int(keypoints[idx2][0]), int(keypoints[idx2][1])
-            line_length = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            if line_length > max_hand_dist:
-                continue
-            if _in_bounds(x1, y1, W, H) and _in_bounds(x2, y2, W, H):
-                color = (matplotlib.colors.hsv_to_rgb([ie / float(len(hand_edges)), 1.0, 1.0]) * 255.0).astype(np.uint8)
-                color = (int(color[0]), int(color[1]), int(color[2]))
-                cv2.line(canvas, (x1, y1), (x2, y2), color, thickness=2)
-
-        for i in range(92, 113):
-            if scores is not None and scores[i] < threshold: continue
-            x, y = int(keypoints[i][0]), int(keypoints[i][1])
-            if _in_bounds(x, y, W, H):
-                cv2.circle(canvas, (x, y), 4, (0, 0, 255), thickness=-1)
-
-    # 绘制右手
-    if len(keypoints) >= 134:
-        for ie, edge in enumerate(hand_edges):
-            idx1, idx2 = 113 + edge[0], 113 + edge[1]
-            if scores is not None and (scores[idx1] < threshold or scores[idx2] < threshold): continue
-            x1, y1 = int(keypoints[idx1][0]), int(keypoints[idx1][1])
-            x2, y2 = int(keypoints[idx2][0]), int(keypoints[idx2][1])
-            line_length = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            if line_length > max_hand_dist:
-                continue
-            if _in_bounds(x1, y1, W, H) and _in_bounds(x2, y2, W, H):
-                color = (matplotlib.colors.hsv_to_rgb([ie / float(len(hand_edges)), 1.0, 1.0]) * 255.0).astype(np.uint8)
-                color = (int(color[0]), int(color[1]), int(color[2]))
-                cv2.line(canvas, (x1, y1), (x2, y2), color, thickness=2)
-
-        for i in range(113, 134):
-            if scores is not None and scores[i] < threshold: continue
-            x, y = int(keypoints[i][0]), int(keypoints[i][1])
-            if _in_bounds(x, y, W, H):
-                cv2.circle(canvas, (x, y), 4, (0, 0, 255), thickness=-1)
-
-    return canvas
+    return draw_schema_keypoints(canvas, WHOLEBODY134, keypoints[:WHOLEBODY134.num_points],
+                                 _valid_mask(scores, threshold, WHOLEBODY134.num_points),
+                                 quality.size(stickwidth), line_thickness=quality.line_width(2),
+                                 max_line_length=max_hand_dist, quality=quality)
 
 def _extract_body(person, w, h):
     """从人物数据中提取身体关键点
@@ -264,8 +234,8 @@ def _extract_body(person, w, h):
     Returns:
         tuple: (关键点坐标, 置信度分数)
     """
-    pose_arr = _safe_array_3(person.get("pose_keypoints_2d", []), 18)
-    pose_arr = _denorm_xy(pose_arr, w, h)
+    pose_arr = _safe_array_3(person.get("pose_keypoints_2d", []), BODY18.num_points)
+    pose_arr = _denorm_parts(pose_arr, BODY18.part_starts, w, h)
     scores = pose_arr[:, 2].copy()
     return pose_arr[:, :2], scores
 
@@ -282,7 +252,7 @@ def _extract_wholebody(person, w, h):
     """
     kps_all_flat = person.get("pose_keypoints_2d", [])
     num_points_in_json = len(kps_all_flat) // 3
-    TARGET_POINTS = 134
+    TARGET_POINTS = WHOLEBODY134.num_points
 
     if num_points_in_json < TARGET_POINTS:
         kps_known = _safe_array_3(kps_all_flat, num_points_in_json)
@@ -291,12 +261,8 @@ def _extract_wholebody(person, w, h):
     else:
         kps_all = _safe_array_3(kps_all_flat, TARGET_POINTS)
 
-    # 反归一化所有关键点
-    kps_all[:18]     = _denorm_xy(kps_all[:18],     w, h)
-    kps_all[18:24]   = _denorm_xy(kps_all[18:24],   w, h)
-    kps_all[24:92]   = _denorm_xy(kps_all[24:92],   w, h)
-    kps_all[92:113]  = _denorm_xy(kps_all[92:113],  w, h)
-    kps_all[113:134] = _denorm_xy(kps_all[113:134], w, h)
+    # 各部位分别反归一化
+    kps_all = _denorm_parts(kps_all, WHOLEBODY134.part_starts, w, h)
 
     scores = kps_all[:, 2].copy()
     return kps_all[:, :2], scores
@@ -322,6 +288,10 @@ class OLO_DrawPoseKeypoint:
             "optional": {
                 "base_image": ("IMAGE",),
                 "overlay_alpha": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 1.0, "step": 0.05}),
+                "chunk_size": ("INT", {"default": 64, "min": 1, "max": 4096, "tooltip": "Number of frames processed per chunk. Base frames are read from the input batch one chunk at a time, so peak memory grows with the chunk size instead of the video length. Base frames are resized and composited on the device the base image lives on; the result is returned as a CPU tensor."}),
+                "render_quality": (RENDER_QUALITY_MODES, {"default": "fast", "tooltip": RENDER_QUALITY_TOOLTIP}),
+                "person_id": ("INT", {"default": -1, "min": -1, "max": 100000, "tooltip": "Only draw the person with this tracked ID (the \"id\" assigned by OLO_PoseTracker). -1 draws according to draw_all_people."}),
+                "frame_cache_mb": ("INT", {"default": 128, "min": 0, "max": 65536, "tooltip": "Memory budget (MB) of this node's per-frame pose layer cache. Frames whose pose data and draw settings did not change since an earlier run are reused instead of redrawn, so editing a few frames of a long sequence only redraws those frames. Layers are stored as runs of non-black pixels (about 150 KB for a 1024x1024 wholebody frame instead of 3 MB), so the default holds sequences of several hundred full-size frames. 0 disables and frees the cache."}),
             }
         }
 
@@ -330,8 +300,13 @@ class OLO_DrawPoseKeypoint:
     FUNCTION = "draw"
     CATEGORY = "OLO/Pose"
 
+    def __init__(self):
+        # 单帧姿态图层的缓存，每个节点实例各自一份，容量由该节点的 frame_cache_mb 控制；节点运行前不占用内存
+        self._frame_cache = ByteLRUCache(0)
+
     def draw(self, pose_keypoint, score_threshold, scale_for_xinsr, keypoint_scheme,
-             draw_all_people, base_image=None, overlay_alpha=1.0):
+             draw_all_people, base_image=None, overlay_alpha=1.0, chunk_size=64, render_quality="fast",
+             frame_cache_mb=128, person_id=-1):
         """绘制姿态关键点
 
         Args:
@@ -342,69 +317,112 @@ class OLO_DrawPoseKeypoint:
             draw_all_people: 是否绘制所有人
             base_image: 基础图像
             overlay_alpha: 叠加透明度
+            chunk_size: 每次处理的帧数，基础图像按块读取、缩放与合成
+            render_quality: 绘制质量模式，见 render_quality.py
+            frame_cache_mb: 本节点单帧图层缓存的内存上限（MB），0表示不缓存并释放缓存
+            person_id: 只绘制该轨迹 id 的人物，-1 表示按 draw_all_people 绘制
 
         Returns:
             tuple: 绘制后的图像
         """
         if isinstance(pose_keypoint, dict):
             pose_keypoint = [pose_keypoint]
-        if not isinstance(pose_keypoint, list):
+        if not is_frame_sequence(pose_keypoint):
             pose_keypoint = []
 
         if len(pose_keypoint) == 0:
             pose_keypoint = [{"people": [], "canvas_width": 512, "canvas_height": 512}]
 
         num_frames = len(pose_keypoint)
-
-        base_imgs_np = None
-        if base_image is not None:
-            base_imgs_np = (base_image.cpu().numpy() * 255.0).astype(np.uint8)
-            if base_imgs_np.shape[0] != num_frames:
-                if base_imgs_np.shape[0] == 1:
-                    base_imgs_np = np.repeat(base_imgs_np[0:1], num_frames, axis=0)
-                else:
-                    base_imgs_np = np.repeat(base_imgs_np[:1], num_frames, axis=0)
-
-        frames_out = []
-        for t in range(num_frames):
+        chunk_size = max(1, int(chunk_size))
+        quality = get_render_quality(render_quality)
+        self._frame_cache.resize(max(0, frame_cache_mb) * 1024 * 1024)
+        draw_key = (score_threshold, scale_for_xinsr, keypoint_scheme, draw_all_people, quality.name, person_id)
+        frame_hashes = None
+        if frame_cache_mb:
+            # 整个序列只转换为数组一次，逐帧的指纹直接由数组计算；按 id 筛选时人物 id 也参与计算
+            poses = PoseSequence.from_keypoints(pose_keypoint)
+            ids = (track_id_array(pose_keypoint, poses.num_frames, poses.max_people),) if person_id >= 0 else ()
+            frame_hashes = poses.frame_hashes(*ids)
+
+        def cached_frame(t):
+            """按单帧姿态内容和绘制参数查找缓存，只有内容变化的帧才重新绘制；图层只保存非零像素"""
+            if frame_hashes is None:
+                return render_frame(t)
+            key = ("pose_frame", frame_hashes[t], draw_key)
+            packed = self._frame_cache.get(key)
+            if packed is None:
+                canvas = render_frame(t)
+                self._frame_cache.put(key, pack_layer(canvas))
+                return canvas
+            return unpack_layer(packed)
+
+        def render_frame(t):
             frame = pose_keypoint[t] if isinstance(pose_keypoint[t], dict) else {}
             w = int(frame.get("canvas_width", 512))
             h = int(frame.get("canvas_height", 512))
             people = frame.get("people", [])
+            # 超采样 / 草稿模式在内部分辨率上绘制，关键点坐标同比例换算
+            rh, rw = quality.internal_size(h, w)
+            canvas = np.zeros((rh, rw, 3), dtype=np.uint8)
+            internal_scale = np.array([rw / w, rh / h], dtype=np.float32)
 
-            if base_imgs_np is not None:
-                base = base_imgs_np[t]
-                if base.shape[1] != w or base.shape[0] != h:
-                    base = cv2.resize(base, (w, h), interpolation=cv2.INTER_AREA)
-                canvas = base.copy()
+            if person_id >= 0:
+                persons = [person for person in people if person_track_id(person) == person_id]
             else:
-                canvas = np.zeros((h, w, 3), dtype=np.uint8)
-
-            persons = people if draw_all_people else (people[:1] if people else [])
+                persons = people if draw_all_people else (people[:1] if people else [])
 
             for person in persons:
                 if keypoint_scheme == "body":
                     kps_xy, scores = _extract_body(person, w, h)
+                    if quality.scale != 1.0:
+                        kps_xy = kps_xy * internal_scale
                     canvas = draw_body17_keypoints_openpose_style(
                         canvas, kps_xy, scores,
                         threshold=score_threshold,
-                        scale_for_xinsr=scale_for_xinsr
+                        scale_for_xinsr=scale_for_xinsr,
+                        quality=quality
                     )
                 else:
                     kps_xy, scores = _extract_wholebody(person, w, h)
+                    if quality.scale != 1.0:
+                        kps_xy = kps_xy * internal_scale
                     canvas = draw_wholebody_keypoints_openpose_style(
                         canvas, kps_xy, scores,
                         threshold=score_threshold,
-                        scale_for_xinsr=scale_for_xinsr
+                        scale_for_xinsr=scale_for_xinsr,
+                        quality=quality
                     )
-
-            if base_imgs_np is not None and overlay_alpha < 1.0:
-                canvas = cv2.addWeighted(canvas, overlay_alpha, base_imgs_np[t], 1.0 - overlay_alpha, 0)
-
-            frames_out.append(canvas)
-
-        result_tensor = torch.from_numpy(np.stack(frames_out, axis=0).astype(np.float32) / 255.0)
-        return (result_tensor,)
+            return quality.finish(canvas, h, w)
+
+        if base_image is None:
+            # 每帧绘制完成后直接写入预先分配的输出张量
+            return (images_to_tensor((cached_frame(t) for t in range(num_frames)), num_frames),)
+
+        # 姿态图层在黑色画布上绘制，再按块在基础图像所在的设备上缩放、合成，基础图像不复制到主机内存，
+        # 结果最后一次性移到 CPU，与原先的输出设备一致；
+        # 基础图像与姿态帧数一致时逐帧对应，否则所有帧都使用第一张（只缩放一次，不复制成 N 份）
+        # fast 模式的像素不是全覆盖就是空白，按蒙版合成与直接画在基础图像上完全相同；
+        # 其余模式的边缘已与黑色混合，按覆盖率合成以免出现黑边
+        shared_base = base_image[:1] if base_image.shape[0] != num_frames else None
+        result_tensor = None
+        for start in range(0, num_frames, chunk_size):
+            stop = min(start + chunk_size, num_frames)
+            pose_chunk = images_to_tensor([cached_frame(t) for t in range(start, stop)])
+            _, h, w, _ = pose_chunk.shape
+            if shared_base is not None:
+                shared_base = resize_images(shared_base, h, w)
+                base_chunk = shared_base
+            else:
+                base_chunk = resize_images(base_image[start:stop], h, w)
+            if quality.soft_edges:
+                combined = coverage_composite(pose_chunk, base_chunk, overlay_alpha)
+            else:
+                combined = composite_pose(pose_chunk, base_chunk, pose_mask(pose_chunk), overlay_alpha)
+            if result_tensor is None:
+                result_tensor = torch.empty((num_frames, h, w, 3), dtype=combined.dtype, device=combined.device)
+            result_tensor[start:stop] = combined
+        return (result_tensor.cpu(),)
 
 NODE_CLASS_MAPPINGS = {"OLO_DrawPoseKeypoint": OLO_DrawPoseKeypoint}
 NODE_DISPLAY_NAME_MAPPINGS = {"OLO_DrawPoseKeypoint": "OLO_DrawPoseKeypoint"}
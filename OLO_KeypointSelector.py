@@ -1,10 +1,41 @@
+from .pose_view import PoseSequenceView, is_frame_sequence
+
+# 人物字典中可能出现的字段，用于识别未包装成帧的人物数据
+PERSON_KEYS = frozenset((
+    "pose_keypoints_2d", "face_keypoints_2d",
+    "hand_left_keypoints_2d", "hand_right_keypoints_2d",
+    "foot_keypoints_2d", "id"
+))
+
+
+def _as_frame(value):
+    """
+    确保帧字典带有人物列表
+
+    人物字典包装为只含该人物的帧，其他缺少人物列表的字典变为空帧；非字典的值原样返回。
+    """
+    if not isinstance(value, dict) or isinstance(value.get("people"), list):
+        return value
+    people = [value] if not PERSON_KEYS.isdisjoint(value) else []
+    return {
+        "people": people,
+        "canvas_width": value.get("canvas_width", 512),
+        "canvas_height": value.get("canvas_height", 768)
+    }
+
+
 class OLO_KeypointSelector:
-    """关键点帧选择器节点，用于处理姿态关键点数据"""
-    
+    """
+    关键点帧选择器节点，用于处理姿态关键点数据
+
+    选择和重写都先在共享输入帧的 PoseSequenceView 上完成。默认（zero_copy 关闭）在输出时把视图转换为
+    普通列表，仍会复制一次帧的引用列表，以兼容要求 list 的下游节点；只有开启 zero_copy 时才完全不复制。
+    """
+
     @classmethod
     def INPUT_TYPES(cls):
         """定义节点输入类型
-        
+
         Returns:
             dict: 输入类型定义
         """
@@ -16,97 +47,83 @@ class OLO_KeypointSelector:
             },
             "optional": {
                 "keypoint_frame_rewrite": ("POSE_KEYPOINT",),
+                "frame_selection": ("STRING", {"default": "", "tooltip": "Frames for pose_keypoint_selected: a slice like 0:100:4 or ::4, an index list like 1, 5, 9 (slices may be mixed in), or mask:0110... with one digit per frame. Empty selects frame_index."}),
+                "frame_rewrite_selection": ("STRING", {"default": "", "tooltip": "Frames to overwrite with keypoint_frame_rewrite, same syntax as frame_selection. A single rewrite frame is used for every selected frame, otherwise the rewrite frames are assigned in order and the counts must match. Empty uses frame_index_rewrite."}),
+                "zero_copy": ("BOOLEAN", {"default": False, "tooltip": "Output pose_keypoint_updated and pose_keypoint_selected as read-only views that share the input frames instead of new lists. Faster for long sequences, but the views are not lists: they cannot be JSON-serialised or appended to, so only enable it when every consumer is a node from this pack."}),
             }
         }
 
-    RETURN_TYPES = ("POSE_KEYPOINT", "POSE_KEYPOINT", "INT")
-    RETURN_NAMES = ("pose_keypoint_updated", "pose_keypoint_single", "selected_frame_index")
+    RETURN_TYPES = ("POSE_KEYPOINT", "POSE_KEYPOINT", "INT", "POSE_KEYPOINT")
+    RETURN_NAMES = ("pose_keypoint_updated", "pose_keypoint_single", "selected_frame_index", "pose_keypoint_selected")
     FUNCTION = "process"
     CATEGORY = "OLO/Pose"
 
-    def process(self, pose_keypoint, frame_index, frame_index_rewrite, keypoint_frame_rewrite=None):
+    def process(self, pose_keypoint, frame_index, frame_index_rewrite, keypoint_frame_rewrite=None,
+                frame_selection="", frame_rewrite_selection="", zero_copy=False):
         """处理姿态关键点数据
-        
+
         Args:
             pose_keypoint: 输入姿态关键点数据
             frame_index: 要选择的帧索引
             frame_index_rewrite: 要重写的帧索引
-            keypoint_frame_rewrite: 用于重写的关键点帧数据
-            
+            keypoint_frame_rewrite: 用于重写的关键点帧数据，可以是单帧或多帧
+            frame_selection: 选择多帧的字符串（切片、下标列表或掩码），为空时选择 frame_index
+            frame_rewrite_selection: 要重写的多帧，写法同 frame_selection，为空时重写 frame_index_rewrite
+            zero_copy: 是否以共享输入帧的视图输出姿态关键点序列
+
         Returns:
-            tuple: (更新后的姿态关键点, 单帧姿态关键点, 选中的帧索引)
+            tuple: (更新后的姿态关键点, 单帧姿态关键点, 选中的帧索引, 选中的多帧姿态关键点)
         """
         # 如果输入是人物列表（人物字典列表），将其包装为单帧以保留所有人物
-        if isinstance(pose_keypoint, list) and len(pose_keypoint) > 0 and isinstance(pose_keypoint[0], dict):  
-            person_keys = {
-                "pose_keypoints_2d", "face_keypoints_2d",
-                "hand_left_keypoints_2d", "hand_right_keypoints_2d",      
-                "foot_keypoints_2d", "id"
-            }
-            if any(k in pose_keypoint[0] for k in person_keys):
-                pose_keypoint = [{"people": pose_keypoint, "canvas_width": 512, "canvas_height": 768}]
+        if isinstance(pose_keypoint, list) and len(pose_keypoint) > 0 and isinstance(pose_keypoint[0], dict) \
+                and not PERSON_KEYS.isdisjoint(pose_keypoint[0]):
+            pose_keypoint = [{"people": pose_keypoint, "canvas_width": 512, "canvas_height": 768}]
 
-        # 标准化为帧列表
-        if not isinstance(pose_keypoint, list):
+        # 标准化为帧序列
+        if not is_frame_sequence(pose_keypoint):
             pose_keypoint = [pose_keypoint]
 
-        if len(pose_keypoint) == 0:  
+        if len(pose_keypoint) == 0:
             pose_keypoint = [{"people": [], "canvas_width": 512, "canvas_height": 768}]
 
+        # 不复制输入：只创建视图，重写的帧保存在视图的 overlay 中
+        frames = PoseSequenceView.of(pose_keypoint)
+
         # 确保帧索引在有效范围内
-        frame_index = max(0, min(frame_index, len(pose_keypoint) - 1))    
-        frame_index_rewrite = max(0, min(frame_index_rewrite, len(pose_keypoint) - 1))
+        frame_index = max(0, min(frame_index, len(frames) - 1))
+        frame_index_rewrite = max(0, min(frame_index_rewrite, len(frames) - 1))
 
         # 提取选定的帧并确保它是带有人物列表的帧字典
-        single_frame = pose_keypoint[frame_index]
-        if isinstance(single_frame, dict) and not ("people" in single_frame and isinstance(single_frame.get("people"), list)):
-            person_keys = {
-                "pose_keypoints_2d", "face_keypoints_2d",
-                "hand_left_keypoints_2d", "hand_right_keypoints_2d",      
-                "foot_keypoints_2d", "id"
-            }
-            if any(k in single_frame for k in person_keys):
-                single_frame = {     
-                    "people": [single_frame],
-                    "canvas_width": single_frame.get("canvas_width", 512),
-                    "canvas_height": single_frame.get("canvas_height", 768)
-                }
-            else:
-                single_frame = {     
-                    "people": [],    
-                    "canvas_width": single_frame.get("canvas_width", 512) if isinstance(single_frame, dict) else 512,
-                    "canvas_height": single_frame.get("canvas_height", 768) if isinstance(single_frame, dict) else 768
-                }
-
-        # 创建更新后的姿态关键点列表
-        updated = list(pose_keypoint)
-        
+        single_frame = _as_frame(frames[frame_index])
+
+        # 多帧选择只生成视图，不复制帧
+        if frame_selection and frame_selection.strip():
+            selected = frames.select(frame_selection)
+        else:
+            selected = frames.select([frame_index])
+
         # 如果提供了重写数据，则标准化并重写
+        updated = frames
         if keypoint_frame_rewrite is not None:
             rewrite = keypoint_frame_rewrite
-            if isinstance(rewrite, list) and len(rewrite) == 1:
-                rewrite = rewrite[0] 
-            if isinstance(rewrite, dict) and not ("people" in rewrite and isinstance(rewrite.get("people"), list)):
-                person_keys = {
-                    "pose_keypoints_2d", "face_keypoints_2d",
-                    "hand_left_keypoints_2d", "hand_right_keypoints_2d",  
-                    "foot_keypoints_2d", "id"
-                }
-                if any(k in rewrite for k in person_keys):
-                    rewrite = {
-                        "people": [rewrite],
-                        "canvas_width": rewrite.get("canvas_width", 512),
-                        "canvas_height": rewrite.get("canvas_height", 768)
-                    }
+            if is_frame_sequence(rewrite) and len(rewrite) == 1:
+                rewrite = rewrite[0]
+            if frame_rewrite_selection and frame_rewrite_selection.strip():
+                positions = frames.positions(frame_rewrite_selection)
+                if is_frame_sequence(rewrite):
+                    if len(rewrite) != len(positions):
+                        raise ValueError(f"keypoint_frame_rewrite has {len(rewrite)} frames but frame_rewrite_selection selects {len(positions)}")
+                    rewrites = [_as_frame(frame) for frame in rewrite]
                 else:
-                    rewrite = {
-                        "people": [],
-                        "canvas_width": rewrite.get("canvas_width", 512) if isinstance(rewrite, dict) else 512,
-                        "canvas_height": rewrite.get("canvas_height", 768) if isinstance(rewrite, dict) else 768
-                    }
-            updated[frame_index_rewrite] = rewrite
+                    rewrites = [_as_frame(rewrite)] * len(positions)
+                updated = frames.rewrite(dict(zip(list(positions), rewrites)))
+            else:
+                updated = frames.rewrite({frame_index_rewrite: _as_frame(rewrite)})
 
-        return (updated, single_frame, frame_index)
+        if not zero_copy:
+            updated = updated.to_list()
+            selected = selected.to_list()
+        return (updated, single_frame, frame_index, selected)
 
 NODE_CLASS_MAPPINGS = {"OLO_KeypointSelector": OLO_KeypointSelector}
-NODE_DISPLAY_NAME_MAPPINGS = {"OLO_KeypointSelector": "OLO_KeypointSelector"}
\ No newline at end of file
+NODE_DISPLAY_NAME_MAPPINGS = {"OLO_KeypointSelector": "OLO_KeypointSelector"}
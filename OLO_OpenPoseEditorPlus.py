@@ -1,13 +1,14 @@
 import os.path
 import folder_paths
-from nodes import LoadImage
 import json
 import time
-import numpy as np
-import torch
-import cv2
-import math
-from PIL import Image
+from .dw_render import render_dw_frames
+from .pose_composite import luma_mask_frames, composite_pose
+from .image_cache import load_fabric_images, load_background, editor_file_signatures
+from .render_cache import content_hash
+from .util import images_to_tensor
+from .pose_view import is_frame_sequence
+from .pose_io import resolve_output_path, filename_counter, write_pose_jsonl, write_pose_npz
 
 # ====================================================================================================
 # 增强 OpenPose Editor 节点 - OLO 版本
@@ -15,9 +16,6 @@ from PIL import Image
 
 
 class OLO_OpenPoseEditorPlus:
-    # 必要部分: 修复潜在的稳定性问题，确保IS_CHANGED函数能稳定运行
-    _last_fingerprints = {}
-
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -26,6 +24,9 @@ class OLO_OpenPoseEditorPlus:
                 "output_width_for_dwpose": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 64}),
                 "output_height_for_dwpose": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 64}),
                 "scale_for_xinsr_for_dwpose": ("BOOLEAN", {"default": False}),
+                "dw_show_hands": ("BOOLEAN", {"default": False, "tooltip": "Draw hand keypoints on the DW-style outputs."}),
+                "dw_show_face": ("BOOLEAN", {"default": False, "tooltip": "Draw face keypoints on the DW-style outputs."}),
+                "POSE_KEYPOINT": ("POSE_KEYPOINT", {"tooltip": "Pose frames to render in DW style when no pose was saved in the editor. Every frame becomes one image of the dw_pose_image / dw_combined_image batch."}),
             },
             "hidden": {
                 "savedPose": ("STRING", {"multiline": True}),
@@ -37,10 +38,10 @@ class OLO_OpenPoseEditorPlus:
     OUTPUT_NODE = True
 
     @classmethod
-    def IS_CHANGED(cls, image, savedPose, backgroundImage, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose, **kwargs):
-        # 高效地计算并返回指纹
-        fingerprint = f"{savedPose}-{backgroundImage}-{output_width_for_dwpose}-{output_height_for_dwpose}-{scale_for_xinsr_for_dwpose}"
-        return fingerprint
+    def IS_CHANGED(cls, image, savedPose, backgroundImage, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose, dw_show_hands=False, dw_show_face=False, **kwargs):
+        # 姿态文本的摘要、参数与图像文件签名组成固定长度的指纹
+        return content_hash(savedPose, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose,
+                            dw_show_hands, dw_show_face, editor_file_signatures(image, backgroundImage))
 
     RETURN_TYPES = ("IMAGE", "IMAGE", "IMAGE", "IMAGE",)
     RETURN_NAMES = ("pose_image", "combined_image",
@@ -49,134 +50,27 @@ class OLO_OpenPoseEditorPlus:
     NODE_NAME = "OLO_OpenPoseEditorPlus"
     NODE_CATEGORY = "OLO/pose"
 
-    # 渲染DW Pose的辅助函数
-    def render_dw_pose(self, pose_json, width, height, scale_for_xinsr):
-        if not pose_json or not pose_json.strip():
-            return np.zeros((height, width, 3), dtype=np.uint8)
-        try:
-            data = json.loads(pose_json)
-        except json.JSONDecodeError:
-            return np.zeros((height, width, 3), dtype=np.uint8)
-
-        target_w, target_h = width, height
-        original_w, original_h = data.get(
-            'width', target_w), data.get('height', target_h)
-        scale_x, scale_y = target_w / original_w, target_h / original_h
-
-        canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
-        people = data.get('people', [])
-        if not people:
-            return canvas
-
-        limbSeq = [[2, 3], [2, 6], [3, 4], [4, 5], [6, 7], [7, 8], [2, 9], [9, 10], [
-            10, 11], [2, 12], [12, 13], [13, 14], [2, 1], [1, 15], [15, 17], [1, 16], [16, 18]]
-        colors = [[255, 0, 0], [255, 85, 0], [255, 170, 0], [255, 255, 0], [170, 255, 0], [85, 255, 0], [0, 255, 0], [0, 255, 85], [
-            0, 255, 170], [0, 255, 255], [0, 170, 255], [0, 85, 255], [0, 0, 255], [85, 0, 255], [170, 0, 255], [255, 0, 255], [255, 0, 170], [255, 0, 85]]
-
-        BASE_RESOLUTION_SIDE = 512.0
-        base_thickness = 2.0
-        target_max_side = max(target_w, target_h)
-        scale_factor = target_max_side / BASE_RESOLUTION_SIDE
-        scaled_joint_radius = int(max(1, base_thickness * scale_factor))
-        scaled_stickwidth = scaled_joint_radius
-
-        if scale_for_xinsr:
-            xinsr_stick_scale = 1 if target_max_side < 500 else min(
-                2 + (target_max_side // 1000), 7)
-            scaled_stickwidth *= xinsr_stick_scale
-
-        for person in people:
-            keypoints_flat = person.get('pose_keypoints_2d', [])
-            keypoints = [(int(keypoints_flat[i] * scale_x), int(keypoints_flat[i+1] * scale_y))
-                         if keypoints_flat[i+2] > 0 else None for i in range(0, len(keypoints_flat), 3)]
-
-            for limb_indices, color in zip(limbSeq, colors):
-                k1_idx, k2_idx = limb_indices[0] - 1, limb_indices[1] - 1
-                if k1_idx >= len(keypoints) or k2_idx >= len(keypoints):
-                    continue
-                p1, p2 = keypoints[k1_idx], keypoints[k2_idx]
-                if p1 is None or p2 is None:
-                    continue
-
-                Y, X = np.array([p1[0], p2[0]]), np.array([p1[1], p2[1]])
-                mX, mY = np.mean(X), np.mean(Y)
-                length = np.sqrt((X[0] - X[1])**2 + (Y[0] - Y[1])**2)
-                angle = math.degrees(math.atan2(X[0] - X[1], Y[0] - Y[1]))
-
-                polygon = cv2.ellipse2Poly((int(mY), int(mX)), (int(
-                    length / 2), scaled_stickwidth), int(angle), 0, 360, 1)
-                cv2.fillConvexPoly(canvas, polygon, [
-                                   int(c * 0.6) for c in color])
-
-            for i, keypoint in enumerate(keypoints):
-                if keypoint is None:
-                    continue
-                if i >= len(colors):
-                    continue
-                cv2.circle(canvas, keypoint, scaled_joint_radius,
-                           colors[i], thickness=-1)
-
-        return cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)  # 返回RGB格式的NumPy数组
-
-    def get_images(self, image, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose, savedPose="", backgroundImage=""):
+    def get_images(self, image, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose, savedPose="", backgroundImage="", dw_show_hands=False, dw_show_face=False, POSE_KEYPOINT=None):
         # --- 输出 1 & 2: 原有的 Fabric.js 风格预览图 ---
-        # 初始化返回的图像
-        pose_image_fabric = None
-        combined_image_fabric = None
-
-        # 只有当image不为空时才加载图像
-        if image and image.strip():
-            # 确保load_image方法可用
-            pose_image_fabric, _ = LoadImage.load_image(self, image)
-
-            base_name, ext = os.path.splitext(image)
-            combined_image_name = f"{base_name}_combined{ext}"
-            combined_image_path = folder_paths.get_annotated_filepath(
-                combined_image_name)
-
-            if not os.path.exists(combined_image_path):
-                combined_image_fabric = pose_image_fabric
-            else:
-                combined_image_fabric, _ = LoadImage.load_image(
-                    self, combined_image_name)
-        else:
-            # 如果image为空，创建一个默认的空白图像
-            W = 512
-            H = 768
-            blank_image_np = np.ones((H, W, 3), dtype=np.float32) * 0.5
-            pose_image_fabric = torch.from_numpy(blank_image_np).unsqueeze(0)
-            combined_image_fabric = pose_image_fabric
+        # 解码结果由共享的图像缓存按文件签名缓存
+        pose_image_fabric, combined_image_fabric = load_fabric_images(image)
 
         # --- 输出 3: 纯 DW Pose 渲染图 ---
-        dw_pose_np = self.render_dw_pose(
-            savedPose, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose)
-        dw_pose_image = torch.from_numpy(
-            dw_pose_np.astype(np.float32) / 255.0).unsqueeze(0)
+        # savedPose 可以是单帧或帧列表，为空时使用 POSE_KEYPOINT；所有帧一次渲染为一个 IMAGE 批次
+        pose_source = savedPose if savedPose and savedPose.strip() else POSE_KEYPOINT
+        dw_layers = ("body",) + (("hands",) if dw_show_hands else ()) + (("face",) if dw_show_face else ())
+        dw_pose_np = render_dw_frames(
+            pose_source, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose, dw_layers)
+        dw_pose_image = images_to_tensor(dw_pose_np)
 
         # --- 输出 4: DW Pose 与背景的合成图 ---
         if backgroundImage and backgroundImage.strip() != "":
-            # 1. 加载背景图
             bg_image_path = folder_paths.get_annotated_filepath(
                 backgroundImage)
-            if os.path.exists(bg_image_path):
-                bg_image_pil = Image.open(bg_image_path)
-                bg_image_np = np.array(bg_image_pil.convert("RGB"))
-
-                # 2. 缩放背景图到目标尺寸
-                bg_image_resized = cv2.resize(
-                    bg_image_np, (output_width_for_dwpose, output_height_for_dwpose), interpolation=cv2.INTER_AREA)
-
-                # 3. 创建蒙版并进行合成
-                dw_pose_gray = cv2.cvtColor(dw_pose_np, cv2.COLOR_RGB2GRAY)
-                _, mask = cv2.threshold(
-                    dw_pose_gray, 1, 255, cv2.THRESH_BINARY)
-
-                # 4. 使用蒙版将骨骼“粘贴”到背景上
-                dw_combined_np = bg_image_resized.copy()
-                dw_combined_np[mask != 0] = dw_pose_np[mask != 0]
-
-                dw_combined_image = torch.from_numpy(
-                    dw_combined_np.astype(np.float32) / 255.0).unsqueeze(0)
+            # 背景图只解码、缩放一次（结果都会缓存），所有帧一起按蒙版将骨骼“粘贴”到同一张背景上
+            bg_image = load_background(bg_image_path, output_height_for_dwpose, output_width_for_dwpose)
+            if bg_image is not None:
+                dw_combined_image = composite_pose(dw_pose_image, bg_image, luma_mask_frames(dw_pose_np))
             else:
                 # 如果背景文件找不到，就返回纯姿态图
                 dw_combined_image = dw_pose_image
@@ -199,6 +93,10 @@ class OLO_OpenPoseEditorPlus:
 
 
 class OLO_SavePoseToJson:
+    # people_json: 原有格式，所有帧的人物合并为一个列表；其余模式按帧保存完整序列
+    EXPORT_MODES = ["people_json", "sequence_jsonl", "sequence_npz"]
+    EXTENSIONS = {"people_json": ".json", "sequence_jsonl": ".jsonl", "sequence_npz": ".npz"}
+
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -206,6 +104,9 @@ class OLO_SavePoseToJson:
                 "image": ("IMAGE",),
                 "pose_keypoint": ("POSE_KEYPOINT",),
                 "filename_prefix": ("STRING", {"default": "poses/pose"})
+            },
+            "optional": {
+                "export_mode": (s.EXPORT_MODES, {"default": "people_json", "tooltip": "people_json: legacy file with every frame's people merged into one list, 18 body points in pixels. sequence_jsonl: one frame per line, streamed to disk, keeps frame boundaries, face, hands and ids. sequence_npz: float32 (frames, people, keypoints, 3) tensor with a JSON header, keypoints stored unchanged."}),
             }
         }
 
@@ -216,11 +117,45 @@ class OLO_SavePoseToJson:
     NODE_NAME = "OLO_SavePoseToJson"
     NODE_CATEGORY = "OLO/pose"
 
-    def save_json(self, pose_keypoint, image, filename_prefix="pose"):
+    def save_json(self, pose_keypoint, image, filename_prefix="pose", export_mode="people_json"):
         # 1. 从 image 张量中自动获取宽度和高度
         image_height, image_width = image.shape[1:3]
 
-        # 2. 从复杂的 POSE_KEYPOINT 数据中提取出纯净的 "people" 列表
+        # 2. 解析输出路径，文件编号使用缓存，不在每次保存时列出整个输出目录
+        output_dir = folder_paths.get_output_directory()
+        full_output_folder, filename, subfolder = resolve_output_path(
+            output_dir, filename_prefix, image_width, image_height)
+        os.makedirs(full_output_folder, exist_ok=True)
+        ext = self.EXTENSIONS.get(export_mode, ".json")
+        counter = filename_counter.next(full_output_folder, filename, ext)
+        final_filename = f"{filename}_{counter:05d}{ext}"
+        file_path = os.path.join(full_output_folder, final_filename)
+
+        if export_mode == "people_json":
+            self._save_people_json(file_path, pose_keypoint, image_width, image_height)
+        else:
+            if pose_keypoint is None:
+                frames = []
+            elif is_frame_sequence(pose_keypoint):
+                frames = pose_keypoint
+            else:
+                frames = [pose_keypoint]
+            if export_mode == "sequence_jsonl":
+                write_pose_jsonl(file_path, frames)
+            else:
+                write_pose_npz(file_path, frames, width=int(image_width), height=int(image_height))
+
+        print(f"Pose Saver: Saved pose data to {final_filename}")
+
+        result_filename = os.path.join(
+            subfolder, final_filename) if subfolder else final_filename
+
+        return {"ui": {"text": [result_filename]}, "result": (result_filename,)}
+
+    @staticmethod
+    def _save_people_json(file_path, pose_keypoint, image_width, image_height):
+        """原有格式：所有帧的人物合并为一个列表，保存前 18 个身体关键点的像素坐标"""
+        # 从复杂的 POSE_KEYPOINT 数据中提取出纯净的 "people" 列表
         processed_people = []
         if pose_keypoint and isinstance(pose_keypoint, dict) and "people" in pose_keypoint:
             for person in pose_keypoint["people"]:
@@ -241,7 +176,7 @@ class OLO_SavePoseToJson:
                 processed_people.append({
                     "pose_keypoints_2d": body_keypoints
                 })
-        elif pose_keypoint and isinstance(pose_keypoint, list) and len(pose_keypoint) > 0:
+        elif pose_keypoint and is_frame_sequence(pose_keypoint) and len(pose_keypoint) > 0:
             for result_dict in pose_keypoint:
                 people_in_dict = result_dict.get("people", [])
                 for person in people_in_dict:
@@ -263,46 +198,12 @@ class OLO_SavePoseToJson:
                         "pose_keypoints_2d": body_keypoints
                     })
 
-        # 3. 准备要写入文件的最终数据结构
+        # 准备要写入文件的最终数据结构
         data_to_save = {
             "width": int(image_width),
             "height": int(image_height),
             "people": processed_people
         }
 
-        # 4. 使用正确的路径处理和文件名计数逻辑
-        output_dir = folder_paths.get_output_directory()
-        full_output_folder, filename, _, subfolder, _ = folder_paths.get_save_image_path(
-            filename_prefix, output_dir, image_width, image_height)
-
-        counter = 1
-        try:
-            existing_files = [f for f in os.listdir(full_output_folder) if f.startswith(
-                filename + "_") and f.endswith(".json")]
-            if existing_files:
-                max_counter = 0
-                for f in existing_files:
-                    try:
-                        num_str = f[len(filename)+1:-5]
-                        num = int(num_str)
-                        if num > max_counter:
-                            max_counter = num
-                    except ValueError:
-                        continue
-                counter = max_counter + 1
-        except FileNotFoundError:
-            pass
-
-        final_filename = f"{filename}_{counter:05d}.json"
-        file_path = os.path.join(full_output_folder, final_filename)
-
-        # 5. 写入JSON文件
         with open(file_path, 'w') as f:
             json.dump(data_to_save, f, indent=4)
-
-        print(f"Pose Saver: Saved pose data to {final_filename}")
-
-        result_filename = os.path.join(
-            subfolder, final_filename) if subfolder else final_filename
-
-        return {"ui": {"text": [result_filename]}, "result": (result_filename,)}
@@ -1,13 +1,13 @@
 import json
-import os
-import torch
-import numpy as np
-import cv2
-import math
 import folder_paths
-from PIL import Image
-from .util import draw_pose_json, draw_pose, extend_scalelist, pose_normalized
-from nodes import LoadImage
+from .util import draw_pose_json, draw_pose, extend_scalelist, pose_normalized, images_to_tensor
+from .pose_sequence import PoseSequence
+from .render_cache import ByteLRUCache, content_hash, copy_pose_data, file_signature
+from .render_quality import RENDER_QUALITY_MODES, RENDER_QUALITY_TOOLTIP
+from .dw_render import render_dw_frames
+from .pose_composite import luma_mask, composite_pose
+from .pose_tracking import select_track
+from .image_cache import load_fabric_images, load_background, editor_file_signatures
 
 OpenposeJSON = dict
 
@@ -89,9 +89,16 @@ class OLO_OpenposeEditor:
                 "output_width_for_dwpose": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 64}),
                 "output_height_for_dwpose": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 64}),
                 "scale_for_xinsr_for_dwpose": ("BOOLEAN", {"default": False}),
+                "dw_show_hands": ("BOOLEAN", {"default": False, "tooltip": "Draw hand keypoints on the DW-style outputs."}),
+                "dw_show_face": ("BOOLEAN", {"default": False, "tooltip": "Draw face keypoints on the DW-style outputs."}),
                 "canvas_width": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 64}),
                 "canvas_height": ("INT", {"default": 768, "min": 64, "max": 4096, "step": 64}),
-                "pose_filter_index": ("INT", {"default": -1, "min": -1, "max": 100, "tooltip": "Filter poses by index. -1 means show all poses."}),
+                "pose_filter_index": ("INT", {"default": -1, "min": -1, "max": 100000, "tooltip": "Filter poses by index. -1 means show all poses. With pose_filter_by_track_id this is a track ID, which can exceed the number of people in a frame."}),
+                "pose_filter_by_track_id": ("BOOLEAN", {"default": False, "tooltip": "Treat pose_filter_index as a tracked person ID (the \"id\" assigned by OLO_PoseTracker): only that person is rendered and output in every frame. An ID that no frame contains is an error."}),
+                "render_threads": ("INT", {"default": 1, "min": 0, "max": 256, "tooltip": "Number of threads used to render OLO-style frames in parallel. 1 renders frames one by one, 0 uses all CPU cores."}),
+                "pose_coordinate_space": (["auto", "normalized", "pixel"], {"default": "auto", "tooltip": "Coordinate space of the input keypoints. Auto: detect per frame (any value > 2.0 means pixel coordinates). Normalized / Pixel: skip the detection scan."}),
+                "render_quality": (RENDER_QUALITY_MODES, {"default": "fast", "tooltip": RENDER_QUALITY_TOOLTIP}),
+                "render_cache_mb": ("INT", {"default": 1024, "min": 0, "max": 65536, "tooltip": "Memory budget (MB) of this node's render cache. Outputs whose pose data and parameters did not change are reused from the cache. Each editor node keeps its own cache, so nodes with different budgets do not evict each other's entries. 0 disables and frees the cache."}),
             },
             "hidden": {
                 "savedPose": ("STRING", {"multiline": True}),
@@ -110,8 +117,10 @@ class OLO_OpenposeEditor:
     FUNCTION = "load_pose"
     CATEGORY = "OLO/pose"
 
-    # 类变量，用于存储上次的指纹，确保IS_CHANGED函数稳定运行
-    _last_fingerprints = {}
+    def __init__(self):
+        # 渲染结果缓存，每个节点实例各自一份，容量由该节点的 render_cache_mb 控制，节点运行前不占用内存
+        # 图像张量和姿态数据输出前都会复制，下游就地修改不会影响缓存
+        self._render_cache = ByteLRUCache(0)
 
     @classmethod
     def IS_CHANGED(cls, image, savedPose, backgroundImage, POSE_JSON, POSE_KEYPOINT,
@@ -120,96 +129,100 @@ class OLO_OpenposeEditor:
                    overall_scale, scalelist_behavior, match_scalelist_method, only_scale_pose_index,
                    output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose,
                    canvas_width, canvas_height, pose_filter_index, **kwargs):
-        """计算节点状态变化的指纹"""
-        fingerprint = f"{savedPose}-{backgroundImage}-{POSE_JSON}-{output_width_for_dwpose}-{output_height_for_dwpose}-{scale_for_xinsr_for_dwpose}-{canvas_width}-{canvas_height}-{pose_filter_index}"
-        return fingerprint
+        """
+        计算节点状态变化的指纹
 
-    def render_dw_pose(self, pose_json, width, height, scale_for_xinsr):
+        姿态文本和参数用 blake2b 流式计算为固定长度的摘要，图像文件用修改时间和大小参与计算，
+        长序列的 savedPose / POSE_JSON 不会被整段保存和比较。
+        """
+        return content_hash(savedPose, POSE_JSON, output_width_for_dwpose, output_height_for_dwpose,
+                            scale_for_xinsr_for_dwpose, canvas_width, canvas_height, pose_filter_index,
+                            editor_file_signatures(image, backgroundImage))
+
+    def _render_olo_pose(self, pose_source, poses, show_body, show_face, show_hands, resolution_x, pose_marker_size,
+                         face_marker_size, hand_marker_size, hands_scale, body_scale, head_scale, overall_scale,
+                         scalelist_behavior, match_scalelist_method, only_scale_pose_index, render_threads,
+                         pose_coordinate_space, render_quality="fast"):
         """
-        渲染DW风格的姿态图像
+        生成OLO风格的姿态图像
 
         Args:
-            pose_json: 姿态JSON数据
-            width: 输出图像宽度
-            height: 输出图像高度
-            scale_for_xinsr: 是否为XinSR模型调整线条宽度
+            pose_source: 姿态数据（JSON字符串或POSE_KEYPOINT），None表示没有姿态数据
+            poses: 已经解析好的PoseSequence，None时从pose_source解析
 
         Returns:
-            RGB格式的NumPy数组
+            tuple: (姿态图像张量, 缩放后的姿态关键点, 姿态JSON字符串)
         """
-        if not pose_json or not pose_json.strip():
-            return np.zeros((height, width, 3), dtype=np.uint8)
-        try:
-            data = json.loads(pose_json)
-        except json.JSONDecodeError:
-            return np.zeros((height, width, 3), dtype=np.uint8)
-
-        target_w, target_h = width, height
-        original_w, original_h = data.get(
-            'width', target_w), data.get('height', target_h)
-        scale_x, scale_y = target_w / original_w, target_h / original_h
-
-        canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
-        people = data.get('people', [])
-        if not people:
-            return canvas
-
-        limbSeq = [[2, 3], [2, 6], [3, 4], [4, 5], [6, 7], [7, 8], [2, 9], [9, 10], [
-            10, 11], [2, 12], [12, 13], [13, 14], [2, 1], [1, 15], [15, 17], [1, 16], [16, 18]]
-        colors = [[255, 0, 0], [255, 85, 0], [255, 170, 0], [255, 255, 0], [170, 255, 0], [85, 255, 0], [0, 255, 0], [0, 255, 85], [0, 255, 170], [
-            0, 255, 255], [0, 170, 255], [0, 85, 255], [0, 0, 255], [85, 0, 255], [170, 0, 255], [255, 0, 255], [255, 0, 170], [255, 0, 85]]
-
-        BASE_RESOLUTION_SIDE = 512.0
-        base_thickness = 2.0
-        target_max_side = max(target_w, target_h)
-        scale_factor = target_max_side / BASE_RESOLUTION_SIDE
-        scaled_joint_radius = int(max(1, base_thickness * scale_factor))
-        scaled_stickwidth = scaled_joint_radius
-
-        if scale_for_xinsr:
-            xinsr_stick_scale = 1 if target_max_side < 500 else min(
-                2 + (target_max_side // 1000), 7)
-            scaled_stickwidth *= xinsr_stick_scale
-
-        for person in people:
-            keypoints_flat = person.get('pose_keypoints_2d', [])
-            keypoints = [(int(keypoints_flat[i] * scale_x), int(keypoints_flat[i+1] * scale_y))
-                         if keypoints_flat[i+2] > 0 else None for i in range(0, len(keypoints_flat), 3)]
-
-            for limb_indices, color in zip(limbSeq, colors):
-                k1_idx, k2_idx = limb_indices[0] - 1, limb_indices[1] - 1
-                if k1_idx >= len(keypoints) or k2_idx >= len(keypoints):
-                    continue
-                p1, p2 = keypoints[k1_idx], keypoints[k2_idx]
-                if p1 is None or p2 is None:
-                    continue
-
-                Y, X = np.array([p1[0], p2[0]]), np.array([p1[1], p2[1]])
-                mX, mY = np.mean(X), np.mean(Y)
-                length = np.sqrt((X[0] - X[1])**2 + (Y[0] - Y[1])**2)
-                angle = math.degrees(math.atan2(X[0] - X[1], Y[0] - Y[1]))
-
-                polygon = cv2.ellipse2Poly((int(mY), int(mX)), (int(
-                    length / 2), scaled_stickwidth), int(angle), 0, 360, 1)
-                cv2.fillConvexPoly(canvas, polygon, [
-                                   int(c * 0.6) for c in color])
-
-            for i, keypoint in enumerate(keypoints):
-                if keypoint is None:
-                    continue
-                if i >= len(colors):
-                    continue
-                cv2.circle(canvas, keypoint, scaled_joint_radius,
-                           colors[i], thickness=-1)
-
-        return cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)  # 返回RGB格式的NumPy数组
+        pose_imgs_tensor = None
+        pose_data = None
+        pose_json_str = ""
+
+        # 如果有姿态数据，生成OLO风格的姿态图像
+        if pose_source is not None:
+            try:
+                # 只解析一次，之后的缩放、归一化和绘制都直接使用 PoseSequence，JSON 只在输出时生成
+                if poses is None:
+                    # 标准化JSON格式
+                    poses = PoseSequence.from_json(pose_source.replace(
+                        "'", '"').replace('None', '[]'))
+
+                # 生成OLO风格的姿势图像
+                hands_scalelist, body_scalelist, head_scalelist, overall_scalelist = extend_scalelist(
+                    scalelist_behavior, poses, hands_scale, body_scale, head_scale, overall_scale,
+                    match_scalelist_method, only_scale_pose_index)
+                normalized_poses = pose_normalized(poses, pose_coordinate_space)
+                pose_imgs, POSE_PASS_SCALED = draw_pose_json(normalized_poses, resolution_x, show_body, show_face, show_hands,
+                                                             pose_marker_size, face_marker_size, hand_marker_size, hands_scalelist, body_scalelist, head_scalelist, overall_scalelist,
+                                                             num_workers=render_threads, quality=render_quality,
+                                                             frame_cache=self._render_cache if self._render_cache.max_bytes else None)
+
+                if pose_imgs:
+                    pose_imgs_tensor = images_to_tensor(pose_imgs)
+                    pose_data = POSE_PASS_SCALED
+                    pose_json_str = json.dumps(POSE_PASS_SCALED, indent=4)
+            except Exception as e:
+                print(f"Error processing pose data: {e}")
+
+        # 如果没有生成OLO风格的姿态图像，创建空白图像
+        if pose_imgs_tensor is None:
+            W = 512
+            H = 768
+            pose_draw = dict(
+                bodies={'candidate': [], 'subset': []}, faces=[], hands=[])
+            pose_out = dict(pose_keypoints_2d=[], face_keypoints_2d=[],
+                            hand_left_keypoints_2d=[], hand_right_keypoints_2d=[])
+            pose_data = {"people": [pose_out],
+                         "canvas_height": H, "canvas_width": W}
+
+            W_scaled = resolution_x
+            if resolution_x < 64:
+                W_scaled = W
+            H_scaled = int(H*(W_scaled*1.0/W))
+            pose_img = [draw_pose(pose_draw, H_scaled, W_scaled,
+                                  pose_marker_size, face_marker_size, hand_marker_size, render_quality)]
+            pose_imgs_tensor = images_to_tensor(pose_img)
+            pose_json_str = json.dumps(pose_data)
+
+        return pose_imgs_tensor, pose_data, pose_json_str
+
+    def _composite_dw_background(self, dw_pose_image, bg_image_path):
+        """将DW风格的姿态图像合成到背景图上，没有背景时返回纯姿态图"""
+        bg_image = None
+        if bg_image_path is not None:
+            bg_image = load_background(bg_image_path, dw_pose_image.shape[1], dw_pose_image.shape[2])
+        if bg_image is None:
+            # 如果没有背景或背景文件找不到，就返回纯姿态图
+            return dw_pose_image
+        return composite_pose(dw_pose_image, bg_image, luma_mask(dw_pose_image))
 
     def load_pose(self, image="", savedPose="", backgroundImage="", POSE_JSON="", POSE_KEYPOINT=None,
                   show_body=True, show_face=True, show_hands=True, resolution_x=-1, pose_marker_size=4,
                   face_marker_size=3, hand_marker_size=2, hands_scale=1.0, body_scale=1.0, head_scale=1.0,
                   overall_scale=1.0, scalelist_behavior="poses", match_scalelist_method="loop extend",
                   only_scale_pose_index=99, output_width_for_dwpose=512, output_height_for_dwpose=512,
-                  scale_for_xinsr_for_dwpose=False, canvas_width=512, canvas_height=768, pose_filter_index=-1):
+                  scale_for_xinsr_for_dwpose=False, canvas_width=512, canvas_height=768, pose_filter_index=-1,
+                  render_threads=1, pose_coordinate_space="auto", render_cache_mb=1024, dw_show_hands=False,
+                  dw_show_face=False, render_quality="fast", pose_filter_by_track_id=False):
         '''
         加载姿势数据并生成姿势图像，支持多种输出格式
 
@@ -239,6 +252,13 @@ class OLO_OpenposeEditor:
             canvas_width: 画布宽度
             canvas_height: 画布高度
             pose_filter_index: 姿态过滤器索引
+            render_threads: 并行渲染OLO风格帧的线程数，0表示使用全部CPU核心
+            pose_coordinate_space: 输入关键点的坐标空间，auto表示逐帧自动检测
+            render_cache_mb: 本节点渲染缓存的内存上限（MB），0表示不缓存并释放缓存
+            dw_show_hands: DW风格图像是否绘制手部关键点
+            dw_show_face: DW风格图像是否绘制面部关键点
+            render_quality: OLO风格图像的绘制质量模式
+            pose_filter_by_track_id: 是否把 pose_filter_index 作为轨迹 id，只保留该人物
 
         Returns:
             tuple: 包含多种输出的元组
@@ -250,129 +270,96 @@ class OLO_OpenposeEditor:
                 - dw_pose_image: DW风格的纯姿态图像
                 - dw_combined_image: DW风格的合成图像
         '''
-        # 初始化所有输出
-        pose_imgs_np = None
-        pose_data = None
-        pose_json_str = ""
-        pose_image_fabric = None
-        combined_image_fabric = None
-        dw_pose_image = None
-        dw_combined_image = None
+        self._render_cache.resize(max(0, render_cache_mb) * 1024 * 1024)
 
         # 处理姿态数据 - 优先使用savedPose，然后是POSE_JSON，最后是POSE_KEYPOINT
         pose_source = None
         if savedPose and savedPose.strip():
             pose_source = savedPose
-            pose_json_str = savedPose
         elif POSE_JSON and POSE_JSON.strip():
             pose_source = POSE_JSON
-            pose_json_str = POSE_JSON
         elif POSE_KEYPOINT is not None:
-            pose_source = json.dumps(POSE_KEYPOINT, indent=4)
-            pose_json_str = pose_source
-
-        # 如果有姿态数据，生成OLO风格的姿态图像
-        if pose_source:
+            pose_source = POSE_KEYPOINT
+
+        # 按轨迹 id 过滤人物，过滤后按 POSE_KEYPOINT 处理
+        # 轨迹 id 在所有帧中都不存在时报错，而不是静默输出空白姿态
+        if pose_filter_by_track_id and pose_filter_index >= 0 and pose_source is not None:
+            if isinstance(pose_source, str):
+                try:
+                    pose_source = json.loads(pose_source.replace("'", '"').replace('None', '[]'))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Cannot filter by track id {pose_filter_index}: pose data is not valid JSON: {e}")
+            if isinstance(pose_source, dict):
+                pose_source = [pose_source]
+            pose_source = select_track(pose_source, pose_filter_index)
+            if not any(isinstance(frame, dict) and frame.get('people') for frame in pose_source):
+                raise ValueError(f"No person with track id {pose_filter_index} in the pose data")
+
+        # 字符串直接计算指纹；POSE_KEYPOINT 先转换为 PoseSequence，再用数组内容和其他字段（如人物 id）计算指纹
+        poses = None
+        if isinstance(pose_source, str):
+            source_key = content_hash("json", pose_source)
+        elif pose_source is not None:
             try:
-                # 标准化JSON格式
-                pose_source = pose_source.replace(
-                    "'", '"').replace('None', '[]')
-
-                # 解析JSON并生成OLO风格的姿势图像
-                hands_scalelist, body_scalelist, head_scalelist, overall_scalelist = extend_scalelist(
-                    scalelist_behavior, pose_source, hands_scale, body_scale, head_scale, overall_scale,
-                    match_scalelist_method, only_scale_pose_index)
-                normalized_pose_json = pose_normalized(pose_source)
-                pose_imgs, POSE_PASS_SCALED = draw_pose_json(normalized_pose_json, resolution_x, show_body, show_face, show_hands,
-                                                             pose_marker_size, face_marker_size, hand_marker_size, hands_scalelist, body_scalelist, head_scalelist, overall_scalelist)
-
-                if pose_imgs:
-                    pose_imgs_np = np.array(pose_imgs).astype(np.float32) / 255
-                    pose_data = POSE_PASS_SCALED
-                    pose_json_str = json.dumps(POSE_PASS_SCALED, indent=4)
+                poses = PoseSequence.from_keypoints(pose_source)
+                source_key = content_hash("keypoint", poses.keypoints, poses.part_lengths, poses.people_counts,
+                                          poses.canvas_sizes, poses.has_people, poses.extras)
             except Exception as e:
                 print(f"Error processing pose data: {e}")
-
-        # 如果没有生成OLO风格的姿态图像，创建空白图像
-        if pose_imgs_np is None:
-            W = 512
-            H = 768
-            pose_draw = dict(
-                bodies={'candidate': [], 'subset': []}, faces=[], hands=[])
-            pose_out = dict(pose_keypoints_2d=[], face_keypoints_2d=[],
-                            hand_left_keypoints_2d=[], hand_right_keypoints_2d=[])
-            pose_data = {"people": [pose_out],
-                         "canvas_height": H, "canvas_width": W}
-
-            W_scaled = resolution_x
-            if resolution_x < 64:
-                W_scaled = W
-            H_scaled = int(H*(W_scaled*1.0/W))
-            pose_img = [draw_pose(pose_draw, H_scaled, W_scaled,
-                                  pose_marker_size, face_marker_size, hand_marker_size)]
-            pose_imgs_np = np.array(pose_img).astype(np.float32) / 255
-            pose_json_str = json.dumps(pose_data)
-
-        # 处理原始Fabric.js风格的图像
-        if image and image.strip():
-            # 使用LoadImage节点加载图像
-            load_image = LoadImage()
-            pose_image_fabric, _ = load_image.load_image(image)
-
-            base_name, ext = os.path.splitext(image)
-            combined_image_name = f"{base_name}_combined{ext}"
-            combined_image_path = folder_paths.get_annotated_filepath(
-                combined_image_name)
-
-            if not os.path.exists(combined_image_path):
-                combined_image_fabric = pose_image_fabric
-            else:
-                combined_image_fabric, _ = load_image.load_image(
-                    combined_image_name)
-        else:
-            # 如果image为空，创建一个默认的空白图像
-            W = 512
-            H = 768
-            blank_image_np = np.ones((H, W, 3), dtype=np.float32) * 0.5
-            pose_image_fabric = torch.from_numpy(blank_image_np).unsqueeze(0)
-            combined_image_fabric = pose_image_fabric
-
-        # 生成DW风格的姿态图像
-        dw_pose_np = self.render_dw_pose(
-            pose_json_str, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose)
-        dw_pose_image = torch.from_numpy(
-            dw_pose_np.astype(np.float32) / 255.0).unsqueeze(0)
+                pose_source = None
+        if pose_source is None:
+            source_key = None
+
+        # 每个输出只依赖部分参数，分别缓存：只改动无关参数时直接复用
+        scaled_key = ("scaled", source_key, resolution_x, repr((hands_scale, body_scale, head_scale, overall_scale)),
+                      scalelist_behavior, match_scalelist_method, only_scale_pose_index, pose_coordinate_space)
+        olo_image_key = ("olo_image", scaled_key, show_body, show_face, show_hands,
+                         pose_marker_size, face_marker_size, hand_marker_size, render_quality)
+        scaled = self._render_cache.get(scaled_key)
+        pose_imgs = self._render_cache.get(olo_image_key)
+        if scaled is None or pose_imgs is None:
+            pose_imgs_tensor, pose_data, pose_json_str = self._render_olo_pose(
+                pose_source, poses, show_body, show_face, show_hands, resolution_x, pose_marker_size,
+                face_marker_size, hand_marker_size, hands_scale, body_scale, head_scale, overall_scale,
+                scalelist_behavior, match_scalelist_method, only_scale_pose_index, render_threads,
+                pose_coordinate_space, render_quality)
+            pose_imgs = self._render_cache.put(olo_image_key, pose_imgs_tensor)
+            if scaled is None:
+                scaled = self._render_cache.put(scaled_key, (pose_data, pose_json_str),
+                                                nbytes=4 * len(pose_json_str))
+        pose_data, pose_json_str = scaled
+        # 缓存中的姿态数据与下游共享会被就地修改污染，输出副本
+        pose_data = copy_pose_data(pose_data)
+
+        # 处理原始Fabric.js风格的图像，解码结果由共享的图像缓存按文件签名缓存
+        pose_image_fabric, combined_image_fabric = load_fabric_images(image)
+
+        # 生成DW风格的姿态图像，每帧姿态输出一帧
+        dw_layers = ("body",) + (("hands",) if dw_show_hands else ()) + (("face",) if dw_show_face else ())
+        dw_key = ("dw", scaled_key, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose,
+                  dw_layers)
+        dw_pose_image = self._render_cache.get(dw_key)
+        if dw_pose_image is None:
+            dw_pose_image = self._render_cache.put(dw_key, images_to_tensor(render_dw_frames(
+                pose_json_str, output_width_for_dwpose, output_height_for_dwpose, scale_for_xinsr_for_dwpose, dw_layers)))
 
         # 生成DW风格的合成图像
+        bg_image_path = None
         if backgroundImage and backgroundImage.strip() != "":
-            # 1. 加载背景图
-            bg_image_path = folder_paths.get_annotated_filepath(
-                backgroundImage)
-            if os.path.exists(bg_image_path):
-                bg_image_pil = Image.open(bg_image_path)
-                bg_image_np = np.array(bg_image_pil.convert("RGB"))
-
-                # 2. 缩放背景图到目标尺寸
-                bg_image_resized = cv2.resize(
-                    bg_image_np, (output_width_for_dwpose, output_height_for_dwpose), interpolation=cv2.INTER_AREA)
-
-                # 3. 创建蒙版并进行合成
-                dw_pose_gray = cv2.cvtColor(dw_pose_np, cv2.COLOR_RGB2GRAY)
-                _, mask = cv2.threshold(
-                    dw_pose_gray, 1, 255, cv2.THRESH_BINARY)
-
-                # 4. 使用蒙版将骨骼"粘贴"到背景上
-                dw_combined_np = bg_image_resized.copy()
-                dw_combined_np[mask != 0] = dw_pose_np[mask != 0]
-
-                dw_combined_image = torch.from_numpy(
-                    dw_combined_np.astype(np.float32) / 255.0).unsqueeze(0)
-            else:
-                # 如果背景文件找不到，就返回纯姿态图
-                dw_combined_image = dw_pose_image
-        else:
-            # 如果没有背景，则合成图就是纯姿态图
-            dw_combined_image = dw_pose_image
+            bg_image_path = folder_paths.get_annotated_filepath(backgroundImage)
+        dw_combined_key = ("dw_combined", dw_key, bg_image_path, file_signature(bg_image_path) if bg_image_path else None)
+        dw_combined_image = self._render_cache.get(dw_combined_key)
+        if dw_combined_image is None:
+            dw_combined_image = self._composite_dw_background(dw_pose_image, bg_image_path)
+            # 没有背景时合成图就是纯姿态图本身，不重复计入缓存容量
+            self._render_cache.put(dw_combined_key, dw_combined_image,
+                                   nbytes=0 if dw_combined_image is dw_pose_image else None)
+
+        # 缓存中的图像与下游共享会被就地修改污染，输出副本；没有背景时合成图与纯姿态图仍是同一个张量
+        pose_imgs = pose_imgs.clone()
+        dw_output = dw_pose_image.clone()
+        dw_combined_image = dw_output if dw_combined_image is dw_pose_image else dw_combined_image.clone()
+        dw_pose_image = dw_output
 
         # 返回所有结果
         return {
@@ -383,7 +370,7 @@ class OLO_OpenposeEditor:
                 "canvas_height": [canvas_height],
                 "pose_filter_index": [pose_filter_index]
             },
-            "result": (torch.from_numpy(pose_imgs_np), pose_data, pose_json_str, pose_image_fabric, combined_image_fabric, dw_pose_image, dw_combined_image)
+            "result": (pose_imgs, pose_data, pose_json_str, pose_image_fabric, combined_image_fabric, dw_pose_image, dw_combined_image)
         }
 
 
@@ -414,15 +401,10 @@ class OLO_OriginalOpenPoseEditor:
 
     @classmethod
     def IS_CHANGED(cls, image, savedPose, backgroundImage, **kwargs):
-        # 高效地计算并返回指纹
-        fingerprint = f"{savedPose}-{backgroundImage}"
-        return fingerprint
+        # 姿态文本的摘要与图像文件签名组成固定长度的指纹
+        return content_hash(savedPose, editor_file_signatures(image, backgroundImage))
 
     def get_images(self, image, savedPose="", backgroundImage=""):
-        # 初始化返回的图像
-        pose_image_fabric = None
-        combined_image_fabric = None
-
         # 解析savedPose为POSE_KEYPOINT格式
         pose_data = {
             "people": [{"pose_keypoints_2d": [], "face_keypoints_2d": [], "hand_left_keypoints_2d": [], "hand_right_keypoints_2d": []}],
@@ -439,29 +421,8 @@ class OLO_OriginalOpenPoseEditor:
 
         pose_json_str = json.dumps(pose_data)
 
-        # 只有当image不为空时才加载图像
-        if image and image.strip():
-            # 使用正确的方式调用LoadImage节点
-            load_image = LoadImage()
-            pose_image_fabric, _ = load_image.load_image(image)
-
-            base_name, ext = os.path.splitext(image)
-            combined_image_name = f"{base_name}_combined{ext}"
-            combined_image_path = folder_paths.get_annotated_filepath(
-                combined_image_name)
-
-            if not os.path.exists(combined_image_path):
-                combined_image_fabric = pose_image_fabric
-            else:
-                combined_image_fabric, _ = load_image.load_image(
-                    combined_image_name)
-        else:
-            # 如果image为空，创建一个默认的空白图像
-            W = 512
-            H = 768
-            blank_image_np = np.ones((H, W, 3), dtype=np.float32) * 0.5
-            pose_image_fabric = torch.from_numpy(blank_image_np).unsqueeze(0)
-            combined_image_fabric = pose_image_fabric
+        # 加载Fabric.js风格的图像，解码结果由共享的图像缓存按文件签名缓存
+        pose_image_fabric, combined_image_fabric = load_fabric_images(image)
 
         # 返回结果，支持UI输出
         return {
@@ -0,0 +1,143 @@
+import os
+
+import folder_paths
+
+from .pose_io import (resolve_output_path, filename_counter, write_pose_binary, MappedPoseFrames,
+                      POSE_BINARY_EXTENSION)
+from .pose_view import PoseSequenceView, is_frame_sequence
+from .render_cache import file_signature
+
+
+def resolve_pose_file(path):
+    """
+    查找姿态文件
+
+    绝对路径直接使用；相对路径先按 ComfyUI 的标注规则（如 "pose.olopose [output]"）查找，
+    默认在 input 目录，找不到时再在 output 目录中查找，便于直接读取保存节点输出的文件名。
+    """
+    path = path.strip()
+    if os.path.isabs(path):
+        return path
+    candidate = folder_paths.get_annotated_filepath(path)
+    if os.path.exists(candidate):
+        return candidate
+    return os.path.join(folder_paths.get_output_directory(), path)
+
+
+class OLO_SavePoseSequence:
+    """把姿态序列保存为可内存映射的二进制文件（float32 关键点数组 + JSON 头部）"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        """定义节点输入类型
+
+        Returns:
+            dict: 输入类型定义
+        """
+        return {
+            "required": {
+                "pose_keypoint": ("POSE_KEYPOINT",),
+                "filename_prefix": ("STRING", {"default": "poses/pose"}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("filename",)
+    FUNCTION = "save"
+    OUTPUT_NODE = True
+    CATEGORY = "OLO/Pose"
+
+    def save(self, pose_keypoint, filename_prefix="poses/pose"):
+        """保存姿态序列
+
+        Args:
+            pose_keypoint: 输入姿态关键点数据
+            filename_prefix: 输出文件名前缀，相对于 output 目录
+
+        Returns:
+            dict: UI 显示的文件名和 (文件名,)
+        """
+        if pose_keypoint is None:
+            frames = []
+        elif is_frame_sequence(pose_keypoint):
+            frames = pose_keypoint
+        else:
+            frames = [pose_keypoint]
+
+        output_dir = folder_paths.get_output_directory()
+        full_output_folder, filename, subfolder = resolve_output_path(output_dir, filename_prefix)
+        os.makedirs(full_output_folder, exist_ok=True)
+        counter = filename_counter.next(full_output_folder, filename, POSE_BINARY_EXTENSION)
+        final_filename = f"{filename}_{counter:05d}{POSE_BINARY_EXTENSION}"
+        write_pose_binary(os.path.join(full_output_folder, final_filename), frames)
+
+        result_filename = os.path.join(subfolder, final_filename) if subfolder else final_filename
+        return {"ui": {"text": [result_filename]}, "result": (result_filename,)}
+
+
+class OLO_LoadPoseSequence:
+    """
+    读取 OLO_SavePoseSequence 保存的二进制姿态文件
+
+    文件以内存映射方式打开，默认一次读取选中的帧并输出普通的帧字典列表；
+    开启 zero_copy 时输出帧视图，只有被访问的帧才会从磁盘读取，
+    可直接连接 OLO_DrawPoseKeypoint、OLO_KeypointSelector 等本插件的节点。
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        """定义节点输入类型
+
+        Returns:
+            dict: 输入类型定义
+        """
+        return {
+            "required": {
+                "file": ("STRING", {"default": "", "tooltip": "Pose file path. Absolute, relative to the input folder, or relative to the output folder (the filename returned by OLO_SavePoseSequence)."}),
+            },
+            "optional": {
+                "frame_selection": ("STRING", {"default": "", "tooltip": "Frames to load: a slice like 0:100:4, an index list like 1, 5, 9, or mask:0110... Only the selected frames are read from disk. Empty loads every frame."}),
+                "zero_copy": ("BOOLEAN", {"default": False, "tooltip": "Output a read-only view that reads frames from the memory-mapped file only when they are accessed, instead of a list of frames. Loads long sequences almost instantly, but the view is not a list: it cannot be JSON-serialised or appended to, so only enable it when every consumer is a node from this pack."}),
+            }
+        }
+
+    RETURN_TYPES = ("POSE_KEYPOINT", "INT")
+    RETURN_NAMES = ("pose_keypoint", "frame_count")
+    FUNCTION = "load"
+    CATEGORY = "OLO/Pose"
+
+    @classmethod
+    def IS_CHANGED(cls, file, frame_selection="", **kwargs):
+        # 文件内容变化时修改时间或大小随之变化，不需要读取文件
+        return f"{file_signature(resolve_pose_file(file))}-{frame_selection}"
+
+    def load(self, file, frame_selection="", zero_copy=False):
+        """读取姿态文件
+
+        Args:
+            file: 姿态文件路径
+            frame_selection: 要读取的帧，为空时读取全部帧
+            zero_copy: 是否输出按需读取的帧视图
+
+        Returns:
+            tuple: (姿态关键点帧列表或帧视图, 帧数)
+        """
+        path = resolve_pose_file(file)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Pose file not found: {file}")
+        frames = PoseSequenceView(MappedPoseFrames(path))
+        if frame_selection and frame_selection.strip():
+            frames = frames.select(frame_selection)
+        if not zero_copy:
+            frames = frames.to_list()
+        return (frames, len(frames))
+
+
+NODE_CLASS_MAPPINGS = {
+    "OLO_SavePoseSequence": OLO_SavePoseSequence,
+    "OLO_LoadPoseSequence": OLO_LoadPoseSequence,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "OLO_SavePoseSequence": "OLO_SavePoseSequence",
+    "OLO_LoadPoseSequence": "OLO_LoadPoseSequence",
+}
@@ -0,0 +1,248 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .pose_sequence import PoseSequence, PART_KEYS
+
+FILTER_TYPES = ["one_euro", "ema", "savitzky_golay", "none"]
+
+
+def _track_neighbours(valid):
+    """
+    沿帧方向查找每个位置前后最近的有效帧
+
+    Args:
+        valid: (F, ...) 有效掩码
+
+    Returns:
+        tuple: (前一个有效帧, 后一个有效帧)，前面没有时为 -1，后面没有时为 F；当前帧有效时两者都等于当前帧
+    """
+    F = valid.shape[0]
+    t = np.arange(F).reshape((F,) + (1,) * (valid.ndim - 1))
+    prev = np.maximum.accumulate(np.where(valid, t, -1), axis=0)
+    next_ = np.minimum.accumulate(np.where(valid, t, F)[::-1], axis=0)[::-1]
+    return prev, next_
+
+
+def fill_gaps(points, valid, present, max_gap):
+    """
+    对短时缺失的关键点做线性插值
+
+    缺失段前后都有有效帧且长度不超过 max_gap 时，坐标和置信度都按前后两帧线性插值，
+    插值点的置信度因此由两端的置信度加权得到。
+
+    Args:
+        points: (F, P, K, 3) 关键点数组，原地修改
+        valid: (F, P, K) 有效掩码，原地更新
+        present: (F, P, K) 该位置在原始数据中是否存在（只在存在的位置补点）
+        max_gap: 允许插值的最长缺失帧数
+
+    Returns:
+        np.array: (F, P, K) 补点位置的掩码
+    """
+    if max_gap <= 0 or points.shape[0] < 3:
+        return np.zeros(valid.shape, dtype=bool)
+    F = points.shape[0]
+    prev, next_ = _track_neighbours(valid)
+    filled = present & ~valid & (prev >= 0) & (next_ < F) & (next_ - prev - 1 <= max_gap)
+    if not filled.any():
+        return filled
+
+    f, p, k = np.nonzero(filled)
+    f0, f1 = prev[f, p, k], next_[f, p, k]
+    w = ((f - f0) / (f1 - f0))[:, None]
+    points[f, p, k] = points[f0, p, k] * (1.0 - w) + points[f1, p, k] * w
+    valid |= filled
+    return filled
+
+
+def _hold_fill(values, valid):
+    """用最近的有效帧填充无效位置（先向前再向后），供窗口滤波使用"""
+    prev, next_ = _track_neighbours(valid)
+    source = np.where(prev >= 0, prev, np.minimum(next_, valid.shape[0] - 1))
+    return np.take_along_axis(values, source[..., None], axis=0)
+
+
+def savgol_coefficients(window, order):
+    """Savitzky-Golay 平滑系数（窗口中心点的最小二乘多项式拟合值）"""
+    half = window // 2
+    A = np.vander(np.arange(-half, half + 1, dtype=np.float64), order + 1, increasing=True)
+    return np.linalg.pinv(A)[0]
+
+
+def savgol_filter(xy, valid, window, order):
+    """
+    沿帧方向做 Savitzky-Golay 平滑
+
+    无效位置先用最近的有效帧填充，两端按边缘值延拓，之后用滑动窗口视图一次完成所有轨迹的卷积。
+    """
+    window = min(window, xy.shape[0] if xy.shape[0] % 2 else xy.shape[0] - 1)
+    if window < 3 or order >= window:
+        return xy
+    half = window // 2
+    held = _hold_fill(xy, valid)
+    padded = np.pad(held, [(half, half)] + [(0, 0)] * (xy.ndim - 1), mode="edge")
+    windows = sliding_window_view(padded, window, axis=0)
+    return windows @ savgol_coefficients(window, order)
+
+
+def _smoothing_factor(cutoff, rate):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau * rate)
+
+
+def recursive_filter(xy, valid, confidence, filter_type, fps=30.0, min_cutoff=1.0, beta=0.0, d_cutoff=1.0,
+                     ema_alpha=0.5, confidence_weighted=False):
+    """
+    按帧递推的 One-Euro / EMA 滤波，每一步同时处理所有人物和关键点
+
+    轨迹在无效帧之后重新开始，不会把缺失前的状态拖到新的检测上。
+
+    Args:
+        xy: (F, P, K, 2) 坐标
+        valid: (F, P, K) 有效掩码
+        confidence: (F, P, K) 置信度，confidence_weighted 时用于调节每一步的平滑系数
+        filter_type: "one_euro" 或 "ema"
+
+    Returns:
+        np.array: (F, P, K, 2) 滤波后的坐标
+    """
+    out = xy.copy()
+    state = xy[0].copy()
+    d_state = np.zeros_like(state)
+    alive = valid[0].copy()
+    a_d = _smoothing_factor(d_cutoff, fps)
+    weight = np.clip(confidence, 0.0, 1.0)[..., None]
+
+    for t in range(1, xy.shape[0]):
+        x = xy[t]
+        if filter_type == "ema":
+            alpha = np.full(x.shape, ema_alpha)
+        else:
+            d_state = d_state + a_d * ((x - state) * fps - d_state)
+            cutoff = min_cutoff + beta * np.abs(d_state)
+            alpha = 1.0 / (1.0 + fps / (2 * math.pi * cutoff))
+        if confidence_weighted:
+            alpha = alpha * weight[t]
+        smoothed = state + alpha * (x - state)
+
+        # 上一帧无效的轨迹从当前值重新开始
+        restart = (~alive)[..., None]
+        state = np.where(restart, x, smoothed)
+        d_state = np.where(restart, 0.0, d_state)
+        current = valid[t]
+        out[t] = np.where(current[..., None], state, x)
+        alive = current
+    return out
+
+
+class OLO_PoseFilter:
+    """姿态序列的时间平滑节点：抑制检测结果的帧间抖动，并补齐短时缺失的关键点"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        """定义节点输入类型
+
+        Returns:
+            dict: 输入类型定义
+        """
+        return {
+            "required": {
+                "pose_keypoint": ("POSE_KEYPOINT",),
+                "filter_type": (FILTER_TYPES, {"default": "one_euro", "tooltip": "one_euro: adaptive low-pass, smooth when still and responsive when moving. ema: fixed exponential moving average. savitzky_golay: centred polynomial window, keeps peaks better. none: only fill gaps."}),
+            },
+            "optional": {
+                "fps": ("FLOAT", {"default": 30.0, "min": 1.0, "max": 240.0, "step": 1.0, "tooltip": "Frame rate of the sequence, used by the One-Euro filter."}),
+                "min_cutoff": ("FLOAT", {"default": 1.0, "min": 0.001, "max": 30.0, "step": 0.05, "tooltip": "One-Euro minimum cutoff frequency (Hz). Lower removes more jitter at rest."}),
+                "beta": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 100.0, "step": 0.01, "tooltip": "One-Euro speed coefficient. Higher reduces lag on fast motion. Depends on the coordinate scale (normalized vs pixel)."}),
+                "d_cutoff": ("FLOAT", {"default": 1.0, "min": 0.001, "max": 30.0, "step": 0.05, "tooltip": "One-Euro cutoff frequency of the speed estimate (Hz)."}),
+                "ema_alpha": ("FLOAT", {"default": 0.5, "min": 0.01, "max": 1.0, "step": 0.01, "tooltip": "EMA weight of the current frame. Lower is smoother."}),
+                "savgol_window": ("INT", {"default": 7, "min": 3, "max": 101, "step": 2, "tooltip": "Savitzky-Golay window length in frames (odd)."}),
+                "savgol_order": ("INT", {"default": 2, "min": 1, "max": 6, "tooltip": "Savitzky-Golay polynomial order, must be smaller than the window."}),
+                "confidence_threshold": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.01, "tooltip": "Keypoints with confidence at or below this value are treated as missing."}),
+                "max_gap_frames": ("INT", {"default": 0, "min": 0, "max": 1000, "tooltip": "Fill missing keypoints by interpolating between the surrounding detections when the gap is at most this many frames. Filled confidence is interpolated from both ends. 0 disables gap filling."}),
+                "confidence_weighted": ("BOOLEAN", {"default": False, "tooltip": "Scale the One-Euro / EMA step by keypoint confidence so low-confidence detections move the track less."}),
+            }
+        }
+
+    RETURN_TYPES = ("POSE_KEYPOINT",)
+    RETURN_NAMES = ("pose_keypoint",)
+    FUNCTION = "filter"
+    CATEGORY = "OLO/Pose"
+
+    def filter(self, pose_keypoint, filter_type, fps=30.0, min_cutoff=1.0, beta=0.0, d_cutoff=1.0, ema_alpha=0.5,
+               savgol_window=7, savgol_order=2, confidence_threshold=0.0, max_gap_frames=0, confidence_weighted=False):
+        """平滑姿态关键点序列
+
+        人物按在每帧列表中的位置对应，所有帧、人物、关键点在一个 (帧, 人物, 关键点, 3) 数组上一次处理。
+
+        Args:
+            pose_keypoint: 输入姿态关键点数据
+            filter_type: 滤波方式，见 FILTER_TYPES
+            其余参数见 INPUT_TYPES 中的说明
+
+        Returns:
+            tuple: (平滑后的姿态关键点,)
+        """
+        if pose_keypoint is None:
+            return (None,)
+        frames = [pose_keypoint] if isinstance(pose_keypoint, dict) else list(pose_keypoint)
+        if len(frames) < 2:
+            return (frames,)
+
+        poses = PoseSequence.from_keypoints(frames)
+        points = poses.keypoints
+        present = poses.point_mask()
+        valid = present & (points[..., 2] > confidence_threshold)
+        filled = fill_gaps(points, valid, present, max_gap_frames)
+
+        xy = points[..., :2]
+        if filter_type == "savitzky_golay":
+            smoothed = savgol_filter(xy, valid, savgol_window, savgol_order)
+        elif filter_type in ("one_euro", "ema"):
+            smoothed = recursive_filter(xy, valid, points[..., 2], filter_type, fps, min_cutoff, beta, d_cutoff,
+                                        ema_alpha, confidence_weighted)
+        else:
+            smoothed = xy
+        points[..., :2] = np.where(valid[..., None], smoothed, xy)
+
+        changed = valid if filter_type != "none" else filled
+        return (self._write_back(frames, poses, changed),)
+
+    @staticmethod
+    def _write_back(frames, poses, changed):
+        """
+        把数组写回帧字典
+
+        只替换有改动的人物的关键点字段，帧和人物字典中的其他字段（如 id、画布尺寸）原样保留，未改动的帧直接共享。
+        """
+        if not changed.any():
+            return frames
+        # 每个人物的关键点展开为一维列表，字段直接按区间切片
+        keypoints = poses.keypoints.reshape(poses.num_frames, poses.max_people, -1).tolist()
+        lengths = poses.part_lengths.tolist()
+        frame_changed = changed.any(axis=2)
+        output = []
+        for f, frame in enumerate(frames):
+            if not frame_changed[f].any():
+                output.append(frame)
+                continue
+            frame = dict(frame)
+            people = list(frame['people'])
+            for p in np.nonzero(frame_changed[f])[0].tolist():
+                person = dict(people[p])
+                for part, key in enumerate(PART_KEYS):
+                    n = lengths[f][p][part]
+                    if n:
+                        start = poses.part_slices[part][0]
+                        values = list(person[key])
+                        values[:n * 3] = keypoints[f][p][start * 3:(start + n) * 3]
+                        person[key] = values
+                people[p] = person
+            frame['people'] = people
+            output.append(frame)
+        return output
+
+
+NODE_CLASS_MAPPINGS = {"OLO_PoseFilter": OLO_PoseFilter}
+NODE_DISPLAY_NAME_MAPPINGS = {"OLO_PoseFilter": "OLO_PoseFilter"}
@@ -0,0 +1,58 @@
+from .pose_tracking import track_frames, assign_track_ids
+from .pose_view import is_frame_sequence
+
+
+class OLO_PoseTracker:
+    """人物跟踪节点：跨帧为每个人物分配稳定的 id，供按 id 选择人物的节点使用"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        """定义节点输入类型
+
+        Returns:
+            dict: 输入类型定义
+        """
+        return {
+            "required": {
+                "pose_keypoint": ("POSE_KEYPOINT",),
+            },
+            "optional": {
+                "max_distance": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 10.0, "step": 0.01, "tooltip": "Largest allowed match distance: mean distance of the shared body keypoints divided by the person's size. Larger keeps IDs through fast motion but may swap people who come close."}),
+                "max_age": ("INT", {"default": 10, "min": 0, "max": 10000, "tooltip": "Frames a person may be missing before the ID is retired. A person reappearing later gets a new ID."}),
+                "min_common_keypoints": ("INT", {"default": 3, "min": 1, "max": 25, "tooltip": "Body keypoints that must be visible in both poses for a match."}),
+                "confidence_threshold": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.01, "tooltip": "Keypoints with confidence at or below this value are ignored for matching."}),
+                "align_people": ("BOOLEAN", {"default": False, "tooltip": "Reorder each frame's people so every person keeps the same list index (slot) for the whole track, filling free slots with empty people. A slot is reused only after its track has ended, so lists are at most as long as the number of tracks alive at the same time. Lets index based inputs (person_index, draw order, OLO_PoseFilter) follow the same person. The \"id\" field still holds the track ID."}),
+            }
+        }
+
+    RETURN_TYPES = ("POSE_KEYPOINT", "INT")
+    RETURN_NAMES = ("pose_keypoint", "track_count")
+    FUNCTION = "track"
+    CATEGORY = "OLO/Pose"
+
+    def track(self, pose_keypoint, max_distance=0.5, max_age=10, min_common_keypoints=3, confidence_threshold=0.0,
+              align_people=False):
+        """为姿态序列中的人物分配轨迹 id
+
+        Args:
+            pose_keypoint: 输入姿态关键点数据
+            max_distance: 允许匹配的最大相对距离
+            max_age: 轨迹允许缺失的最大帧数
+            min_common_keypoints: 匹配所需的最少共同可见关键点数
+            confidence_threshold: 关键点可见的置信度阈值
+            align_people: 是否按轨迹槽位重排人物列表
+
+        Returns:
+            tuple: (带 id 的姿态关键点, 轨迹数量)
+        """
+        if pose_keypoint is None:
+            return (None, 0)
+        frames = list(pose_keypoint) if is_frame_sequence(pose_keypoint) else [pose_keypoint]
+        ids = track_frames(frames, max_distance=max_distance, max_age=max_age,
+                           min_common_keypoints=min_common_keypoints, confidence_threshold=confidence_threshold)
+        track_count = int(ids.max()) + 1 if ids.size else 0
+        return (assign_track_ids(frames, ids, align_people), track_count)
+
+
+NODE_CLASS_MAPPINGS = {"OLO_PoseTracker": OLO_PoseTracker}
+NODE_DISPLAY_NAME_MAPPINGS = {"OLO_PoseTracker": "OLO_PoseTracker"}
@@ -19,6 +19,12 @@ from .OLO_DrawPoseKeypoint import NODE_CLASS_MAPPINGS as DRAW_POSE_KEYPOINT_MAPP
 from .OLO_DrawPoseKeypoint import NODE_DISPLAY_NAME_MAPPINGS as DRAW_POSE_KEYPOINT_DISPLAY_MAPPINGS
 from .OLO_KeypointSelector import NODE_CLASS_MAPPINGS as KEYPOINT_SELECTOR_MAPPINGS
 from .OLO_KeypointSelector import NODE_DISPLAY_NAME_MAPPINGS as KEYPOINT_SELECTOR_DISPLAY_MAPPINGS
+from .OLO_PoseFilter import NODE_CLASS_MAPPINGS as POSE_FILTER_MAPPINGS
+from .OLO_PoseFilter import NODE_DISPLAY_NAME_MAPPINGS as POSE_FILTER_DISPLAY_MAPPINGS
+from .OLO_PoseTracker import NODE_CLASS_MAPPINGS as POSE_TRACKER_MAPPINGS
+from .OLO_PoseTracker import NODE_DISPLAY_NAME_MAPPINGS as POSE_TRACKER_DISPLAY_MAPPINGS
+from .OLO_PoseFile import NODE_CLASS_MAPPINGS as POSE_FILE_MAPPINGS
+from .OLO_PoseFile import NODE_DISPLAY_NAME_MAPPINGS as POSE_FILE_DISPLAY_MAPPINGS
 from .OLO_Code import NODE_CLASS_MAPPINGS as CODE_MAPPINGS
 from .OLO_Code import NODE_DISPLAY_NAME_MAPPINGS as CODE_DISPLAY_MAPPINGS
 from .OLO_Code_Simple import NODE_CLASS_MAPPINGS as CODE_SIMPLE_MAPPINGS
@@ -39,6 +45,9 @@ NODE_CLASS_MAPPINGS = {
     **AUDIO_INFO_MAPPINGS,
     **DRAW_POSE_KEYPOINT_MAPPINGS,
     **KEYPOINT_SELECTOR_MAPPINGS,
+    **POSE_FILTER_MAPPINGS,
+    **POSE_TRACKER_MAPPINGS,
+    **POSE_FILE_MAPPINGS,
     **CODE_MAPPINGS,
     **CODE_SIMPLE_MAPPINGS,
     OLO_OpenposeEditor.NODE_NAME: OLO_OpenposeEditor,
@@ -59,6 +68,9 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     **AUDIO_INFO_DISPLAY_MAPPINGS,
     **DRAW_POSE_KEYPOINT_DISPLAY_MAPPINGS,
     **KEYPOINT_SELECTOR_DISPLAY_MAPPINGS,
+    **POSE_FILTER_DISPLAY_MAPPINGS,
+    **POSE_TRACKER_DISPLAY_MAPPINGS,
+    **POSE_FILE_DISPLAY_MAPPINGS,
     **CODE_DISPLAY_MAPPINGS,
     **CODE_SIMPLE_DISPLAY_MAPPINGS,
     OLO_OpenposeEditor.NODE_NAME: "OLO_OpenposeEditor",
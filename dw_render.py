@@ -0,0 +1,172 @@
+import json
+import numpy as np
+import cv2
+
+from .pose_sequence import PoseSequence
+from .pose_view import is_frame_sequence
+from .keypoint_schema import BODY_LIMB_SEQ, BODY_COLORS, HAND_EDGES, HAND_EDGE_COLORS, HAND_POINT_COLOR, FACE_POINT_COLOR
+
+# DW风格使用的查找表，只在导入时计算一次
+# 颜色直接按 RGB 顺序给出（原实现按 BGR 绘制后再整体转换为 RGB），省去逐帧的颜色空间转换
+DW_LIMB_SEQ = BODY_LIMB_SEQ[:17]
+DW_JOINT_COLORS = [tuple(color[::-1]) for color in BODY_COLORS]
+DW_LIMB_COLORS = [tuple(int(c * 0.6) for c in color[::-1]) for color in BODY_COLORS[:len(DW_LIMB_SEQ)]]
+DW_HAND_EDGE_COLORS = HAND_EDGE_COLORS
+DW_HAND_JOINT_COLOR = HAND_POINT_COLOR
+DW_FACE_COLOR = FACE_POINT_COLOR
+
+DW_LAYERS = ("body", "hands", "face")
+
+BASE_RESOLUTION_SIDE = 512.0
+BASE_THICKNESS = 2.0
+
+
+def dw_line_sizes(width, height, scale_for_xinsr):
+    """
+    根据输出分辨率计算关节半径和肢体线宽
+
+    Returns:
+        tuple: (关节半径, 肢体线宽)
+    """
+    target_max_side = max(width, height)
+    scale_factor = target_max_side / BASE_RESOLUTION_SIDE
+    joint_radius = int(max(1, BASE_THICKNESS * scale_factor))
+    stickwidth = joint_radius
+
+    if scale_for_xinsr:
+        xinsr_stick_scale = 1 if target_max_side < 500 else min(
+            2 + (target_max_side // 1000), 7)
+        stickwidth *= xinsr_stick_scale
+    return joint_radius, stickwidth
+
+
+def parse_dw_frames(pose_json):
+    """
+    解析DW渲染用的姿态数据
+
+    支持编辑器保存的单帧 {"width", "height", "people"}、POSE_KEYPOINT 帧列表及其 JSON 字符串。
+
+    Returns:
+        list: 帧字典列表，无法解析时返回空列表
+    """
+    if isinstance(pose_json, str):
+        if not pose_json.strip():
+            return []
+        try:
+            pose_json = json.loads(pose_json)
+        except json.JSONDecodeError:
+            return []
+    if isinstance(pose_json, dict):
+        return [pose_json]
+    if is_frame_sequence(pose_json):
+        return [frame for frame in pose_json if isinstance(frame, dict)]
+    return []
+
+
+def _frame_scales(frames, poses, width, height):
+    """
+    计算每帧从原始坐标到输出像素的缩放系数
+
+    编辑器格式（带 width/height）的坐标是像素坐标；POSE_KEYPOINT 格式（canvas_width/canvas_height）
+    按 pose_normalized 的规则判断：帧内任一数值大于 2.0 视为像素坐标，否则视为 0~1 的归一化坐标。
+    """
+    scales = np.ones((len(frames), 2), dtype=np.float64)
+    mask = poses.point_mask()
+    for f, frame in enumerate(frames):
+        if 'width' in frame or 'height' in frame:
+            original_w, original_h = frame.get('width', width), frame.get('height', height)
+        else:
+            values = poses.keypoints[f][mask[f]]
+            if values.size and values.max() > 2.0:
+                original_w = frame.get('canvas_width') or width
+                original_h = frame.get('canvas_height') or height
+            else:
+                original_w, original_h = 1.0, 1.0
+        scales[f] = (width / original_w, height / original_h)
+    return scales
+
+
+def _draw_limbs(canvas, points, valid, stickwidth):
+    """批量计算一个人物所有肢体的椭圆参数后逐个填充，points 为 (n, 2) 像素坐标，valid 为 (n,) 掩码"""
+    limb_ids = np.nonzero((DW_LIMB_SEQ < len(valid)).all(axis=1))[0]
+    limb_ids = limb_ids[valid[DW_LIMB_SEQ[limb_ids]].all(axis=1)]
+    if not len(limb_ids):
+        return
+    ends = points[DW_LIMB_SEQ[limb_ids]].astype(np.float64)  # (肢体数, 2, 2)
+    Y, X = ends[:, :, 0], ends[:, :, 1]
+    centers = np.stack([(Y[:, 0] + Y[:, 1]) / 2, (X[:, 0] + X[:, 1]) / 2], axis=1).astype(int)
+    half_lengths = (np.sqrt((X[:, 0] - X[:, 1]) ** 2 + (Y[:, 0] - Y[:, 1]) ** 2) / 2).astype(int)
+    angles = np.degrees(np.arctan2(X[:, 0] - X[:, 1], Y[:, 0] - Y[:, 1])).astype(int)
+    for limb, center, half_length, angle in zip(limb_ids.tolist(), centers.tolist(), half_lengths.tolist(), angles.tolist()):
+        polygon = cv2.ellipse2Poly(tuple(center), (half_length, stickwidth), angle, 0, 360, 1)
+        cv2.fillConvexPoly(canvas, polygon, DW_LIMB_COLORS[limb])
+
+
+def _draw_body(canvas, points, valid, joint_radius, stickwidth):
+    _draw_limbs(canvas, points, valid, stickwidth)
+    for i in np.nonzero(valid[:len(DW_JOINT_COLORS)])[0].tolist():
+        cv2.circle(canvas, tuple(points[i].tolist()), joint_radius, DW_JOINT_COLORS[i], thickness=-1)
+
+
+def _draw_hand(canvas, points, valid, joint_radius):
+    if len(valid) > HAND_EDGES.max():
+        for ie in np.nonzero(valid[HAND_EDGES].all(axis=1))[0].tolist():
+            p1, p2 = HAND_EDGES[ie]
+            cv2.line(canvas, tuple(points[p1].tolist()), tuple(points[p2].tolist()),
+                     DW_HAND_EDGE_COLORS[ie], thickness=joint_radius)
+    for i in np.nonzero(valid)[0].tolist():
+        cv2.circle(canvas, tuple(points[i].tolist()), joint_radius, DW_HAND_JOINT_COLOR, thickness=-1)
+
+
+def _draw_face(canvas, points, valid, radius):
+    for i in np.nonzero(valid)[0].tolist():
+        cv2.circle(canvas, tuple(points[i].tolist()), radius, DW_FACE_COLOR, thickness=-1)
+
+
+def render_dw_frames(pose_json, width, height, scale_for_xinsr=False, layers=("body",)):
+    """
+    批量渲染DW风格的姿态图像
+
+    所有帧的像素坐标和有效掩码一次性计算，之后逐帧只剩 cv2 的绘制调用，结果直接写入预先分配的输出数组。
+
+    Args:
+        pose_json: 姿态数据，见 parse_dw_frames
+        width: 输出图像宽度
+        height: 输出图像高度
+        scale_for_xinsr: 是否为XinSR模型调整线条宽度
+        layers: 需要绘制的图层，可选 "body"、"hands"、"face"
+
+    Returns:
+        np.array: (帧数, height, width, 3) 的 RGB uint8 数组，没有可用数据时返回一帧空白图像
+    """
+    frames = parse_dw_frames(pose_json)
+    if not frames:
+        return np.zeros((1, height, width, 3), dtype=np.uint8)
+
+    poses = PoseSequence.from_keypoints(frames)
+    scales = _frame_scales(frames, poses, width, height)
+    joint_radius, stickwidth = dw_line_sizes(width, height, scale_for_xinsr)
+    canvases = np.zeros((len(frames), height, width, 3), dtype=np.uint8)
+
+    def pixel_points(key):
+        part = poses.part(key)
+        points = (part[..., :2] * scales[:, None, None, :]).astype(int)
+        valid = poses.part_mask(key) & (part[..., 2] > 0)
+        return points, valid
+
+    body = pixel_points("pose_keypoints_2d") if "body" in layers else None
+    hands = [pixel_points(key) for key in ("hand_left_keypoints_2d", "hand_right_keypoints_2d")] if "hands" in layers else []
+    face = pixel_points("face_keypoints_2d") if "face" in layers else None
+    face_radius = max(1, joint_radius // 2)
+
+    for f in range(len(frames)):
+        canvas = canvases[f]
+        for p in range(int(poses.people_counts[f])):
+            if body is not None:
+                _draw_body(canvas, body[0][f, p], body[1][f, p], joint_radius, stickwidth)
+            for points, valid in hands:
+                _draw_hand(canvas, points[f, p], valid[f, p], joint_radius)
+            if face is not None:
+                _draw_face(canvas, face[0][f, p], face[1][f, p], face_radius)
+    return canvases
+
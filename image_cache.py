@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import torch
+import folder_paths
+from PIL import Image
+from nodes import LoadImage
+
+from .render_cache import ByteLRUCache, file_signature
+from .util import images_to_tensor
+from .pose_composite import resize_images
+
+# 解码后的图像缓存，三个编辑器节点共享；键包含文件的 (路径, 修改时间, 大小)，文件改动后自动失效
+_image_cache = ByteLRUCache(512 * 1024 * 1024)
+
+
+def load_image_cached(image):
+    """
+    按 LoadImage 的方式加载 input 目录中的图像，解码结果按文件签名缓存
+
+    Args:
+        image: 图像文件名（支持 "name [output]" 这样的标注）
+
+    Returns:
+        torch.Tensor: (N, H, W, 3) 图像张量，与 LoadImage.load_image 的第一个输出相同；
+            返回的是缓存中的张量本身，应视为只读
+    """
+    signature = file_signature(folder_paths.get_annotated_filepath(image))
+    if signature is None:
+        # 文件不存在时交给 LoadImage 报告错误
+        return LoadImage().load_image(image)[0]
+    key = ("load_image", signature)
+    cached = _image_cache.get(key)
+    if cached is None:
+        cached = _image_cache.put(key, LoadImage().load_image(image)[0])
+    return cached
+
+
+def load_fabric_images(image):
+    """
+    加载编辑器保存的 Fabric.js 风格姿态图像及其 "_combined" 合成图像
+
+    合成图像不存在时使用姿态图像；image 为空时两者都是 512x768 的灰色图像。
+    返回的张量直接输出给下游节点，因此是缓存的副本，下游就地修改不会影响缓存。
+
+    Returns:
+        tuple: (姿态图像, 合成图像)
+    """
+    if not image or not image.strip():
+        W = 512
+        H = 768
+        blank_image = torch.from_numpy(np.ones((H, W, 3), dtype=np.float32) * 0.5).unsqueeze(0)
+        return blank_image, blank_image
+
+    pose_image = load_image_cached(image).clone()
+    base_name, ext = os.path.splitext(image)
+    combined_image_name = f"{base_name}_combined{ext}"
+    if file_signature(folder_paths.get_annotated_filepath(combined_image_name)) is None:
+        return pose_image, pose_image
+    return pose_image, load_image_cached(combined_image_name).clone()
+
+
+def load_background(path, height=None, width=None):
+    """
+    读取背景图像并缩放到指定尺寸
+
+    解码结果和每个 (height, width) 的缩放结果分别缓存。返回的是缓存中的张量本身，
+    只能用作合成的输入（见 composite_pose），不能就地修改或直接输出给下游。
+
+    Args:
+        path: 图像文件的完整路径
+        height, width: 目标尺寸，None 表示保持原始尺寸
+
+    Returns:
+        torch.Tensor: (1, H, W, 3) 图像张量，文件不存在时返回 None
+    """
+    signature = file_signature(path)
+    if signature is None:
+        return None
+    key = ("background", signature)
+    decoded = _image_cache.get(key)
+    if decoded is None:
+        decoded = _image_cache.put(key, images_to_tensor([np.array(Image.open(path).convert("RGB"))]))
+    if height is None or width is None or decoded.shape[1:3] == (height, width):
+        return decoded
+
+    resized_key = ("background", signature, height, width)
+    resized = _image_cache.get(resized_key)
+    if resized is None:
+        resized = _image_cache.put(resized_key, resize_images(decoded, height, width))
+    return resized
+
+
+def editor_file_signatures(image, backgroundImage):
+    """
+    编辑器用到的图像文件的签名，供 IS_CHANGED 计算指纹
+
+    Returns:
+        tuple: 姿态图像、"_combined" 合成图像和背景图像的 (路径, 修改时间, 大小)，未设置或不存在时为 None
+    """
+    signatures = [None, None, None]
+    if image and image.strip():
+        base_name, ext = os.path.splitext(image)
+        signatures[0] = file_signature(folder_paths.get_annotated_filepath(image))
+        signatures[1] = file_signature(folder_paths.get_annotated_filepath(f"{base_name}_combined{ext}"))
+    if backgroundImage and backgroundImage.strip():
+        signatures[2] = file_signature(folder_paths.get_annotated_filepath(backgroundImage))
+    return tuple(signatures)
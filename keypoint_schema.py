@@ -0,0 +1,111 @@
+import numpy as np
+import matplotlib.colors
+
+# 绘制用的查找表，只在导入时计算一次
+BODY_LIMB_SEQ = np.array([[2, 3], [2, 6], [3, 4], [4, 5], [6, 7], [7, 8], [2, 9], [9, 10], \
+                          [10, 11], [2, 12], [12, 13], [13, 14], [2, 1], [1, 15], [15, 17], \
+                          [1, 16], [16, 18], [3, 17], [6, 18]]) - 1
+
+BODY_COLORS = [[255, 0, 0], [255, 85, 0], [255, 170, 0], [255, 255, 0], [170, 255, 0], [85, 255, 0], [0, 255, 0], \
+               [0, 255, 85], [0, 255, 170], [0, 255, 255], [0, 170, 255], [0, 85, 255], [0, 0, 255], [85, 0, 255], \
+               [170, 0, 255], [255, 0, 255], [255, 0, 170], [255, 0, 85]]
+
+HAND_EDGES = np.array([[0, 1], [1, 2], [2, 3], [3, 4], [0, 5], [5, 6], [6, 7], [7, 8], [0, 9], [9, 10], \
+                       [10, 11], [11, 12], [0, 13], [13, 14], [14, 15], [15, 16], [0, 17], [17, 18], [18, 19], [19, 20]])
+
+HAND_EDGE_COLORS = [tuple(matplotlib.colors.hsv_to_rgb([ie / float(len(HAND_EDGES)), 1.0, 1.0]) * 255)
+                    for ie in range(len(HAND_EDGES))]
+
+HAND_POINT_COLOR = (0, 0, 255)
+FACE_POINT_COLOR = (255, 255, 255)
+
+
+class KeypointPart:
+    """
+    关键点方案中的一个部位
+
+    Attributes:
+        name: 部位名称
+        start: 部位在关键点数组中的起始下标
+        stop: 部位在关键点数组中的结束下标（不含）
+        edges: (E, 2) 部位内的连线，下标相对于 start
+        edge_colors: 每条连线的颜色
+        point_colors: 每个关键点的颜色
+        radius: 关键点的默认半径
+        edge_style: 连线的画法，"limb" 为椭圆肢体，"line" 为直线
+        drop_origin: 是否把坐标接近原点的关键点视为缺失
+    """
+    __slots__ = ("name", "start", "stop", "edges", "edge_colors", "point_colors", "radius", "edge_style", "drop_origin")
+
+    def __init__(self, name, start, stop, edges=None, edge_colors=(), point_colors=(), radius=4,
+                 edge_style="limb", drop_origin=False):
+        self.name = name
+        self.start = start
+        self.stop = stop
+        self.edges = np.zeros((0, 2), dtype=np.int64) if edges is None else np.asarray(edges, dtype=np.int64)
+        self.edge_colors = list(edge_colors)
+        self.point_colors = list(point_colors)
+        self.radius = radius
+        self.edge_style = edge_style
+        self.drop_origin = drop_origin
+
+    @property
+    def size(self):
+        return self.stop - self.start
+
+
+class KeypointSchema:
+    """
+    关键点方案：按顺序排列的部位列表
+
+    部位的顺序同时也是绘制顺序。
+    """
+    __slots__ = ("name", "parts", "num_points", "part_starts")
+
+    def __init__(self, name, parts):
+        self.name = name
+        self.parts = tuple(parts)
+        self.num_points = self.parts[-1].stop
+        self.part_starts = np.array([part.start for part in self.parts], dtype=np.int64)
+
+    def part(self, name):
+        for part in self.parts:
+            if part.name == name:
+                return part
+        raise KeyError(name)
+
+
+KEYPOINT_SCHEMAS = {}
+
+
+def register_schema(schema):
+    """注册关键点方案，之后可以通过 get_schema 按名称获取"""
+    KEYPOINT_SCHEMAS[schema.name] = schema
+    return schema
+
+
+def get_schema(name):
+    return KEYPOINT_SCHEMAS[name]
+
+
+def _body_part(radius=4):
+    return KeypointPart("body", 0, 18, BODY_LIMB_SEQ[:17], BODY_COLORS[:17], BODY_COLORS, radius, "limb")
+
+
+def _hand_part(name, start):
+    return KeypointPart(name, start, start + 21, HAND_EDGES, HAND_EDGE_COLORS, [HAND_POINT_COLOR] * 21, 4,
+                        "line", drop_origin=True)
+
+
+BODY18 = register_schema(KeypointSchema("body18", [_body_part()]))
+
+HANDS21 = register_schema(KeypointSchema("hands21", [_hand_part("hand", 0)]))
+
+# DWPose 的 134 点全身格式：身体 18 + 脚 6 + 面部 68 + 左手 21 + 右手 21
+WHOLEBODY134 = register_schema(KeypointSchema("wholebody134", [
+    _body_part(),
+    KeypointPart("feet", 18, 24, point_colors=BODY_COLORS[:6], radius=4),
+    KeypointPart("face", 24, 92, point_colors=[FACE_POINT_COLOR] * 68, radius=3, drop_origin=True),
+    _hand_part("hand_left", 92),
+    _hand_part("hand_right", 113),
+]))
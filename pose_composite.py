@@ -0,0 +1,194 @@
+import math
+
+import cv2
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+# cv2.cvtColor(RGB2GRAY) 使用的定点系数（14 位小数），用于在张量上复现同样的灰度蒙版
+_GRAY_WEIGHTS = (4899, 9617, 1868)
+_GRAY_SHIFT = 14
+
+
+def _area_taps(n_in, n_out, downscale, device, dtype):
+    """
+    cv2.INTER_AREA 沿一个轴的插值抽头
+
+    两个方向都缩小（或不变）时按源像素被目标像素覆盖的面积加权；否则与 cv2 一样退化为
+    INTER_AREA 特有的两点线性插值系数。权重在 float64 下计算，再转换为图像的 dtype。
+
+    Returns:
+        tuple: ((n_out, K) 源像素下标, (n_out, K) 权重)
+    """
+    scale = n_in / n_out
+    dst = torch.arange(n_out, dtype=torch.float64, device=device)[:, None]
+    if downscale:
+        taps = torch.arange(math.ceil(scale) + 1, dtype=torch.float64, device=device)
+        src = torch.floor(dst * scale) + taps
+        weights = (torch.minimum((dst + 1) * scale, src + 1) - torch.maximum(dst * scale, src)).clamp(min=0) / scale
+    else:
+        sx = torch.floor(dst * scale)
+        fx = (dst + 1) - (sx + 1) * (n_out / n_in)
+        fx = torch.where(fx <= 0, 0.0, fx - torch.floor(fx))
+        fx = torch.where((sx < 0) | (sx >= n_in - 1), 0.0, fx)
+        src = torch.cat([sx, sx + 1], dim=1)
+        weights = torch.cat([1.0 - fx, fx], dim=1)
+    weights = torch.where(src < n_in, weights, 0.0)
+    return src.clamp(0, n_in - 1).long(), weights.to(dtype)
+
+
+def _resample_axis(images, axis, index, weights):
+    """沿 axis 按抽头加权求和，每个抽头一次 index_select"""
+    shape = [1] * images.ndim
+    shape[axis] = weights.shape[0]
+    resized = None
+    for k in range(index.shape[1]):
+        term = images.index_select(axis, index[:, k]) * weights[:, k].reshape(shape)
+        resized = term if resized is None else resized.add_(term)
+    return resized
+
+
+RESIZE_BACKENDS = ("auto", "torch", "cv2")
+
+
+def _resize_images_torch(images, height, width):
+    """在输入所在的设备上整批缩放，结果与 cv2.INTER_AREA 的差别只有 float 舍入"""
+    _, H, W, _ = images.shape
+    dtype = images.dtype if images.is_floating_point() else torch.float32
+    images = images.to(dtype)
+    downscale = height <= H and width <= W
+    if (H % height == 0 and W % width == 0) if downscale else (height % H == 0 and width % W == 0):
+        resized = F.interpolate(images.permute(0, 3, 1, 2), size=(height, width), mode="area")
+        return resized.permute(0, 2, 3, 1).contiguous()
+    resized = _resample_axis(images, 1, *_area_taps(H, height, downscale, images.device, dtype))
+    return _resample_axis(resized, 2, *_area_taps(W, width, downscale, images.device, dtype))
+
+
+def _resize_images_cv2(images, height, width):
+    """逐帧 cv2.resize(INTER_AREA)，只用于主机内存中的张量，不做设备间复制"""
+    frames = images.detach().numpy()
+    if frames.dtype != np.float32:
+        frames = frames.astype(np.float32)
+    resized = np.empty((frames.shape[0], height, width, frames.shape[3]), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        # 单通道时 cv2.resize 会去掉通道维，按目标形状写回
+        resized[i] = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA).reshape(resized.shape[1:])
+    return torch.from_numpy(resized).to(dtype=images.dtype if images.is_floating_point() else torch.float32)
+
+
+def resize_images(images, height, width, backend="auto"):
+    """
+    批量缩放 (N, H, W, C) 的图像张量，结果与逐帧 cv2.resize(INTER_AREA) 一致（float32 下误差小于 1e-5）
+
+    torch 后端在输入所在的设备上整批计算，不经过主机内存：整数倍缩放时 F.interpolate 的 area 模式与
+    INTER_AREA 完全相同，直接使用；其余比例下 area 模式按整像素分箱平均，与 INTER_AREA 相差较大，
+    此时按 cv2 的规则算出每个轴的插值抽头（INTER_AREA 在每个轴上都是线性的），先缩放高度再缩放宽度。
+    cv2 后端逐帧调用 cv2.resize，只接受 CPU 张量。auto 对 CPU 张量使用 cv2（数据本来就在主机内存中，
+    cv2 在 CPU 上比 torch 快得多），其余设备使用 torch，张量始终留在原来的设备上。
+
+    Args:
+        images: (N, H, W, C) 的 float 张量
+        height: 目标高度
+        width: 目标宽度
+        backend: "auto"、"torch" 或 "cv2"
+
+    Returns:
+        torch.Tensor: (N, height, width, C) 的张量，与输入同设备、同 dtype，尺寸一致时直接返回输入
+    """
+    if backend not in RESIZE_BACKENDS:
+        raise ValueError(f"Unknown resize backend: {backend}")
+    if images.shape[1] == height and images.shape[2] == width:
+        return images
+    if backend == "auto":
+        backend = "cv2" if images.device.type == "cpu" else "torch"
+    if backend == "cv2":
+        if images.device.type != "cpu":
+            raise ValueError("The cv2 resize backend only accepts CPU tensors")
+        return _resize_images_cv2(images, height, width)
+    return _resize_images_torch(images, height, width)
+
+
+def pose_mask(pose_images):
+    """任一通道非零的像素视为姿态像素，返回 (N, H, W, 1) 的布尔蒙版"""
+    return (pose_images > 0).any(dim=-1, keepdim=True)
+
+
+def coverage_composite(pose_images, base_images, alpha=1.0):
+    """
+    按覆盖率将抗锯齿的姿态图层批量合成到基础图像上
+
+    姿态颜色的最大通道都是 255，黑色画布上边缘像素的最大通道即该像素的覆盖率 a，
+    图层相当于预乘了 a 的颜色，因此合成结果为 pose + base * (1 - a)，
+    即 lerp(base, pose / a, a)，边缘不会带出黑边。alpha < 1 时再与基础图像按 alpha 混合。
+
+    Args:
+        pose_images: (N, H, W, 3) 的姿态图层，黑色背景
+        base_images: (N 或 1, H, W, 3) 的基础图像，与姿态图层尺寸相同
+        alpha: 姿态图层的不透明度
+
+    Returns:
+        torch.Tensor: (N, H, W, 3) 的合成图像
+    """
+    pose_images = pose_images.to(device=base_images.device, dtype=base_images.dtype)
+    coverage = pose_images.amax(dim=-1, keepdim=True)
+    combined = torch.addcmul(pose_images, base_images, 1.0 - coverage)
+    if alpha < 1.0:
+        combined = torch.lerp(base_images, combined, alpha)
+    return combined
+
+
+def luma_mask(pose_images, threshold=1):
+    """
+    按灰度阈值生成姿态蒙版
+
+    与 cv2.cvtColor(RGB2GRAY) + cv2.threshold(gray, threshold, 255, THRESH_BINARY) 的结果完全一致。
+
+    Returns:
+        torch.Tensor: (N, H, W, 1) 的布尔蒙版
+    """
+    rgb = torch.round(pose_images * 255).to(torch.int32)
+    r, g, b = rgb.unbind(dim=-1)
+    gray = (r * _GRAY_WEIGHTS[0] + g * _GRAY_WEIGHTS[1] + b * _GRAY_WEIGHTS[2] + (1 << (_GRAY_SHIFT - 1))) >> _GRAY_SHIFT
+    return (gray > threshold).unsqueeze(-1)
+
+
+def luma_mask_frames(frames, threshold=1):
+    """
+    按灰度阈值为 uint8 图像帧生成姿态蒙版，结果与 luma_mask 相同
+
+    姿态帧还是 CPU 上的 uint8 数组时直接逐帧调用 cv2，比在 float 张量上换算灰度快得多。
+
+    Args:
+        frames: (N, H, W, 3) 的 RGB uint8 数组
+
+    Returns:
+        torch.Tensor: (N, H, W, 1) 的布尔蒙版
+    """
+    mask = np.empty(frames.shape[:3] + (1,), dtype=bool)
+    for i, frame in enumerate(frames):
+        np.greater(cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY), threshold, out=mask[i, ..., 0])
+    return torch.from_numpy(mask)
+
+
+def composite_pose(pose_images, base_images, mask, alpha=1.0):
+    """
+    将姿态图层批量合成到基础图像上
+
+    蒙版内的像素取姿态图层，其余取基础图像；alpha < 1 时再与基础图像按 alpha 混合。
+    姿态图层和蒙版会移到基础图像所在的设备上。
+
+    Args:
+        pose_images: (N, H, W, 3) 的姿态图层
+        base_images: (N 或 1, H, W, 3) 的基础图像，与姿态图层尺寸相同
+        mask: (N, H, W, 1) 的布尔蒙版
+        alpha: 姿态图层的不透明度
+
+    Returns:
+        torch.Tensor: (N, H, W, 3) 的合成图像
+    """
+    pose_images = pose_images.to(device=base_images.device, dtype=base_images.dtype)
+    mask = mask.to(base_images.device)
+    combined = torch.where(mask, pose_images, base_images)
+    if alpha < 1.0:
+        combined = torch.lerp(base_images, combined, alpha)
+    return combined
@@ -0,0 +1,367 @@
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Sequence
+
+import numpy as np
+
+from .pose_sequence import PoseSequence, PART_KEYS, canvas_value
+from .pose_tracking import person_track_id
+
+# 姿态文件格式版本，写入二进制文件的头部
+POSE_FILE_VERSION = 1
+
+
+def _format_date(pattern, now):
+    """按前端 %date:格式% 的规则格式化时间，y 取年份末尾几位，M/d/h/m/s 补零到对应长度"""
+    fields = {"M": now.tm_mon, "d": now.tm_mday, "h": now.tm_hour, "m": now.tm_min, "s": now.tm_sec}
+
+    def replace(match):
+        token = match.group(0)
+        if token[0] == "y":
+            return str(now.tm_year)[-len(token):]
+        return str(fields[token[0]]).zfill(len(token))
+
+    return re.sub(r"y+|M+|d+|h+|m+|s+", replace, pattern)
+
+
+def resolve_output_path(output_dir, filename_prefix, width=0, height=0):
+    """
+    解析保存路径前缀，规则与 folder_paths.get_save_image_path 相同，但不列出目录
+
+    前缀中的变量按 ComfyUI 的 compute_vars 替换：%width% / %height%，以本地时间计算的
+    %year% / %month% / %day% / %hour% / %minute% / %second%，以及前端支持的 %date:yyyy-MM-dd%。
+
+    Args:
+        output_dir: 输出根目录
+        filename_prefix: 形如 "poses/%date:yyyy-MM-dd%/pose" 的前缀
+        width, height: 用于替换前缀中的 %width% / %height%
+
+    Returns:
+        tuple: (完整输出目录, 文件名前缀, 子目录)
+    """
+    now = time.localtime()
+    filename_prefix = re.sub(r"%date:([^%]+)%", lambda match: _format_date(match.group(1), now), filename_prefix)
+    for name, value in (("width", width), ("height", height), ("year", now.tm_year)):
+        filename_prefix = filename_prefix.replace(f"%{name}%", str(value))
+    for name, value in (("month", now.tm_mon), ("day", now.tm_mday), ("hour", now.tm_hour),
+                        ("minute", now.tm_min), ("second", now.tm_sec)):
+        filename_prefix = filename_prefix.replace(f"%{name}%", str(value).zfill(2))
+    subfolder = os.path.dirname(os.path.normpath(filename_prefix))
+    filename = os.path.basename(os.path.normpath(filename_prefix))
+    full_output_folder = os.path.join(output_dir, subfolder)
+    if os.path.commonpath((output_dir, os.path.abspath(full_output_folder))) != output_dir:
+        raise ValueError(f"Saving outside the output folder is not allowed: {full_output_folder}")
+    return full_output_folder, filename, subfolder
+
+
+class FilenameCounter:
+    """
+    缓存每个 (目录, 前缀, 扩展名) 的下一个文件编号
+
+    每个组合只在第一次保存时扫描一次目录，之后直接递增；写入前检查候选文件是否已存在，
+    外部程序写入了同名文件时继续向后查找，不会覆盖。
+    """
+
+    def __init__(self):
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def next(self, folder, filename, ext):
+        """
+        返回下一个可用的编号并预留它
+
+        Args:
+            folder: 输出目录
+            filename: 文件名前缀，文件名为 "{filename}_{编号:05d}{ext}"
+            ext: 扩展名（含点）
+
+        Returns:
+            int: 编号，从 1 开始
+        """
+        key = (os.path.abspath(folder), filename, ext)
+        with self._lock:
+            counter = self._next.get(key)
+            if counter is None:
+                counter = self._scan(folder, filename, ext) + 1
+            while os.path.exists(os.path.join(folder, f"{filename}_{counter:05d}{ext}")):
+                counter += 1
+            self._next[key] = counter + 1
+            return counter
+
+    @staticmethod
+    def _scan(folder, filename, ext):
+        """返回目录中已有的最大编号，目录不存在时为 0"""
+        prefix = filename + "_"
+        max_counter = 0
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not (name.startswith(prefix) and name.endswith(ext)):
+                        continue
+                    try:
+                        max_counter = max(max_counter, int(name[len(prefix):len(name) - len(ext)]))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return max_counter
+
+    def clear(self):
+        with self._lock:
+            self._next.clear()
+
+
+filename_counter = FilenameCounter()
+
+
+def track_id_array(frames, num_frames, max_people):
+    """收集每个人物的 "id" 字段，返回 (F, P) 数组，没有编号的人物为 -1"""
+    ids = np.full((num_frames, max_people), -1, dtype=np.int64)
+    for f, frame in enumerate(frames):
+        people = frame.get('people') if isinstance(frame, dict) else None
+        for p, person in enumerate(people or ()):
+            track_id = person_track_id(person)
+            if track_id is not None:
+                ids[f, p] = track_id
+    return ids
+
+
+def id_extras(ids, people_counts):
+    """把 track_id_array 形式的 (F, P) 人物 id 转换为 PoseSequence.extras，没有任何 id 时返回 None"""
+    if not (ids >= 0).any():
+        return None
+    return [({}, [{"id": i} if i >= 0 else {} for i in row[:count]])
+            for row, count in zip(ids.tolist(), people_counts.tolist())]
+
+
+def pose_header(poses, **extra):
+    """生成描述 PoseSequence 数组布局的 JSON 头部"""
+    header = {
+        "version": POSE_FILE_VERSION,
+        "num_frames": poses.num_frames,
+        "max_people": poses.max_people,
+        "part_keys": list(PART_KEYS),
+        "part_slices": [list(s) for s in poses.part_slices],
+    }
+    header.update(extra)
+    return header
+
+
+def write_pose_jsonl(path, frames):
+    """
+    按 JSON Lines 逐帧写出，每行一帧，帧字典原样保存（包括脸部、手部和 id 字段）
+
+    帧逐个序列化后立即写入，不在内存中拼接整个序列。
+
+    Returns:
+        int: 写出的帧数
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for frame in frames:
+            f.write(json.dumps(frame, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def read_pose_jsonl(path):
+    """读取 write_pose_jsonl 写出的文件，返回帧字典列表"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_pose_npz(path, frames, **header):
+    """
+    以 float32 关键点张量保存姿态序列
+
+    文件包含 keypoints (F, P, K, 3)、part_lengths、people_counts、canvas_sizes、has_people、
+    ids 以及 JSON 头部字符串 header（数组布局和 header 参数中的附加信息）。
+
+    Returns:
+        PoseSequence: 写出的序列
+    """
+    poses = PoseSequence.from_keypoints(frames)
+    np.savez(
+        path,
+        header=np.array(json.dumps(pose_header(poses, **header))),
+        keypoints=poses.keypoints.astype(np.float32),
+        part_lengths=poses.part_lengths.astype(np.int32),
+        people_counts=poses.people_counts.astype(np.int32),
+        canvas_sizes=poses.canvas_sizes.astype(np.float32),
+        has_people=poses.has_people,
+        ids=track_id_array(frames, poses.num_frames, poses.max_people).astype(np.int32),
+    )
+    return poses
+
+
+def read_pose_npz(path):
+    """
+    读取 write_pose_npz 写出的文件
+
+    Returns:
+        tuple: (PoseSequence, 头部字典, (F, P) 人物 id 数组)
+    """
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(str(data['header']))
+        poses = PoseSequence(
+            keypoints=data['keypoints'].astype(np.float64),
+            part_slices=[tuple(s) for s in header['part_slices']],
+            part_lengths=data['part_lengths'].astype(np.int64),
+            people_counts=data['people_counts'].astype(np.int64),
+            canvas_sizes=data['canvas_sizes'].astype(np.float64),
+            has_people=data['has_people'].astype(bool),
+        )
+        ids = data['ids'].astype(np.int64)
+    poses.extras = id_extras(ids, poses.people_counts)
+    return poses, header, ids
+
+
+# 二进制姿态文件: 魔数 + 头部长度 (uint64, 小端) + JSON 头部 + 按 64 字节对齐的数组数据
+POSE_BINARY_MAGIC = b"OLOPOSE\x00"
+POSE_BINARY_EXTENSION = ".olopose"
+_ALIGNMENT = 64
+
+
+def _align(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_pose_binary(path, frames, **header):
+    """
+    把姿态序列写为可内存映射的二进制文件
+
+    数组依次为 keypoints float32 (F, P, K, 3)、part_lengths int32 (F, P, 4)、people_counts int32 (F,)、
+    canvas_sizes float32 (F, 2)、has_people uint8 (F,)、ids int32 (F, P)，各自的 dtype、形状和文件偏移
+    记录在头部的 "arrays" 中，头部的其余字段同 pose_header。
+
+    Returns:
+        PoseSequence: 写出的序列
+    """
+    poses = PoseSequence.from_keypoints(frames)
+    arrays = {
+        "keypoints": poses.keypoints.astype('<f4'),
+        "part_lengths": poses.part_lengths.astype('<i4'),
+        "people_counts": poses.people_counts.astype('<i4'),
+        "canvas_sizes": poses.canvas_sizes.astype('<f4'),
+        "has_people": poses.has_people.astype(np.uint8),
+        "ids": track_id_array(frames, poses.num_frames, poses.max_people).astype('<i4'),
+    }
+    layout = {name: {"dtype": array.dtype.str, "shape": list(array.shape), "offset": 0} for name, array in arrays.items()}
+    header = pose_header(poses, arrays=layout, **header)
+
+    # 偏移量写在头部中会改变头部的长度：计算两次并预留余量，保证头部不会覆盖数据
+    for _ in range(2):
+        encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        offset = _align(len(POSE_BINARY_MAGIC) + 8 + len(encoded) + 32)
+        for name, array in arrays.items():
+            layout[name]["offset"] = offset
+            offset = _align(offset + array.nbytes)
+    encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    data_start = layout["keypoints"]["offset"]
+    encoded = encoded.ljust(data_start - len(POSE_BINARY_MAGIC) - 8, b' ')
+
+    with open(path, 'wb') as f:
+        f.write(POSE_BINARY_MAGIC)
+        f.write(len(encoded).to_bytes(8, 'little'))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    return poses
+
+
+def read_pose_binary_header(path):
+    """读取二进制姿态文件的头部"""
+    with open(path, 'rb') as f:
+        if f.read(len(POSE_BINARY_MAGIC)) != POSE_BINARY_MAGIC:
+            raise ValueError(f"Not a pose binary file: {path}")
+        length = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(length).decode('utf-8'))
+    if header.get("version", 0) > POSE_FILE_VERSION:
+        raise ValueError(f"Unsupported pose file version {header.get('version')}: {path}")
+    return header
+
+
+class MappedPoseFrames(Sequence):
+    """
+    内存映射的二进制姿态文件，按 POSE_KEYPOINT 帧列表的方式访问
+
+    数组用 np.memmap 打开，访问某一帧时才读取该帧的数据并生成帧字典，
+    整体转换为 PoseSequence 时也只读取选中的帧（见 pose_sequence）。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header = read_pose_binary_header(path)
+        self.arrays = {
+            name: np.memmap(path, dtype=np.dtype(info["dtype"]), mode='r', offset=info["offset"],
+                            shape=tuple(info["shape"])) if np.prod(info["shape"]) else
+            np.zeros(info["shape"], dtype=np.dtype(info["dtype"]))
+            for name, info in self.header["arrays"].items()
+        }
+        self.part_slices = [tuple(s) for s in self.header["part_slices"]]
+
+    def __len__(self):
+        return self.arrays["keypoints"].shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pose frame index out of range")
+        return self._frame(index)
+
+    def _frame(self, f):
+        H, W = self.arrays["canvas_sizes"][f].tolist()
+        frame = {}
+        if self.arrays["has_people"][f]:
+            count = int(self.arrays["people_counts"][f])
+            keypoints = self.arrays["keypoints"][f, :count].tolist()
+            lengths = self.arrays["part_lengths"][f, :count].tolist()
+            ids = self.arrays["ids"][f, :count].tolist()
+            people = []
+            for p in range(count):
+                person = {}
+                for part, key in enumerate(PART_KEYS):
+                    start = self.part_slices[part][0]
+                    points = keypoints[p][start:start + lengths[p][part]]
+                    person[key] = [value for point in points for value in point]
+                if ids[p] >= 0:
+                    person["id"] = ids[p]
+                people.append(person)
+            frame['people'] = people
+        frame['canvas_height'] = canvas_value(H)
+        frame['canvas_width'] = canvas_value(W)
+        return frame
+
+    def pose_sequence(self, indices=None):
+        """
+        读取选中的帧并返回 PoseSequence
+
+        Args:
+            indices: range 或整数数组，None 表示全部帧；步长为 1 的 range 按连续区间读取
+        """
+        if indices is None:
+            indices = range(len(self))
+        if isinstance(indices, range) and indices.step == 1:
+            indices = slice(indices.start, indices.stop)
+        else:
+            indices = np.asarray(indices, dtype=np.int64)
+        arrays = self.arrays
+        return PoseSequence(
+            keypoints=np.array(arrays["keypoints"][indices], dtype=np.float64),
+            part_slices=self.part_slices,
+            part_lengths=np.array(arrays["part_lengths"][indices], dtype=np.int64),
+            people_counts=np.array(arrays["people_counts"][indices], dtype=np.int64),
+            canvas_sizes=np.array(arrays["canvas_sizes"][indices], dtype=np.float64),
+            has_people=np.array(arrays["has_people"][indices], dtype=bool),
+            extras=id_extras(np.asarray(arrays["ids"][indices]), np.asarray(arrays["people_counts"][indices])),
+        )
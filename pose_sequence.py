@@ -0,0 +1,264 @@
+import hashlib
+import json
+
+import numpy as np
+
+from .pose_view import PoseSequenceView
+
+# OpenPose 格式中每个人物的关键点字段，按 PoseSequence 中的存储顺序排列
+PART_KEYS = ("pose_keypoints_2d", "face_keypoints_2d", "hand_left_keypoints_2d", "hand_right_keypoints_2d")
+# 帧字典中由数组表示的字段，其余字段原样保存在 PoseSequence.extras 中
+FRAME_KEYS = ("people", "canvas_height", "canvas_width")
+
+
+def canvas_value(value):
+    """画布尺寸是整数时按 int 输出，保持与原始 JSON 一致"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class PoseSequence:
+    """
+    紧凑的姿态序列容器
+
+    所有帧、所有人物的关键点保存在一个 (帧数, 人数, 关键点数, 3) 的 float64 数组中，
+    body / face / 左手 / 右手 各占关键点维度上的一段连续区间（见 part_slices）。
+    节点只在输入输出的边界与 POSE_KEYPOINT / JSON 互相转换，中间的归一化、缩放和绘制都直接读写数组。
+    使用 float64 而不是 float32：JSON 中的数值本身是双精度，float32 会把 0.1 这样的坐标改写成
+    0.10000000149011612，数组转换回 POSE_KEYPOINT 后不再与输入逐位相同；
+    落盘格式（.npz / .olopose）另行按 float32 保存以减小文件。
+
+    Attributes:
+        keypoints: (F, P, K, 3) 关键点数组，每个点为 (x, y, confidence)，未使用的位置填 0
+        part_slices: 每个字段在关键点维度上的 (start, stop) 区间，顺序同 PART_KEYS
+        part_lengths: (F, P, 4) 每个人物每个字段实际的关键点数，字段缺失或为空时为 0
+        people_counts: (F,) 每帧的人数
+        canvas_sizes: (F, 2) 每帧的 (canvas_height, canvas_width)，缺失时为 0
+        has_people: (F,) 该帧是否带有 "people" 字段
+        extras: 每帧一个 (帧的其他字段, [每个人物的其他字段]) 元组，保存数组之外的字段（如 OLO_PoseTracker 写入的 "id"），
+            转换回 POSE_KEYPOINT 时原样合并；所有帧都没有其他字段时为 None
+    """
+    __slots__ = ("keypoints", "part_slices", "part_lengths", "people_counts", "canvas_sizes", "has_people", "extras")
+
+    def __init__(self, keypoints, part_slices, part_lengths, people_counts, canvas_sizes, has_people, extras=None):
+        self.keypoints = keypoints
+        self.part_slices = tuple(part_slices)
+        self.part_lengths = part_lengths
+        self.people_counts = people_counts
+        self.canvas_sizes = canvas_sizes
+        self.has_people = has_people
+        self.extras = extras
+
+    def __len__(self):
+        return self.keypoints.shape[0]
+
+    @property
+    def num_frames(self):
+        return self.keypoints.shape[0]
+
+    @property
+    def max_people(self):
+        return self.keypoints.shape[1]
+
+    @classmethod
+    def empty(cls, num_frames, max_people, part_sizes):
+        """按每个字段的最大关键点数创建全零的序列"""
+        bounds = np.concatenate([[0], np.cumsum(part_sizes)]).tolist()
+        part_slices = list(zip(bounds[:-1], bounds[1:]))
+        return cls(
+            keypoints=np.zeros((num_frames, max_people, bounds[-1], 3), dtype=np.float64),
+            part_slices=part_slices,
+            part_lengths=np.zeros((num_frames, max_people, len(PART_KEYS)), dtype=np.int64),
+            people_counts=np.zeros(num_frames, dtype=np.int64),
+            canvas_sizes=np.zeros((num_frames, 2), dtype=np.float64),
+            has_people=np.zeros(num_frames, dtype=bool),
+        )
+
+    @classmethod
+    def from_keypoints(cls, frames):
+        """
+        从 POSE_KEYPOINT（单帧字典或帧字典列表）构建序列
+
+        所有关键点先收集到一个扁平列表中，再一次性转换为数组并按索引写入，避免逐个字段创建小数组。
+        基于内存映射文件的帧视图（见 pose_io.MappedPoseFrames）直接读取选中帧的数组，不生成帧字典。
+        """
+        if isinstance(frames, PoseSequenceView) and not frames.overlay and hasattr(frames.base, "pose_sequence"):
+            return frames.base.pose_sequence(frames.indices)
+        if isinstance(frames, dict):
+            frames = [frames]
+        frames = [frame if isinstance(frame, dict) else {} for frame in frames]
+
+        num_frames = len(frames)
+        people_counts = np.zeros(num_frames, dtype=np.int64)
+        has_people = np.zeros(num_frames, dtype=bool)
+        canvas_sizes = np.zeros((num_frames, 2), dtype=np.float64)
+        part_sizes = [0] * len(PART_KEYS)
+
+        flat = []  # 每个字段一个扁平数组
+        entries = []  # (帧, 人物, 字段, 关键点数)
+        extras = []
+        has_extras = False
+        for f, frame in enumerate(frames):
+            canvas_sizes[f] = (frame.get('canvas_height', 0) or 0, frame.get('canvas_width', 0) or 0)
+            frame_extra = {k: v for k, v in frame.items() if k not in FRAME_KEYS}
+            person_extras = []
+            extras.append((frame_extra, person_extras))
+            has_extras = has_extras or bool(frame_extra)
+            if 'people' not in frame:
+                continue
+            has_people[f] = True
+            people = frame['people'] or []
+            people_counts[f] = len(people)
+            for p, person in enumerate(people):
+                if not isinstance(person, dict):
+                    person_extras.append({})
+                    continue
+                person_extra = {k: v for k, v in person.items() if k not in PART_KEYS}
+                person_extras.append(person_extra)
+                has_extras = has_extras or bool(person_extra)
+                for part, key in enumerate(PART_KEYS):
+                    values = person.get(key)
+                    # 字段可能是列表，也可能是 NumPy 数组，不能直接按真值判断
+                    if values is None or len(values) == 0:
+                        continue
+                    values = np.asarray(values, dtype=np.float64).ravel()
+                    n = len(values) // 3
+                    flat.append(values[:n * 3])
+                    entries.append((f, p, part, n))
+                    if n > part_sizes[part]:
+                        part_sizes[part] = n
+
+        max_people = int(people_counts.max()) if num_frames else 0
+        poses = cls.empty(num_frames, max_people, part_sizes)
+        poses.people_counts = people_counts
+        poses.has_people = has_people
+        poses.canvas_sizes = canvas_sizes
+        poses.extras = extras if has_extras else None
+
+        if entries:
+            entries = np.array(entries, dtype=np.int64)
+            f, p, part, n = entries.T
+            poses.part_lengths[f, p, part] = n
+            # 为每个关键点计算它在 keypoints 中的目标位置
+            starts = np.array([s for s, _ in poses.part_slices], dtype=np.int64)[part]
+            point_f = np.repeat(f, n)
+            point_p = np.repeat(p, n)
+            offsets = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+            point_k = np.repeat(starts, n) + offsets
+            poses.keypoints[point_f, point_p, point_k] = np.concatenate(flat).reshape(-1, 3)
+        return poses
+
+    @classmethod
+    def from_json(cls, pose_json):
+        """从 JSON 字符串构建序列，单个对象视为一帧"""
+        if pose_json.startswith('{'):
+            pose_json = '[{}]'.format(pose_json)
+        return cls.from_keypoints(json.loads(pose_json))
+
+    def part(self, key):
+        """返回某个字段的 (F, P, n, 3) 视图"""
+        start, stop = self.part_slices[PART_KEYS.index(key)]
+        return self.keypoints[:, :, start:stop]
+
+    def part_mask(self, key):
+        """返回某个字段的 (F, P, n) 掩码，标记实际存在的关键点"""
+        part = PART_KEYS.index(key)
+        start, stop = self.part_slices[part]
+        return np.arange(stop - start) < self.part_lengths[:, :, part, None]
+
+    def point_mask(self):
+        """返回 (F, P, K) 掩码，标记所有字段中实际存在的关键点"""
+        return np.concatenate([self.part_mask(key) for key in PART_KEYS], axis=2)
+
+    def copy(self):
+        return PoseSequence(self.keypoints.copy(), self.part_slices, self.part_lengths.copy(),
+                            self.people_counts.copy(), self.canvas_sizes.copy(), self.has_people.copy(), self.extras)
+
+    def take(self, frame_indices):
+        """按帧索引（切片或索引数组）取出子序列"""
+        extras = None
+        if self.extras is not None:
+            extras = [self.extras[f] for f in np.arange(self.num_frames)[frame_indices].tolist()]
+        return PoseSequence(self.keypoints[frame_indices], self.part_slices, self.part_lengths[frame_indices],
+                            self.people_counts[frame_indices], self.canvas_sizes[frame_indices], self.has_people[frame_indices],
+                            extras)
+
+    def frame_hashes(self, *extra):
+        """
+        逐帧计算内容指纹，供按帧缓存使用
+
+        每帧只取自身人物的有效关键点、各字段长度、人数、画布尺寸和 people 标记拼成字节后哈希，
+        不受其他帧的人数或字段长度（数组补零的宽度）影响，也不需要逐帧 repr 帧字典。
+
+        Args:
+            extra: 附加参与计算的 (F, P, ...) 逐人物数组，例如人物 id
+
+        Returns:
+            list: 每帧一个十六进制字符串
+        """
+        num_frames = self.num_frames
+        if num_frames == 0:
+            return []
+        # 每个关键点所属字段及其在字段内的偏移，用于一次性求出所有有效关键点的掩码
+        part_of_point = np.zeros(self.keypoints.shape[2], dtype=np.int64)
+        offsets = np.arange(self.keypoints.shape[2], dtype=np.int64)
+        for part, (start, end) in enumerate(self.part_slices):
+            part_of_point[start:end] = part
+            offsets[start:end] -= start
+        valid = offsets < self.part_lengths[:, :, part_of_point]
+
+        hashes = []
+        for f in range(num_frames):
+            n = int(self.people_counts[f])
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(np.array([n, self.has_people[f]], dtype=np.int64).tobytes())
+            digest.update(self.canvas_sizes[f].tobytes())
+            digest.update(np.ascontiguousarray(self.part_lengths[f, :n]).tobytes())
+            digest.update(np.ascontiguousarray(self.keypoints[f, :n][valid[f, :n]]).tobytes())
+            for column in extra:
+                digest.update(np.ascontiguousarray(column[f, :n]).tobytes())
+            hashes.append(digest.hexdigest())
+        return hashes
+
+    def frame_people(self, f):
+        """
+        返回第 f 帧中每个人物的各字段关键点列表
+
+        Returns:
+            list: 每个人物一个元组，依次为 PART_KEYS 中各字段的 (n, 3) 数组
+        """
+        people = []
+        for p in range(int(self.people_counts[f])):
+            parts = []
+            for part, (start, _) in enumerate(self.part_slices):
+                n = int(self.part_lengths[f, p, part])
+                parts.append(self.keypoints[f, p, start:start + n])
+            people.append(tuple(parts))
+        return people
+
+    def to_keypoints(self):
+        """转换回 POSE_KEYPOINT 格式的帧字典列表，extras 中的其他字段原样合并回帧和人物字典"""
+        frames = []
+        keypoints = self.keypoints.tolist()
+        lengths = self.part_lengths.tolist()
+        for f in range(self.num_frames):
+            H, W = self.canvas_sizes[f]
+            frame_extra, person_extras = self.extras[f] if self.extras is not None else ({}, ())
+            if not self.has_people[f]:
+                frames.append({'canvas_height': canvas_value(H), 'canvas_width': canvas_value(W), **frame_extra})
+                continue
+            people = []
+            for p in range(int(self.people_counts[f])):
+                person = {}
+                for part, key in enumerate(PART_KEYS):
+                    start = self.part_slices[part][0]
+                    points = keypoints[f][p][start:start + lengths[f][p][part]]
+                    person[key] = [value for point in points for value in point]
+                if p < len(person_extras):
+                    person.update(person_extras[p])
+                people.append(person)
+            frames.append({'people': people, 'canvas_height': canvas_value(H), 'canvas_width': canvas_value(W), **frame_extra})
+        return frames
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_keypoints(), **kwargs)
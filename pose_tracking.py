@@ -0,0 +1,301 @@
+import heapq
+
+import numpy as np
+
+from .pose_sequence import PoseSequence
+
+# 无法匹配（共同关键点太少）时使用的代价，远大于任何实际距离
+_NO_MATCH_COST = 1e9
+
+
+def linear_sum_assignment(cost):
+    """
+    最小代价二分匹配（匈牙利算法的最短增广路实现）
+
+    每次为一行寻找增广路，内层对所有列的松弛都是一次数组运算，复杂度 O(n^2 m)。
+    矩形矩阵时匹配 min(行, 列) 对。
+
+    Args:
+        cost: (n, m) 代价矩阵
+
+    Returns:
+        tuple: (行下标数组, 列下标数组)，按行下标升序
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    u = np.zeros(n)
+    v = np.zeros(m)
+    row4col = np.full(m, -1, dtype=np.int64)
+    col4row = np.full(n, -1, dtype=np.int64)
+
+    for cur_row in range(n):
+        shortest = np.full(m, np.inf)
+        path = np.full(m, -1, dtype=np.int64)
+        visited_rows = np.zeros(n, dtype=bool)
+        visited_cols = np.zeros(m, dtype=bool)
+        i, min_val, sink = cur_row, 0.0, -1
+
+        while sink < 0:
+            visited_rows[i] = True
+            reduced = min_val + cost[i] - u[i] - v
+            better = ~visited_cols & (reduced < shortest)
+            path[better] = i
+            shortest[better] = reduced[better]
+
+            candidates = np.where(visited_cols, np.inf, shortest)
+            min_val = candidates.min()
+            if not np.isfinite(min_val):
+                raise ValueError("cost matrix is infeasible")
+            # 代价相同时优先选择尚未匹配的列，可以提前结束增广
+            ties = np.nonzero(candidates == min_val)[0]
+            free = ties[row4col[ties] < 0]
+            j = int(free[0] if len(free) else ties[0])
+            visited_cols[j] = True
+            if row4col[j] < 0:
+                sink = j
+            else:
+                i = int(row4col[j])
+
+        # 更新对偶变量
+        u[cur_row] += min_val
+        others = visited_rows.copy()
+        others[cur_row] = False
+        u[others] += min_val - shortest[col4row[others]]
+        v[visited_cols] -= min_val - shortest[visited_cols]
+
+        # 沿增广路翻转匹配
+        j = sink
+        while True:
+            i = int(path[j])
+            row4col[j] = i
+            col4row[i], j = j, int(col4row[i])
+            if i == cur_row:
+                break
+
+    rows = np.arange(n)
+    if transposed:
+        order = np.argsort(col4row)
+        return col4row[order], rows[order]
+    return rows, col4row
+
+
+def pose_distance(track_points, track_valid, points, valid, min_common_keypoints=3):
+    """
+    计算已有轨迹与当前帧人物之间的距离矩阵
+
+    距离为共同可见关键点的平均欧氏距离，除以轨迹人物的包围盒对角线长度，
+    因此与坐标是像素还是归一化无关。共同可见关键点少于 min_common_keypoints 时代价为无穷大。
+
+    Args:
+        track_points: (T, K, 2) 各轨迹最近一次的关键点
+        track_valid: (T, K) 轨迹关键点是否有效
+        points: (N, K, 2) 当前帧人物的关键点
+        valid: (N, K) 当前帧关键点是否有效
+
+    Returns:
+        np.array: (T, N) 距离矩阵
+    """
+    common = track_valid[:, None] & valid[None]
+    count = common.sum(axis=2)
+    dist = np.linalg.norm(track_points[:, None] - points[None], axis=3)
+    mean = (dist * common).sum(axis=2) / np.maximum(count, 1)
+
+    lo = np.where(track_valid[..., None], track_points, np.inf).min(axis=1)
+    hi = np.where(track_valid[..., None], track_points, -np.inf).max(axis=1)
+    size = np.linalg.norm(np.where(track_valid.any(axis=1)[:, None], hi - lo, 0.0), axis=1)
+    size = np.where(size > 0, size, 1.0)
+    return np.where(count >= min_common_keypoints, mean / size[:, None], _NO_MATCH_COST)
+
+
+def track_people(poses, max_distance=0.5, max_age=10, min_common_keypoints=3, confidence_threshold=0.0):
+    """
+    跨帧为人物分配稳定的身份编号
+
+    逐帧把当前帧的人物与最近 max_age 帧内出现过的轨迹做最小代价匹配（见 pose_distance），
+    代价不超过 max_distance 的匹配沿用轨迹编号，其余人物开启新轨迹。匹配使用身体关键点。
+
+    Args:
+        poses: PoseSequence
+        max_distance: 允许匹配的最大距离（相对人物大小）
+        max_age: 轨迹在多少帧没有匹配后不再参与匹配
+        min_common_keypoints: 参与匹配所需的最少共同可见关键点数
+        confidence_threshold: 置信度高于该值的关键点才视为可见
+
+    Returns:
+        np.array: (F, P) 每帧每个人物的轨迹编号，不存在的人物为 -1
+    """
+    body = poses.part("pose_keypoints_2d")
+    body_valid = poses.part_mask("pose_keypoints_2d") & (body[..., 2] > confidence_threshold)
+    F, P, K = body_valid.shape
+    ids = np.full((F, P), -1, dtype=np.int64)
+
+    # 只保存仍在 max_age 内的轨迹，数组大小不随视频长度增长
+    track_ids = np.zeros(0, dtype=np.int64)
+    track_points = np.zeros((0, K, 2))
+    track_valid = np.zeros((0, K), dtype=bool)
+    last_seen = np.zeros(0, dtype=np.int64)
+    next_id = 0
+
+    for f in range(F):
+        n = int(poses.people_counts[f])
+        if not n:
+            continue
+        points, valid = body[f, :n, :, :2], body_valid[f, :n]
+        alive = f - last_seen <= max_age
+        if not alive.all():
+            track_ids, track_points, track_valid, last_seen = \
+                track_ids[alive], track_points[alive], track_valid[alive], last_seen[alive]
+
+        matched_tracks = np.zeros(0, dtype=np.int64)
+        matched_people = np.zeros(0, dtype=np.int64)
+        if len(track_ids):
+            cost = pose_distance(track_points, track_valid, points, valid, min_common_keypoints)
+            rows, cols = linear_sum_assignment(cost)
+            keep = cost[rows, cols] <= max_distance
+            matched_tracks, matched_people = rows[keep], cols[keep]
+
+        # 匹配上的轨迹用当前帧可见的关键点更新，不可见的保留上一次的位置
+        update = valid[matched_people]
+        track_points[matched_tracks] = np.where(update[..., None], points[matched_people], track_points[matched_tracks])
+        track_valid[matched_tracks] |= update
+        last_seen[matched_tracks] = f
+        ids[f, matched_people] = track_ids[matched_tracks]
+
+        new_people = np.setdiff1d(np.arange(n), matched_people)
+        if len(new_people):
+            new_ids = np.arange(next_id, next_id + len(new_people))
+            next_id += len(new_people)
+            ids[f, new_people] = new_ids
+            track_ids = np.concatenate([track_ids, new_ids])
+            track_points = np.concatenate([track_points, points[new_people]])
+            track_valid = np.concatenate([track_valid, valid[new_people]])
+            last_seen = np.concatenate([last_seen, np.full(len(new_people), f)])
+    return ids
+
+
+def track_slots(ids):
+    """
+    为每条轨迹分配一个人物列表中的槽位
+
+    轨迹从第一次出现到最后一次出现的整个区间内占用同一个槽位，结束后槽位才会分给之后开始的轨迹，
+    每次取编号最小的空闲槽位。槽位数等于同时存在的轨迹数的最大值，不随视频长度和轨迹总数增长。
+
+    Args:
+        ids: (F, P) track_people 的结果
+
+    Returns:
+        np.array: (F, P) 每个人物的槽位，不存在的人物为 -1
+    """
+    valid = ids >= 0
+    if not valid.any():
+        return np.full(ids.shape, -1, dtype=np.int64)
+    F = ids.shape[0]
+    track = ids[valid]
+    frame = np.broadcast_to(np.arange(F)[:, None], ids.shape)[valid]
+    num_tracks = int(track.max()) + 1
+    first = np.full(num_tracks, F, dtype=np.int64)
+    last = np.full(num_tracks, -1, dtype=np.int64)
+    np.minimum.at(first, track, frame)
+    np.maximum.at(last, track, frame)
+
+    slot_of = np.full(num_tracks, -1, dtype=np.int64)
+    free, busy, num_slots = [], [], 0
+    for t in np.argsort(first, kind='stable').tolist():
+        if first[t] == F:
+            continue
+        while busy and busy[0][0] < first[t]:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        if free:
+            slot = heapq.heappop(free)
+        else:
+            slot, num_slots = num_slots, num_slots + 1
+        slot_of[t] = slot
+        heapq.heappush(busy, (int(last[t]), slot))
+    return np.where(valid, slot_of[np.maximum(ids, 0)], -1)
+
+
+def assign_track_ids(frames, ids, align_people=False):
+    """
+    把轨迹编号写入每个人物的 "id" 字段
+
+    只复制帧字典、人物列表和人物字典，关键点列表与输入共享。
+
+    Args:
+        frames: POSE_KEYPOINT 帧列表
+        ids: (F, P) track_people 的结果
+        align_people: 为 True 时按槽位（见 track_slots）重排人物列表，同一人物在整条轨迹中的列表下标不变，
+            空出的位置用空人物占位，便于按下标选择人物的节点直接使用。列表长度不超过同时存在的轨迹数
+
+    Returns:
+        list: 新的帧列表
+    """
+    slots = track_slots(ids) if align_people else None
+    output = []
+    for f, frame in enumerate(frames):
+        people = frame.get('people') if isinstance(frame, dict) else None
+        if not people:
+            output.append(frame)
+            continue
+        tracked = []
+        for p, person in enumerate(people):
+            person = dict(person) if isinstance(person, dict) else {}
+            person['id'] = int(ids[f, p])
+            tracked.append(person)
+        if align_people:
+            frame_slots = slots[f, :len(tracked)].tolist()
+            aligned = [empty_person() for _ in range(max(frame_slots) + 1)]
+            for slot, person in zip(frame_slots, tracked):
+                aligned[slot] = person
+            tracked = aligned
+        frame = dict(frame)
+        frame['people'] = tracked
+        output.append(frame)
+    return output
+
+
+def empty_person():
+    """占位用的空人物（没有轨迹编号）"""
+    return {"pose_keypoints_2d": [], "face_keypoints_2d": [], "hand_left_keypoints_2d": [],
+            "hand_right_keypoints_2d": []}
+
+
+def person_track_id(person):
+    """返回人物的轨迹编号，没有编号时为 None"""
+    track_id = person.get('id') if isinstance(person, dict) else None
+    if isinstance(track_id, (list, tuple)):
+        track_id = track_id[0] if track_id else None
+    try:
+        return int(track_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def select_track(frames, track_id):
+    """
+    只保留指定轨迹编号的人物
+
+    Args:
+        frames: POSE_KEYPOINT 帧序列
+        track_id: 轨迹编号
+
+    Returns:
+        list: 新的帧列表，人物列表被替换为筛选后的列表，其余内容共享
+    """
+    output = []
+    for frame in frames:
+        if isinstance(frame, dict) and isinstance(frame.get('people'), list):
+            frame = dict(frame)
+            frame['people'] = [person for person in frame['people'] if person_track_id(person) == track_id]
+        output.append(frame)
+    return output
+
+
+def track_frames(frames, **kwargs):
+    """对 POSE_KEYPOINT 帧列表做跟踪，返回 (F, P) 轨迹编号，参数见 track_people"""
+    return track_people(PoseSequence.from_keypoints(frames), **kwargs)
@@ -0,0 +1,187 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class PoseSequenceView(Sequence):
+    """
+    POSE_KEYPOINT 帧列表的只读视图
+
+    视图不复制帧：base 是原始帧列表，indices 把视图中的位置映射到 base 中的下标，
+    overlay 保存被重写的位置（视图位置 -> 新帧）。选择帧只生成新的下标映射，重写帧只复制 overlay，
+    原始列表和未改动的帧始终与上游节点共享。
+
+    Attributes:
+        base: 原始帧列表
+        indices: 视图位置到 base 下标的映射，range 或整数数组
+        overlay: 被重写的帧，{视图位置: 帧}
+    """
+    __slots__ = ("base", "indices", "overlay")
+
+    def __init__(self, base, indices=None, overlay=None):
+        self.base = base
+        self.indices = range(len(base)) if indices is None else indices
+        self.overlay = overlay or {}
+
+    @classmethod
+    def of(cls, frames):
+        """为帧列表创建视图，输入已经是视图时直接返回"""
+        if isinstance(frames, cls):
+            return frames
+        return cls(frames)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.select(index)
+        index = self._position(index)
+        if index in self.overlay:
+            return self.overlay[index]
+        return self.base[self.indices[index]]
+
+    def __iter__(self):
+        base, overlay = self.base, self.overlay
+        if not overlay:
+            return map(base.__getitem__, self._index_list())
+        return (overlay[i] if i in overlay else base[k] for i, k in enumerate(self._index_list()))
+
+    def __repr__(self):
+        return f"PoseSequenceView(frames={len(self)}, base={len(self.base)}, rewritten={len(self.overlay)})"
+
+    def _position(self, index):
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pose frame index out of range")
+        return index
+
+    def _index_list(self):
+        return self.indices if isinstance(self.indices, range) else self.indices.tolist()
+
+    def positions(self, selector):
+        """
+        把选择器转换为视图位置
+
+        Args:
+            selector: 切片、整数、整数序列、与视图等长的布尔掩码，或选择字符串（见 parse_frame_selector）
+
+        Returns:
+            range 或 np.array: 选中的视图位置，切片保持为 range
+        """
+        if isinstance(selector, str):
+            return self.positions(parse_frame_selector(selector, len(self)))
+        if isinstance(selector, range):
+            selector = np.asarray(selector, dtype=np.int64)
+        if isinstance(selector, slice):
+            return range(len(self))[selector]
+        if isinstance(selector, (int, np.integer)):
+            return np.array([self._position(selector)], dtype=np.int64)
+        selector = np.asarray(selector)
+        if selector.dtype == bool:
+            if selector.shape != (len(self),):
+                raise IndexError(f"mask length {selector.size} does not match {len(self)} frames")
+            return np.nonzero(selector)[0]
+        positions = selector.astype(np.int64).reshape(-1)
+        positions = np.where(positions < 0, positions + len(self), positions)
+        if positions.size and (positions.min() < 0 or positions.max() >= len(self)):
+            raise IndexError("pose frame index out of range")
+        return positions
+
+    def select(self, selector):
+        """
+        按切片、下标列表或布尔掩码选择帧，返回新的视图
+
+        新视图与当前视图共享 base，只重新计算下标映射；落在 overlay 中的位置随之映射到新位置。
+        """
+        positions = self.positions(selector)
+        if isinstance(positions, range) and isinstance(self.indices, range):
+            # range 套 range 仍是等差数列，直接算出新的 range
+            base = self.indices
+            indices = range(base.start + base.step * positions.start, base.start + base.step * positions.stop,
+                            base.step * positions.step)
+        elif isinstance(self.indices, range):
+            indices = self.indices.start + self.indices.step * np.asarray(positions, dtype=np.int64)
+        else:
+            indices = self.indices[np.asarray(positions, dtype=np.int64)]
+        overlay = {}
+        if self.overlay:
+            rewritten = np.fromiter(self.overlay, dtype=np.int64, count=len(self.overlay))
+            hits = np.nonzero(np.isin(np.asarray(positions, dtype=np.int64), rewritten))[0]
+            for new, old in zip(hits.tolist(), np.asarray(positions)[hits].tolist()):
+                overlay[new] = self.overlay[old]
+        return PoseSequenceView(self.base, indices, overlay)
+
+    def rewrite(self, frames):
+        """
+        重写若干位置的帧，返回新的视图
+
+        Args:
+            frames: {视图位置: 新帧}
+
+        Returns:
+            PoseSequenceView: 与当前视图共享 base 和下标映射，只复制 overlay
+        """
+        overlay = dict(self.overlay)
+        for index, frame in frames.items():
+            overlay[self._position(index)] = frame
+        return PoseSequenceView(self.base, self.indices, overlay)
+
+    def to_list(self):
+        """转换为普通的帧列表（只复制帧引用）"""
+        return list(self)
+
+
+def is_frame_sequence(value):
+    """判断是否为帧序列（list、tuple 或 PoseSequenceView）"""
+    return isinstance(value, (list, tuple, PoseSequenceView))
+
+
+def _parse_slice(text):
+    parts = [part.strip() for part in text.split(":")]
+    if len(parts) > 3:
+        raise ValueError(f"invalid frame slice: {text!r}")
+    values = [int(part) if part else None for part in parts]
+    if len(values) == 3 and values[2] == 0:
+        raise ValueError(f"frame slice step cannot be zero: {text!r}")
+    return slice(*values)
+
+
+def parse_frame_selector(text, num_frames):
+    """
+    解析帧选择字符串
+
+    支持的写法：
+        "start:stop:step"   切片，与 Python 切片相同，各项都可以省略，例如 "::4"、"10:-10"
+        "1, 5, 9"           下标列表，可以为负数，也可以与切片混合，例如 "0:10, 20, 30:40"
+        "mask:0110..."      布尔掩码，每一位对应一帧，长度必须等于帧数
+
+    Args:
+        text: 选择字符串
+        num_frames: 序列的帧数，用于展开混合写法中的切片
+
+    Returns:
+        slice、np.array(int) 或 np.array(bool)
+    """
+    text = text.strip()
+    if text.startswith("mask:"):
+        bits = "".join(text[len("mask:"):].split())
+        if set(bits) - {"0", "1"}:
+            raise ValueError("frame mask may only contain 0 and 1")
+        return np.frombuffer(bits.encode(), dtype=np.uint8) == ord("1")
+
+    parts = [part.strip() for part in text.split(",") if part.strip()]
+    try:
+        if len(parts) == 1 and ":" in parts[0]:
+            return _parse_slice(parts[0])
+        positions = []
+        for part in parts:
+            if ":" in part:
+                positions.extend(range(num_frames)[_parse_slice(part)])
+            else:
+                positions.append(int(part))
+    except ValueError as e:
+        raise ValueError(f"invalid frame selection {text!r}: {e}")
+    return np.array(positions, dtype=np.int64)
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import torch
+
+
+def estimate_nbytes(value):
+    """估算缓存值占用的内存字节数"""
+    if isinstance(value, torch.Tensor):
+        return value.element_size() * value.nelement()
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(v) for v in value)
+    return 64
+
+
+def content_hash(*parts):
+    """
+    计算内容指纹
+
+    数组按原始字节参与计算，其余对象使用 repr，返回十六进制字符串
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(repr((part.dtype.str, part.shape)).encode())
+            h.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, bytes):
+            h.update(part)
+        elif isinstance(part, str):
+            h.update(part.encode('utf-8', 'surrogatepass'))
+        else:
+            h.update(repr(part).encode())
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+def copy_pose_data(value):
+    """
+    复制缓存中的姿态数据（帧字典、帧列表），供下游节点就地修改
+
+    只复制字典和列表，数值直接共享；比 copy.deepcopy 快得多。
+    """
+    if isinstance(value, dict):
+        return {k: copy_pose_data(v) for k, v in value.items()}
+    if isinstance(value, list):
+        for v in value:
+            if isinstance(v, (dict, list)):
+                return [copy_pose_data(v) for v in value]
+        return value[:]
+    return value
+
+
+def pack_layer(canvas):
+    """
+    将黑色背景上的 (H, W, C) uint8 图层压缩为 (形状, 非零像素段的起点, 段长度, 像素值)
+
+    姿态图层大部分是黑色，只按行优先顺序保存连续的非零像素段，占用的内存通常只有完整画布的
+    几十分之一，按帧缓存长序列时整段序列都能留在缓存中。
+    """
+    flat = canvas.reshape(-1, canvas.shape[-1])
+    covered = flat.any(axis=1).view(np.int8)
+    edges = np.diff(covered, prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+    return canvas.shape, starts.astype(np.int32), lengths.astype(np.int32), flat[covered.view(bool)]
+
+
+def unpack_layer(packed):
+    """还原 pack_layer 压缩的图层，每次返回新的数组，调用方可以就地修改"""
+    shape, starts, lengths, values = packed
+    canvas = np.zeros(shape, dtype=np.uint8)
+    # 每个非零像素的扁平索引 = 所在段的起点 + 段内偏移
+    offsets = np.arange(len(values)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    canvas.reshape(-1, shape[-1])[np.repeat(starts, lengths) + offsets] = values
+    return canvas
+
+
+def file_signature(path):
+    """返回 (路径, 修改时间, 文件大小)，文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+class ByteLRUCache:
+    """
+    按字节数限制容量的 LRU 缓存
+
+    超过容量时从最久未使用的条目开始淘汰；单个条目超过总容量或容量为 0 时不缓存。
+    get 返回缓存中的对象本身而不是副本：张量等值应视为只读，
+    需要交给下游修改的可变数据由调用方复制（见 copy_pose_data）。
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            if nbytes > self.max_bytes or self.max_bytes <= 0:
+                return value
+            self._entries[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            self._evict()
+        return value
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _evict(self):
+        while self._entries and self.total_bytes > self.max_bytes:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.total_bytes -= nbytes
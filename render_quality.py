@@ -0,0 +1,97 @@
+import numpy as np
+import cv2
+
+# 亚像素绘制时坐标使用的小数位数，cv2 的 shift 参数
+SUBPIXEL_SHIFT = 4
+
+
+class RenderQuality:
+    """
+    姿态图的绘制质量
+
+    Attributes:
+        name: 模式名称
+        scale: 内部绘制分辨率相对输出分辨率的倍数，绘制完成后缩放回输出尺寸
+        line_type: cv2 的线型，cv2.LINE_8 或 cv2.LINE_AA
+        shift: 坐标的小数位数，大于 0 时按亚像素精度绘制
+    """
+    __slots__ = ("name", "scale", "line_type", "shift")
+
+    def __init__(self, name, scale=1.0, line_type=cv2.LINE_8, shift=0):
+        self.name = name
+        self.scale = scale
+        self.line_type = line_type
+        self.shift = shift
+
+    def internal_size(self, height, width):
+        """返回内部绘制使用的 (高, 宽)"""
+        if self.scale == 1.0:
+            return height, width
+        return max(1, int(round(height * self.scale))), max(1, int(round(width * self.scale)))
+
+    @property
+    def soft_edges(self):
+        """边缘像素是否与背景混合（抗锯齿或缩放），此时叠加到基础图像上需要按覆盖率合成"""
+        return self.line_type == cv2.LINE_AA or self.scale != 1.0
+
+    def size(self, value):
+        """把以输出像素为单位的尺寸（半径、线宽）换算到内部分辨率"""
+        if self.scale == 1.0:
+            return value
+        return int(round(value * self.scale))
+
+    def line_width(self, value):
+        """换算线宽，结果至少为 1（cv2.line 等函数要求线宽为正数，低分辨率草稿时细线不会被舍入为 0）"""
+        return max(1, self.size(value))
+
+    def fixed(self, values):
+        """
+        将浮点坐标或长度转换为 cv2 使用的整数
+
+        shift 为 0 时与原先的 astype(int) 一样直接截断；否则四舍五入为 shift 位小数的定点数。
+        """
+        values = np.asarray(values)
+        if not self.shift:
+            return values.astype(int)
+        return np.rint(values * (1 << self.shift)).astype(int)
+
+    def finish(self, canvas, height, width):
+        """将内部分辨率的画布缩放到输出尺寸：超采样时按面积缩小，低分辨率草稿时线性放大"""
+        if canvas.shape[0] == height and canvas.shape[1] == width:
+            return canvas
+        interpolation = cv2.INTER_AREA if self.scale > 1.0 else cv2.INTER_LINEAR
+        return cv2.resize(canvas, (width, height), interpolation=interpolation)
+
+
+RENDER_QUALITIES = {
+    quality.name: quality for quality in (
+        RenderQuality("fast"),
+        RenderQuality("antialiased", line_type=cv2.LINE_AA, shift=SUBPIXEL_SHIFT),
+        RenderQuality("supersample_2x", scale=2.0),
+        RenderQuality("draft_half", scale=0.5),
+    )
+}
+
+RENDER_QUALITY_MODES = list(RENDER_QUALITIES)
+
+
+def get_render_quality(quality):
+    """按名称获取绘制质量，None 表示 fast"""
+    if quality is None:
+        return RENDER_QUALITIES["fast"]
+    if isinstance(quality, RenderQuality):
+        return quality
+    return RENDER_QUALITIES[quality]
+
+# 各模式的绘制耗时（1024x1024，每帧两人，单线程，毫秒/帧，包含缩放回输出尺寸）：
+#   模式              OLO_DrawPoseKeypoint(wholebody)   OLO_OpenposeEditor(POSE_IMAGE)
+#   fast              13.5                              16.9
+#   antialiased       12.6                              20.5
+#   supersample_2x    20.3                              70.9
+#   draft_half        14.3                              11.1
+RENDER_QUALITY_TOOLTIP = ("Rasterisation quality of the pose skeleton. "
+                          "fast: integer coordinates without anti-aliasing (reference cost). "
+                          "antialiased: sub-pixel coordinates with anti-aliased edges, about 1.0-1.2x the fast cost. "
+                          "supersample_2x: draw at twice the resolution and area-downsample, about 1.5-4x. "
+                          "draft_half: draw at half the resolution and upscale, about 0.7-1.0x with softer edges. "
+                          "Costs measured at 1024x1024 with two people per frame.")
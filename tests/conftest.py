@@ -0,0 +1,65 @@
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+# 插件目录本身是一个包（模块之间使用相对导入）。这里只注册包路径，不执行 __init__.py，
+# 以便在没有 ComfyUI 的环境中单独测试不依赖 ComfyUI 的模块。
+ROOT = Path(__file__).resolve().parents[1]
+
+if "olo" not in sys.modules:
+    package = types.ModuleType("olo")
+    package.__path__ = [str(ROOT)]
+    sys.modules["olo"] = package
+
+
+@pytest.fixture(scope="session")
+def fake_comfy_modules(tmp_path_factory):
+    """
+    没有安装 ComfyUI 时使用的宿主模块（folder_paths、nodes、comfy.utils）
+
+    整个测试会话共用一套模块和一个 input/output 目录：节点模块在第一次导入时绑定 folder_paths，
+    之后的测试看到的必须是同一个目录。
+    """
+    host_dir = tmp_path_factory.mktemp("comfy_host")
+    folder_paths = types.ModuleType("folder_paths")
+    folder_paths.get_annotated_filepath = lambda name: str(host_dir / name)
+    folder_paths.get_output_directory = lambda: str(host_dir)
+
+    nodes = types.ModuleType("nodes")
+
+    class LoadImage:
+        def load_image(self, image):
+            raise FileNotFoundError(image)
+
+    nodes.LoadImage = LoadImage
+
+    class ProgressBar:
+        def __init__(self, total):
+            self.total = total
+
+        def update(self, value):
+            pass
+
+    comfy = types.ModuleType("comfy")
+    comfy_utils = types.ModuleType("comfy.utils")
+    comfy_utils.ProgressBar = ProgressBar
+    comfy.utils = comfy_utils
+    return {"folder_paths": folder_paths, "nodes": nodes, "comfy": comfy, "comfy.utils": comfy_utils}
+
+
+@pytest.fixture
+def comfy_host(monkeypatch, request):
+    """
+    提供节点模块导入和运行时用到的宿主模块，返回 folder_paths 模块
+
+    只包含测试用到的最小接口；安装了 ComfyUI 时直接使用真实模块。
+    """
+    if importlib.util.find_spec("folder_paths") is not None:
+        return importlib.import_module("folder_paths")
+    modules = request.getfixturevalue("fake_comfy_modules")
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    return modules["folder_paths"]
@@ -0,0 +1,188 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from olo.OLO_AppendageEditor import OLO_AppendageEditor, HAND_FIELDS, KEYFRAME_INTERPOLATIONS, evaluate_keyframes
+
+
+def reference_transform(keypoints, appendage_indices, pivot_index, scale_factor, x_offset, y_offset, rotation,
+                        bidirectional_scale):
+    """原先逐关键点变换一个人物部位的实现（手部的部位为全部关键点，枢轴为手腕）"""
+    keypoints = list(keypoints)
+    i = pivot_index * 3
+    if len(keypoints) > i + 2 and keypoints[i + 2] > 0:
+        pivot = [keypoints[i], keypoints[i + 1]]
+    else:
+        valid = [keypoints[k * 3:k * 3 + 2] for k in appendage_indices
+                 if len(keypoints) > k * 3 + 2 and keypoints[k * 3 + 2] > 0]
+        if not valid:
+            return keypoints
+        pivot = [sum(p[0] for p in valid) / len(valid), sum(p[1] for p in valid) / len(valid)]
+
+    for k in appendage_indices:
+        i = k * 3
+        if len(keypoints) <= i + 2 or keypoints[i + 2] <= 0:
+            continue
+        x, y = keypoints[i], keypoints[i + 1]
+        if rotation != 0.0:
+            rad = math.radians(rotation)
+            rel_x, rel_y = x - pivot[0], y - pivot[1]
+            x = rel_x * math.cos(rad) - rel_y * math.sin(rad) + pivot[0]
+            y = rel_x * math.sin(rad) + rel_y * math.cos(rad) + pivot[1]
+        if scale_factor != 1.0 and (bidirectional_scale or k != pivot_index):
+            x, y = (x - pivot[0]) * scale_factor + pivot[0], (y - pivot[1]) * scale_factor + pivot[1]
+        keypoints[i], keypoints[i + 1] = x + x_offset, y + y_offset
+    return keypoints
+
+
+def reference_edit_appendage(frames, appendage_type, params, bidirectional_scale, person_index):
+    """原先的 edit_appendage：逐帧、逐人物调用 reference_transform，params 为每帧的 (scale, x, y, rotation)"""
+    editor = OLO_AppendageEditor()
+    if appendage_type in HAND_FIELDS:
+        field, pivot_index = HAND_FIELDS[appendage_type], 0
+    else:
+        field = "pose_keypoints_2d"
+        appendage_indices, pivot_index = editor._get_appendage_indices(appendage_type)
+    output = []
+    for frame, frame_params in zip(frames, params):
+        frame = {**frame, "people": [dict(person) for person in frame["people"]]}
+        for p, person in enumerate(frame["people"]):
+            if person_index != -1 and p != person_index or not person.get(field):
+                continue
+            indices = range(len(person[field]) // 3) if field != "pose_keypoints_2d" else appendage_indices
+            person[field] = reference_transform(person[field], indices, pivot_index, *frame_params, bidirectional_scale)
+        output.append(frame)
+    return output
+
+
+def random_frames(rng, num_frames):
+    frames = []
+    for _ in range(num_frames):
+        people = []
+        for _ in range(int(rng.integers(1, 4))):
+            person = {}
+            for field, count in (("pose_keypoints_2d", 18), ("hand_left_keypoints_2d", 21), ("hand_right_keypoints_2d", 21)):
+                if rng.random() < 0.15:
+                    continue
+                # 约四分之一的关键点缺失，覆盖枢轴缺失时退回部位中心的分支
+                points = np.column_stack([rng.uniform(0, 1, count), rng.uniform(0, 1, count),
+                                          (rng.random(count) > 0.25) * rng.uniform(0.1, 1.0, count)])
+                person[field] = points.ravel().tolist()
+            people.append(person)
+        frames.append({"people": people, "canvas_width": 512, "canvas_height": 512})
+    return frames
+
+
+def assert_frames_close(result, expected):
+    assert len(result) == len(expected)
+    for frame, reference in zip(result, expected):
+        assert len(frame["people"]) == len(reference["people"])
+        for person, reference_person in zip(frame["people"], reference["people"]):
+            assert person.keys() == reference_person.keys()
+            for key in person:
+                np.testing.assert_allclose(person[key], reference_person[key], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("appendage_type", OLO_AppendageEditor.APPENDAGE_TYPES)
+def test_transform_appendage_matches_reference(seed, appendage_type):
+    rng = np.random.default_rng(seed)
+    frames = random_frames(rng, 5)
+    params = np.column_stack([rng.choice([1.0, 0.7, 1.6], 5), rng.uniform(-0.1, 0.1, 5),
+                              rng.uniform(-0.1, 0.1, 5), rng.choice([0.0, 30.0, -135.0], 5)])
+    bidirectional_scale = bool(seed % 2)
+    person_index = -1 if seed < 3 else 1
+    result, = OLO_AppendageEditor().edit_appendage(frames, appendage_type, *(column.tolist() for column in params.T),
+                                                   bidirectional_scale=bidirectional_scale, person_index=person_index)
+    expected = reference_edit_appendage(frames, appendage_type, params, bidirectional_scale, person_index)
+    assert_frames_close(result, expected)
+
+
+def test_single_values_apply_to_every_frame():
+    frames = random_frames(np.random.default_rng(7), 4)
+    result, = OLO_AppendageEditor().edit_appendage(frames, "right_full_arm", 1.3, 0.02, -0.01, 20.0)
+    expected = reference_edit_appendage(frames, "right_full_arm", [(1.3, 0.02, -0.01, 20.0)] * 4, False, -1)
+    assert_frames_close(result, expected)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_edit_program_matches_sequential_edits(seed):
+    rng = np.random.default_rng(seed)
+    frames = random_frames(rng, 6)
+    types = rng.choice(OLO_AppendageEditor.APPENDAGE_TYPES, 4)
+    edits = [{"type": str(appendage_type), "scale": float(rng.choice([1.0, 0.8, 1.4])),
+              "x_offset": rng.uniform(-0.05, 0.05, 6).tolist(), "rotation": float(rng.choice([0.0, 25.0])),
+              "bidirectional_scale": bool(rng.random() < 0.5), "person_index": int(rng.choice([-1, 0, 1]))}
+             for appendage_type in types]
+    editor = OLO_AppendageEditor()
+    result, = editor.edit_appendage(frames, "left_forearm", 1.2, appendage_edits=json.dumps(edits))
+
+    expected, = editor.edit_appendage(frames, "left_forearm", 1.2)
+    for edit in edits:
+        edit = dict(edit)
+        expected, = editor.edit_appendage(expected, edit.pop("type"), **edit)
+    assert_frames_close(result, expected)
+
+
+def reference_keyframes(keyframes, length, interpolation):
+    """逐帧标量计算的关键帧曲线：按帧查找所在区间再插值"""
+    keys = {}
+    for frame, value in keyframes:
+        keys[float(frame)] = float(value)
+    frames = sorted(keys)
+    values = [keys[frame] for frame in frames]
+    n = len(frames)
+    tangents = []
+    for i in range(n):
+        if n == 1:
+            tangents.append(0.0)
+        elif i == 0 or i == n - 1:
+            j = 1 if i == 0 else n - 1
+            tangents.append((values[j] - values[j - 1]) / (frames[j] - frames[j - 1]))
+        else:
+            hl, hr = frames[i] - frames[i - 1], frames[i + 1] - frames[i]
+            tangents.append((hl * hl * values[i + 1] - hr * hr * values[i - 1] + (hr * hr - hl * hl) * values[i])
+                            / (hl * hr * (hl + hr)))
+
+    curve = []
+    for x in range(length):
+        if x <= frames[0] or n == 1:
+            curve.append(values[0])
+            continue
+        if x >= frames[-1]:
+            curve.append(values[-1])
+            continue
+        i = max(k for k in range(n - 1) if frames[k] <= x)
+        span = frames[i + 1] - frames[i]
+        t = (x - frames[i]) / span
+        if interpolation == "cubic":
+            h00, h10, h01, h11 = 2 * t ** 3 - 3 * t ** 2 + 1, t ** 3 - 2 * t ** 2 + t, -2 * t ** 3 + 3 * t ** 2, t ** 3 - t ** 2
+            curve.append(h00 * values[i] + h10 * span * tangents[i] + h01 * values[i + 1] + h11 * span * tangents[i + 1])
+            continue
+        if interpolation == "smoothstep":
+            t = t * t * (3 - 2 * t)
+        curve.append(values[i] + (values[i + 1] - values[i]) * t)
+    return curve
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("interpolation", KEYFRAME_INTERPOLATIONS)
+def test_evaluate_keyframes_matches_reference(seed, interpolation):
+    rng = np.random.default_rng(seed)
+    length = int(rng.integers(1, 60))
+    count = int(rng.integers(1, 7))
+    # 关键帧可以乱序、重复，也可以落在输出范围之外
+    keyframes = [(int(frame), float(value)) for frame, value in
+                 zip(rng.integers(-10, length + 10, count), rng.uniform(-2, 2, count))]
+    curve = evaluate_keyframes(keyframes, length, interpolation)
+    assert curve.shape == (length,)
+    np.testing.assert_allclose(curve, reference_keyframes(keyframes, length, interpolation), rtol=0, atol=1e-12)
+
+
+def test_evaluate_keyframes_rejects_bad_input():
+    with pytest.raises(ValueError):
+        evaluate_keyframes([], 5)
+    with pytest.raises(ValueError):
+        evaluate_keyframes([(0, 1.0)], 5, "bezier")
@@ -0,0 +1,180 @@
+import math
+
+import cv2
+import matplotlib.colors
+import numpy as np
+import pytest
+import torch
+
+from olo.keypoint_schema import BODY_LIMB_SEQ, BODY_COLORS, HAND_EDGES
+from olo.pose_composite import resize_images
+
+
+def make_frames(num_frames, size=256):
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(num_frames):
+        points = np.column_stack([rng.uniform(0.3, 0.7, 18), rng.uniform(0.1, 0.9, 18), np.ones(18)])
+        frames.append({"people": [{"pose_keypoints_2d": points.ravel().tolist()}],
+                       "canvas_width": size, "canvas_height": size})
+    return frames
+
+
+@pytest.fixture
+def node(comfy_host):
+    from olo.OLO_DrawPoseKeypoint import OLO_DrawPoseKeypoint
+    return OLO_DrawPoseKeypoint()
+
+
+def test_rerun_with_one_changed_frame_hits_the_rest(node):
+    # 1 MB 只能容纳 5 张完整的 256x256 画布，压缩后的图层能容纳整段序列
+    num_frames = 40
+    frames = make_frames(num_frames)
+    first, = node.draw(frames, 0.3, False, "body", True, frame_cache_mb=1)
+    assert node._frame_cache.hits == 0
+
+    frames[17]["people"][0]["pose_keypoints_2d"][0] += 0.05
+    second, = node.draw(frames, 0.3, False, "body", True, frame_cache_mb=1)
+    assert node._frame_cache.hits == num_frames - 1
+    assert node._frame_cache.misses == num_frames + 1
+    unchanged = np.arange(num_frames) != 17
+    assert second[unchanged].equal(first[unchanged])
+    assert not second[17].equal(first[17])
+
+
+def test_cached_frames_match_uncached_render(node):
+    frames = make_frames(6)
+    expected, = node.draw(frames, 0.3, False, "wholebody", True, frame_cache_mb=0)
+    node.draw(frames, 0.3, False, "wholebody", True)
+    cached, = node.draw(frames, 0.3, False, "wholebody", True)
+    assert node._frame_cache.hits == 6
+    assert cached.equal(expected)
+
+
+def test_array_valued_keypoints_render_like_lists(node):
+    # 默认 frame_cache_mb 下 draw 经由 PoseSequence.from_keypoints 读取关键点
+    frames = make_frames(2)
+    expected, = node.draw(frames, 0.3, False, "body", True)
+    for frame in frames:
+        frame["people"][0]["pose_keypoints_2d"] = np.asarray(frame["people"][0]["pose_keypoints_2d"])
+    result, = node.draw(frames, 0.3, False, "body", True)
+    assert result.equal(expected)
+
+
+def test_overlay_returns_cpu_tensor_of_pose_size(node):
+    frames = make_frames(3, size=128)
+    base = torch.rand(1, 96, 160, 3, dtype=torch.float32)
+    result, = node.draw(frames, 0.3, False, "body", True, base_image=base, chunk_size=2)
+    assert result.shape == (3, 128, 128, 3) and result.device.type == "cpu" and result.dtype == torch.float32
+    resized = resize_images(base, 128, 128)[0]
+    untouched = (result == resized).all(dim=-1)
+    assert untouched.any() and not untouched.all()
+
+
+@pytest.mark.parametrize("render_quality", ["fast", "antialiased"])
+@pytest.mark.parametrize("base_frames, overlay_alpha", [(7, 1.0), (7, 0.4), (1, 0.7)])
+def test_chunk_size_does_not_change_output(node, render_quality, base_frames, overlay_alpha):
+    frames = make_frames(7, size=96)
+    base = torch.rand(base_frames, 80, 120, 3, generator=torch.Generator().manual_seed(0))
+    results = [node.draw(frames, 0.3, False, "wholebody", True, base_image=base, overlay_alpha=overlay_alpha,
+                         chunk_size=chunk_size, render_quality=render_quality, frame_cache_mb=0)[0]
+               for chunk_size in (1, 3, 7, 64)]
+    assert results[0].shape == (7, 96, 96, 3)
+    assert all(result.equal(results[0]) for result in results[1:])
+
+
+def test_overlay_matches_drawing_on_the_base_image(node):
+    # 原先的实现直接在 uint8 基础图像上绘制：姿态像素覆盖基础图像，其余像素保持不变
+    frames = make_frames(5, size=64)
+    base = torch.randint(0, 256, (5, 64, 64, 3), generator=torch.Generator().manual_seed(1)).float() / 255
+    pose, = node.draw(frames, 0.3, False, "body", True, frame_cache_mb=0)
+    expected = torch.where((pose > 0).any(dim=-1, keepdim=True), pose, base)
+    for chunk_size in (1, 2, 5):
+        result, = node.draw(frames, 0.3, False, "body", True, base_image=base, chunk_size=chunk_size,
+                            frame_cache_mb=0)
+        assert result.equal(expected)
+
+
+def xinsr_scale(H, W):
+    return 1 if max(H, W) < 500 else min(2 + max(H, W) // 1000, 7)
+
+
+def reference_limbs(canvas, keypoints, scores, threshold, stickwidth):
+    """原先逐条肢体绘制椭圆的实现（OpenPose 前 17 条连线）"""
+    for i, (idx1, idx2) in enumerate(BODY_LIMB_SEQ[:17]):
+        if scores[idx1] < threshold or scores[idx2] < threshold:
+            continue
+        Y = np.array([keypoints[idx1][0], keypoints[idx2][0]], dtype=np.float32)
+        X = np.array([keypoints[idx1][1], keypoints[idx2][1]], dtype=np.float32)
+        length = float(((X[0] - X[1]) ** 2 + (Y[0] - Y[1]) ** 2) ** 0.5)
+        if length < 1.0:
+            continue
+        angle = math.degrees(math.atan2(X[0] - X[1], Y[0] - Y[1]))
+        polygon = cv2.ellipse2Poly((int(float(np.mean(Y))), int(float(np.mean(X)))), (int(length / 2), int(stickwidth)),
+                                   int(angle), 0, 360, 1)
+        cv2.fillConvexPoly(canvas, polygon, BODY_COLORS[i])
+
+
+def reference_points(canvas, keypoints, scores, threshold, indices, radius, colors, strict):
+    H, W = canvas.shape[:2]
+    for n, i in enumerate(indices):
+        if scores[i] < threshold:
+            continue
+        x, y = int(keypoints[i][0]), int(keypoints[i][1])
+        inside = 0 <= x < W and 0 <= y < H and (not strict or (x > 0.01 and y > 0.01))
+        if inside:
+            cv2.circle(canvas, (x, y), radius, colors[n % len(colors)], thickness=-1)
+
+
+def reference_body17(canvas, keypoints, scores, threshold, scale_for_xinsr):
+    H, W = canvas.shape[:2]
+    avg_size = (H + W) / 2.0
+    stickwidth = max(1, int(avg_size / 256)) * (xinsr_scale(H, W) if scale_for_xinsr else 1)
+    reference_limbs(canvas, keypoints, scores, threshold, stickwidth)
+    reference_points(canvas, keypoints, scores, threshold, range(18), max(2, int(avg_size / 192)), BODY_COLORS, False)
+    return canvas
+
+
+def reference_wholebody(canvas, keypoints, scores, threshold, scale_for_xinsr):
+    H, W = canvas.shape[:2]
+    max_hand_dist = math.sqrt(W ** 2 + H ** 2) / 5.0
+    reference_limbs(canvas, keypoints, scores, threshold, 4 * (xinsr_scale(H, W) if scale_for_xinsr else 1))
+    reference_points(canvas, keypoints, scores, threshold, range(18), 4, BODY_COLORS, False)
+    reference_points(canvas, keypoints, scores, threshold, range(18, 24), 4, BODY_COLORS, False)
+    reference_points(canvas, keypoints, scores, threshold, range(24, 92), 3, [(255, 255, 255)], True)
+    for offset in (92, 113):
+        for ie, (a, b) in enumerate(HAND_EDGES):
+            idx1, idx2 = offset + a, offset + b
+            if scores[idx1] < threshold or scores[idx2] < threshold:
+                continue
+            x1, y1 = int(keypoints[idx1][0]), int(keypoints[idx1][1])
+            x2, y2 = int(keypoints[idx2][0]), int(keypoints[idx2][1])
+            if math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2) > max_hand_dist:
+                continue
+            if all(0.01 < v and v < limit for v, limit in ((x1, W), (y1, H), (x2, W), (y2, H))):
+                color = (matplotlib.colors.hsv_to_rgb([ie / float(len(HAND_EDGES)), 1.0, 1.0]) * 255.0).astype(np.uint8)
+                cv2.line(canvas, (x1, y1), (x2, y2), tuple(int(c) for c in color), thickness=2)
+        reference_points(canvas, keypoints, scores, threshold, range(offset, offset + 21), 4, [(0, 0, 255)], True)
+    return canvas
+
+
+def random_keypoints(rng, count, W, H):
+    keypoints = np.column_stack([rng.uniform(-0.1 * W, 1.1 * W, count), rng.uniform(-0.1 * H, 1.1 * H, count)])
+    # 一部分关键点放在原点，覆盖按原点视为缺失的分支；坐标超出画布的点覆盖越界检查
+    keypoints[rng.random(count) < 0.05] = 0.0
+    return keypoints.astype(np.float32), rng.uniform(0.0, 1.0, count).astype(np.float32)
+
+
+@pytest.mark.parametrize("seed", range(12))
+@pytest.mark.parametrize("size, scale_for_xinsr", [((256, 320), False), ((600, 540), True), ((1200, 900), True)])
+def test_schema_drawers_match_reference(comfy_host, seed, size, scale_for_xinsr):
+    from olo.OLO_DrawPoseKeypoint import draw_body17_keypoints_openpose_style, draw_wholebody_keypoints_openpose_style
+    H, W = size
+    rng = np.random.default_rng(seed)
+    keypoints, scores = random_keypoints(rng, 134, W, H)
+    drawers = [(draw_body17_keypoints_openpose_style, reference_body17, 18),
+               (draw_wholebody_keypoints_openpose_style, reference_wholebody, 134)]
+    for draw, reference, count in drawers:
+        expected = reference(np.zeros((H, W, 3), np.uint8), keypoints[:count], scores[:count], 0.3, scale_for_xinsr)
+        result = draw(np.zeros((H, W, 3), np.uint8), keypoints[:count].copy(), scores[:count].copy(), 0.3, scale_for_xinsr)
+        assert np.array_equal(result, expected)
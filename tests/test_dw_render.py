@@ -0,0 +1,72 @@
+import json
+import math
+
+import cv2
+import numpy as np
+import pytest
+
+from olo.dw_render import render_dw_frames, dw_line_sizes
+
+
+def reference_render_dw_pose(pose_json, width, height, scale_for_xinsr):
+    """原先 OLO_OpenposeEditor.render_dw_pose 的单帧实现（只绘制身体，按 BGR 绘制后转换为 RGB）"""
+    data = json.loads(pose_json)
+    scale_x, scale_y = width / data.get('width', width), height / data.get('height', height)
+    canvas = np.zeros((height, width, 3), dtype=np.uint8)
+    limb_seq = [[2, 3], [2, 6], [3, 4], [4, 5], [6, 7], [7, 8], [2, 9], [9, 10], [10, 11], [2, 12], [12, 13],
+                [13, 14], [2, 1], [1, 15], [15, 17], [1, 16], [16, 18]]
+    colors = [[255, 0, 0], [255, 85, 0], [255, 170, 0], [255, 255, 0], [170, 255, 0], [85, 255, 0], [0, 255, 0],
+              [0, 255, 85], [0, 255, 170], [0, 255, 255], [0, 170, 255], [0, 85, 255], [0, 0, 255], [85, 0, 255],
+              [170, 0, 255], [255, 0, 255], [255, 0, 170], [255, 0, 85]]
+    joint_radius, stickwidth = dw_line_sizes(width, height, scale_for_xinsr)
+    for person in data.get('people', []):
+        flat = person.get('pose_keypoints_2d', [])
+        keypoints = [(int(flat[i] * scale_x), int(flat[i + 1] * scale_y)) if flat[i + 2] > 0 else None
+                     for i in range(0, len(flat), 3)]
+        for (k1, k2), color in zip(limb_seq, colors):
+            if k1 - 1 >= len(keypoints) or k2 - 1 >= len(keypoints):
+                continue
+            p1, p2 = keypoints[k1 - 1], keypoints[k2 - 1]
+            if p1 is None or p2 is None:
+                continue
+            Y, X = np.array([p1[0], p2[0]]), np.array([p1[1], p2[1]])
+            length = np.sqrt((X[0] - X[1]) ** 2 + (Y[0] - Y[1]) ** 2)
+            angle = math.degrees(math.atan2(X[0] - X[1], Y[0] - Y[1]))
+            polygon = cv2.ellipse2Poly((int(np.mean(Y)), int(np.mean(X))), (int(length / 2), stickwidth), int(angle), 0, 360, 1)
+            cv2.fillConvexPoly(canvas, polygon, [int(c * 0.6) for c in color])
+        for i, keypoint in enumerate(keypoints):
+            if keypoint is not None and i < len(colors):
+                cv2.circle(canvas, keypoint, joint_radius, colors[i], thickness=-1)
+    return cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)
+
+
+def editor_frame(rng, width=640, height=480):
+    """编辑器保存的单帧格式：像素坐标，带 width/height"""
+    people = []
+    for _ in range(int(rng.integers(1, 4))):
+        count = int(rng.choice([18, 18, 12]))
+        points = np.column_stack([rng.uniform(0, width, count), rng.uniform(0, height, count),
+                                  (rng.random(count) > 0.2).astype(float)])
+        people.append({"pose_keypoints_2d": points.ravel().tolist()})
+    return {"width": width, "height": height, "people": people}
+
+
+@pytest.mark.parametrize("seed", range(15))
+@pytest.mark.parametrize("size, xinsr", [((512, 512), False), ((768, 1024), True), ((300, 200), False)])
+def test_render_dw_frames_matches_reference(seed, size, xinsr):
+    width, height = size
+    frame = json.dumps(editor_frame(np.random.default_rng(seed)))
+    expected = reference_render_dw_pose(frame, width, height, xinsr)
+    result = render_dw_frames(frame, width, height, xinsr)
+    assert result.shape == (1, height, width, 3)
+    assert np.array_equal(result[0], expected)
+
+
+def test_render_dw_frames_renders_every_frame():
+    rng = np.random.default_rng(0)
+    frames = [editor_frame(rng) for _ in range(4)]
+    result = render_dw_frames(frames, 256, 192)
+    assert result.shape == (4, 192, 256, 3)
+    for frame, image in zip(frames, result):
+        assert np.array_equal(image, reference_render_dw_pose(json.dumps(frame), 256, 192, False))
+    assert not render_dw_frames("", 64, 32).any() and render_dw_frames("", 64, 32).shape == (1, 32, 64, 3)
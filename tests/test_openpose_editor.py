@@ -0,0 +1,72 @@
+import pytest
+
+
+def make_frames(num_frames=3):
+    return [{"people": [{"pose_keypoints_2d": [0.3 + 0.02 * f, 0.2, 1.0, 0.4, 0.5, 1.0, 0.5, 0.6, 1.0] * 6}],
+             "canvas_width": 256, "canvas_height": 256} for f in range(num_frames)]
+
+
+@pytest.fixture
+def editor(comfy_host):
+    from olo.OLO_OpenposeEditor import OLO_OpenposeEditor
+    return OLO_OpenposeEditor()
+
+
+IMAGE_OUTPUTS = (0, 5, 6)  # POSE_IMAGE, dw_pose_image, dw_combined_image
+
+
+def test_cached_images_survive_downstream_edits(editor):
+    first = editor.load_pose(POSE_KEYPOINT=make_frames())["result"]
+    expected = [first[i].clone() for i in IMAGE_OUTPUTS]
+    assert all(expected[k].any() for k in range(len(IMAGE_OUTPUTS)))
+    for i in IMAGE_OUTPUTS:
+        first[i].zero_()
+
+    second = editor.load_pose(POSE_KEYPOINT=make_frames())["result"]
+    assert len(editor._render_cache) > 0
+    for k, i in enumerate(IMAGE_OUTPUTS):
+        assert second[i].equal(expected[k])
+
+
+def test_editor_instances_keep_separate_caches(comfy_host):
+    from olo.OLO_OpenposeEditor import OLO_OpenposeEditor
+
+    small, large = OLO_OpenposeEditor(), OLO_OpenposeEditor()
+    large.load_pose(POSE_KEYPOINT=make_frames(), render_cache_mb=64)
+    cached = len(large._render_cache)
+    small.load_pose(POSE_KEYPOINT=make_frames(), render_cache_mb=0)
+    assert len(small._render_cache) == 0
+    assert len(large._render_cache) == cached > 0
+    assert large._render_cache.max_bytes == 64 * 1024 * 1024
+
+
+def test_editor_frame_cache_redraws_only_changed_frames(editor):
+    frames = make_frames(8)
+    editor.load_pose(POSE_KEYPOINT=frames)
+    frames[3]["people"][0]["pose_keypoints_2d"][0] += 0.05
+    # 姿态变化后整段的缓存结果失效，逐帧缓存中只有改动的帧需要重新绘制
+    hits = editor._render_cache.hits
+    editor.load_pose(POSE_KEYPOINT=frames)
+    assert editor._render_cache.hits - hits == len(frames) - 1
+
+
+def test_editor_keeps_track_ids(editor):
+    frames = make_frames()
+    for frame in frames:
+        frame["people"].append({"pose_keypoints_2d": [0.6, 0.3, 1.0] * 18, "id": 5})
+        frame["people"][0]["id"] = 2
+    result = editor.load_pose(POSE_KEYPOINT=frames)["result"]
+    assert [[person["id"] for person in frame["people"]] for frame in result[1]] == [[2, 5]] * len(frames)
+
+    filtered = editor.load_pose(POSE_KEYPOINT=frames, pose_filter_index=5, pose_filter_by_track_id=True)["result"]
+    assert [[person["id"] for person in frame["people"]] for frame in filtered[1]] == [[5]] * len(frames)
+
+
+def test_unknown_track_id_raises(editor):
+    frames = make_frames()
+    for frame in frames:
+        frame["people"][0]["id"] = 2
+    with pytest.raises(ValueError, match="track id 7"):
+        editor.load_pose(POSE_KEYPOINT=frames, pose_filter_index=7, pose_filter_by_track_id=True)
+    with pytest.raises(ValueError, match="track id 2"):
+        editor.load_pose(POSE_JSON="{not json", pose_filter_index=2, pose_filter_by_track_id=True)
@@ -0,0 +1,113 @@
+import json
+import os
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from test_dw_render import reference_render_dw_pose, editor_frame
+
+
+@pytest.fixture
+def editor_plus(comfy_host):
+    from olo import OLO_OpenPoseEditorPlus
+    return OLO_OpenPoseEditorPlus
+
+
+def reference_combined(pose, background_path, width, height):
+    """原先的单帧合成：背景缩放到输出尺寸，灰度大于 1 的姿态像素贴到背景上"""
+    background = cv2.resize(np.array(Image.open(background_path).convert("RGB")), (width, height),
+                            interpolation=cv2.INTER_AREA)
+    _, mask = cv2.threshold(cv2.cvtColor(pose, cv2.COLOR_RGB2GRAY), 1, 255, cv2.THRESH_BINARY)
+    background[mask != 0] = pose[mask != 0]
+    return background
+
+
+@pytest.mark.parametrize("source", ["savedPose", "POSE_KEYPOINT"])
+def test_multi_frame_pose_renders_one_image_per_frame(comfy_host, editor_plus, source):
+    rng = np.random.default_rng(0)
+    frames = [editor_frame(rng) for _ in range(4)]
+    output_dir = comfy_host.get_output_directory()
+    background_path = os.path.join(output_dir, "background.png")
+    Image.fromarray(rng.integers(0, 256, (300, 420, 3), dtype=np.uint8)).save(background_path)
+    background = os.path.relpath(background_path, output_dir)
+
+    inputs = {"savedPose": json.dumps(frames)} if source == "savedPose" else {"POSE_KEYPOINT": frames}
+    result = editor_plus.OLO_OpenPoseEditorPlus().get_images("", 256, 192, False, backgroundImage=background,
+                                                             **inputs)["result"]
+    dw_pose_image, dw_combined_image = result[2], result[3]
+    assert dw_pose_image.shape == dw_combined_image.shape == (4, 192, 256, 3)
+    for frame, pose, combined in zip(frames, dw_pose_image, dw_combined_image):
+        expected = reference_render_dw_pose(json.dumps(frame), 256, 192, False)
+        assert np.array_equal(np.round(pose.numpy() * 255).astype(np.uint8), expected)
+        expected_combined = reference_combined(expected, background_path, 256, 192)
+        assert np.array_equal(np.round(combined.numpy() * 255).astype(np.uint8), expected_combined)
+
+
+def test_single_frame_saved_pose_matches_reference(editor_plus):
+    frame = editor_frame(np.random.default_rng(1))
+    result = editor_plus.OLO_OpenPoseEditorPlus().get_images("", 512, 512, True, savedPose=json.dumps(frame))["result"]
+    assert result[2].shape == (1, 512, 512, 3) and result[3] is result[2]
+    expected = reference_render_dw_pose(json.dumps(frame), 512, 512, True)
+    assert np.array_equal(np.round(result[2][0].numpy() * 255).astype(np.uint8), expected)
+
+
+def reference_fingerprint(inputs, keys):
+    """原先 IS_CHANGED 的指纹：参数按顺序用 "-" 拼接成字符串"""
+    return "-".join(str(inputs[key]) for key in keys)
+
+
+EDITOR_KEYS = ("savedPose", "backgroundImage", "POSE_JSON", "output_width_for_dwpose", "output_height_for_dwpose",
+               "scale_for_xinsr_for_dwpose", "canvas_width", "canvas_height", "pose_filter_index")
+EDITOR_PLUS_KEYS = ("savedPose", "backgroundImage", "output_width_for_dwpose", "output_height_for_dwpose",
+                    "scale_for_xinsr_for_dwpose")
+
+
+def random_editor_inputs(rng):
+    poses = ["", json.dumps(editor_frame(np.random.default_rng(0))), json.dumps([editor_frame(np.random.default_rng(1))] * 3)]
+    return dict(
+        image="", savedPose=str(rng.choice(poses)), POSE_JSON=str(rng.choice(poses[:2])), POSE_KEYPOINT=None,
+        backgroundImage=str(rng.choice(["", "background.png", "other.png"])),
+        output_width_for_dwpose=int(rng.choice([512, 768])), output_height_for_dwpose=int(rng.choice([512, 768])),
+        scale_for_xinsr_for_dwpose=bool(rng.choice([False, True])),
+        canvas_width=int(rng.choice([512, 1024])), canvas_height=768, pose_filter_index=int(rng.choice([-1, 0])),
+        show_body=True, show_face=True, show_hands=True, resolution_x=-1, pose_marker_size=4, face_marker_size=3,
+        hand_marker_size=2, hands_scale=1.0, body_scale=1.0, head_scale=1.0, overall_scale=1.0,
+        scalelist_behavior="poses", match_scalelist_method="loop extend", only_scale_pose_index=99,
+    )
+
+
+def test_is_changed_fingerprints_match_reference(comfy_host):
+    from olo.OLO_OpenposeEditor import OLO_OpenposeEditor
+    from olo.OLO_OpenPoseEditorPlus import OLO_OpenPoseEditorPlus
+
+    # 背景文件都存在时，指纹相同当且仅当原先的字符串指纹相同（不存在的背景文件现在等同于没有背景）
+    output_dir = comfy_host.get_output_directory()
+    for name in ("background.png", "other.png"):
+        Image.fromarray(np.zeros((8, 8, 3), dtype=np.uint8)).save(os.path.join(output_dir, name))
+    rng = np.random.default_rng(0)
+    samples = [random_editor_inputs(rng) for _ in range(60)]
+    for node, keys in ((OLO_OpenposeEditor, EDITOR_KEYS), (OLO_OpenPoseEditorPlus, EDITOR_PLUS_KEYS)):
+        fingerprints = [node.IS_CHANGED(**inputs) for inputs in samples]
+        references = [reference_fingerprint(inputs, keys) for inputs in samples]
+        assert all(len(fingerprint) == 32 for fingerprint in fingerprints)
+        for a in range(len(samples)):
+            for b in range(a + 1, len(samples)):
+                assert (fingerprints[a] == fingerprints[b]) == (references[a] == references[b])
+
+
+def test_is_changed_follows_background_file_content(comfy_host, editor_plus):
+    from olo.OLO_OpenposeEditor import OLO_OpenposeEditor
+
+    output_dir = comfy_host.get_output_directory()
+    path = os.path.join(output_dir, "fingerprint_background.png")
+    inputs = random_editor_inputs(np.random.default_rng(3))
+    inputs["backgroundImage"] = os.path.relpath(path, output_dir)
+    for node in (OLO_OpenposeEditor, editor_plus.OLO_OpenPoseEditorPlus):
+        Image.fromarray(np.zeros((8, 8, 3), dtype=np.uint8)).save(path)
+        before = node.IS_CHANGED(**inputs)
+        assert node.IS_CHANGED(**inputs) == before
+        # 同名文件被替换后，原先只比较文件名的指纹不变，现在随文件签名变化
+        Image.fromarray(np.zeros((16, 16, 3), dtype=np.uint8)).save(path)
+        assert node.IS_CHANGED(**inputs) != before
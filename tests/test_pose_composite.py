@@ -0,0 +1,80 @@
+import cv2
+import numpy as np
+import pytest
+import torch
+
+from olo.pose_composite import resize_images, coverage_composite, luma_mask, luma_mask_frames
+from olo.render_quality import RENDER_QUALITY_MODES
+
+
+@pytest.mark.parametrize("size", [(512, 512), (200, 300), (600, 800), (150, 200), (512, 300), (100, 100), (97, 61),
+                                  (300, 401), (1000, 1333), (299, 400)])
+@pytest.mark.parametrize("backend", ["torch", "cv2"])
+def test_resize_images_matches_cv2_inter_area(size, backend):
+    # torch 后端整数倍走 F.interpolate(area)，其余比例走插值抽头；与 cv2.INTER_AREA 的差别只是 float32 舍入，容差 1e-5
+    height, width = size
+    frames = np.random.default_rng(0).random((3, 300, 400, 3), dtype=np.float32)
+    resized = resize_images(torch.from_numpy(frames), height, width, backend=backend)
+    assert resized.shape == (3, height, width, 3) and resized.dtype == torch.float32
+    for frame, result in zip(frames, resized.numpy()):
+        expected = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        np.testing.assert_allclose(result, expected, rtol=0, atol=1e-5)
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="needs a CUDA device")
+def test_resize_images_stays_on_the_input_device():
+    images = torch.rand(2, 90, 120, 3, device="cuda")
+    resized = resize_images(images, 64, 80)
+    assert resized.device == images.device
+    expected = resize_images(images.cpu(), 64, 80, backend="cv2")
+    assert torch.allclose(resized.cpu(), expected, atol=1e-5)
+    with pytest.raises(ValueError):
+        resize_images(images, 64, 80, backend="cv2")
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="needs a CUDA device")
+def test_overlay_composites_on_the_base_image_device(comfy_host):
+    from olo.OLO_DrawPoseKeypoint import OLO_DrawPoseKeypoint
+
+    frame = {"people": [{"pose_keypoints_2d": [0.5, 0.5, 1.0] * 18}], "canvas_width": 64, "canvas_height": 64}
+    base = torch.rand(2, 48, 80, 3)
+    node = OLO_DrawPoseKeypoint()
+    on_device, = node.draw([frame] * 2, 0.3, False, "body", True, base_image=base.cuda(), frame_cache_mb=0)
+    on_host, = node.draw([frame] * 2, 0.3, False, "body", True, base_image=base, frame_cache_mb=0)
+    assert on_device.device.type == "cpu"
+    assert torch.allclose(on_device, on_host, atol=1e-5)
+
+
+def test_resize_images_same_size_returns_input():
+    images = torch.rand(1, 8, 8, 3)
+    assert resize_images(images, 8, 8) is images
+
+
+def test_coverage_composite_premultiplied_layer():
+    base = torch.full((1, 1, 3, 3), 0.5)
+    pose = torch.tensor([[[[0.0, 0.0, 0.0], [0.5, 0.25, 0.0], [1.0, 0.0, 0.0]]]])
+    combined = coverage_composite(pose, base)
+    expected = torch.tensor([[[[0.5, 0.5, 0.5], [0.75, 0.5, 0.25], [1.0, 0.0, 0.0]]]])
+    assert torch.allclose(combined, expected)
+
+
+@pytest.mark.parametrize("render_quality", RENDER_QUALITY_MODES)
+def test_overlay_has_no_dark_fringe(comfy_host, render_quality):
+    from olo.OLO_DrawPoseKeypoint import OLO_DrawPoseKeypoint
+
+    rng = np.random.default_rng(1)
+    points = np.column_stack([rng.uniform(0.2, 0.8, 18), rng.uniform(0.2, 0.8, 18), np.ones(18)])
+    frame = {"people": [{"pose_keypoints_2d": points.ravel().tolist()}], "canvas_width": 256, "canvas_height": 256}
+    base = torch.ones(1, 256, 256, 3)
+    result, = OLO_DrawPoseKeypoint().draw(frame, 0.3, False, "body", True, base_image=base,
+                                          render_quality=render_quality, frame_cache_mb=0)
+    # 姿态颜色的最大通道都是 255，叠加到白色背景上时每个像素的最大通道仍应为 1；黑边会把它拉低
+    assert (result < 1.0).any()
+    assert result.amax(dim=-1).min() >= 1.0 - 1.0 / 255
+
+
+def test_luma_mask_frames_matches_luma_mask():
+    frames = np.random.default_rng(2).integers(0, 4, (3, 40, 50, 3), dtype=np.uint8)
+    frames[0, :10] = np.random.default_rng(3).integers(0, 256, (10, 50, 3), dtype=np.uint8)
+    expected = luma_mask(torch.from_numpy(frames.astype(np.float32) / 255))
+    assert luma_mask_frames(frames).equal(expected)
@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+import pytest
+
+from olo.OLO_PoseFilter import OLO_PoseFilter, savgol_filter, recursive_filter
+
+
+def reference_hold_fill(series, valid):
+    """逐帧查找最近的有效帧：优先前一个，没有时用后一个，整条轨迹都无效时用最后一帧"""
+    F = len(series)
+    filled = series.copy()
+    for t in range(F):
+        if valid[t]:
+            continue
+        previous = [s for s in range(t) if valid[s]]
+        following = [s for s in range(t + 1, F) if valid[s]]
+        filled[t] = series[previous[-1] if previous else following[0] if following else F - 1]
+    return filled
+
+
+def reference_savgol(xy, valid, window, order):
+    """每条轨迹、每个窗口单独做最小二乘多项式拟合，取窗口中心的拟合值"""
+    F = xy.shape[0]
+    window = min(window, F if F % 2 else F - 1)
+    if window < 3 or order >= window:
+        return xy
+    half = window // 2
+    out = np.empty_like(xy)
+    for index in np.ndindex(xy.shape[1:-1]):
+        track_valid = valid[(slice(None),) + index]
+        for c in range(xy.shape[-1]):
+            series = reference_hold_fill(xy[(slice(None),) + index + (c,)], track_valid)
+            padded = np.concatenate([np.full(half, series[0]), series, np.full(half, series[-1])])
+            for t in range(F):
+                coefficients = np.polyfit(np.arange(-half, half + 1), padded[t:t + window], order)
+                out[(t,) + index + (c,)] = np.polyval(coefficients, 0.0)
+    return out
+
+
+def reference_recursive(xy, valid, confidence, filter_type, fps, min_cutoff, beta, d_cutoff, ema_alpha, confidence_weighted):
+    """逐条轨迹、逐个坐标的标量递推实现"""
+    out = xy.copy()
+    a_d = 1.0 / (1.0 + 1.0 / (2 * math.pi * d_cutoff) * fps)
+    for index in np.ndindex(xy.shape[1:]):
+        p, k, c = index
+        state, d_state, alive = xy[(0,) + index], 0.0, valid[0, p, k]
+        for t in range(1, xy.shape[0]):
+            x = xy[(t,) + index]
+            if filter_type == "ema":
+                alpha = ema_alpha
+            else:
+                d_state = d_state + a_d * ((x - state) * fps - d_state)
+                alpha = 1.0 / (1.0 + fps / (2 * math.pi * (min_cutoff + beta * abs(d_state))))
+            if confidence_weighted:
+                alpha *= min(max(confidence[t, p, k], 0.0), 1.0)
+            if alive:
+                state = state + alpha * (x - state)
+            else:
+                state, d_state = x, 0.0
+            out[(t,) + index] = state if valid[t, p, k] else x
+            alive = valid[t, p, k]
+    return out
+
+
+def random_tracks(rng, num_frames, num_people=2, num_points=5):
+    xy = np.cumsum(rng.normal(0, 3, (num_frames, num_people, num_points, 2)), axis=0) + 100
+    confidence = rng.uniform(0, 1, (num_frames, num_people, num_points))
+    valid = confidence > 0.2
+    return xy, valid, confidence
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("window, order", [(3, 1), (5, 2), (7, 2), (9, 4), (31, 3)])
+def test_savgol_filter_matches_per_window_polyfit(seed, window, order):
+    rng = np.random.default_rng(seed)
+    xy, valid, _ = random_tracks(rng, int(rng.integers(2, 25)))
+    valid[:, 0, 0] = False
+    expected = reference_savgol(xy, valid, window, order)
+    np.testing.assert_allclose(savgol_filter(xy, valid, window, order), expected, rtol=0, atol=1e-8)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("filter_type, confidence_weighted", [("one_euro", False), ("one_euro", True), ("ema", False), ("ema", True)])
+def test_recursive_filter_matches_scalar_loop(seed, filter_type, confidence_weighted):
+    rng = np.random.default_rng(seed)
+    xy, valid, confidence = random_tracks(rng, int(rng.integers(2, 30)))
+    args = (filter_type, 24.0, 0.8, 0.05, 1.5, 0.4, confidence_weighted)
+    expected = reference_recursive(xy, valid, confidence, *args)
+    np.testing.assert_allclose(recursive_filter(xy, valid, confidence, *args), expected, rtol=0, atol=1e-9)
+
+
+def test_filter_node_keeps_extra_keys():
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(6):
+        points = np.column_stack([rng.uniform(0, 1, 18), rng.uniform(0, 1, 18), np.ones(18)])
+        frames.append({"people": [{"pose_keypoints_2d": points.ravel().tolist(), "id": 3}],
+                       "canvas_width": 64, "canvas_height": 64})
+    result, = OLO_PoseFilter().filter(frames, "ema", ema_alpha=0.5)
+    assert result[0] == frames[0]
+    assert all(frame["people"][0]["id"] == 3 for frame in result)
+    expected = 0.5 * frames[0]["people"][0]["pose_keypoints_2d"][0] + 0.5 * frames[1]["people"][0]["pose_keypoints_2d"][0]
+    assert result[1]["people"][0]["pose_keypoints_2d"][0] == pytest.approx(expected)
@@ -0,0 +1,133 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from olo import pose_io
+from olo.pose_io import (write_pose_jsonl, read_pose_jsonl, write_pose_npz, read_pose_npz, write_pose_binary,
+                         read_pose_binary_header, MappedPoseFrames)
+from olo.pose_sequence import PART_KEYS
+
+
+def random_frames(rng, num_frames, with_ids=True):
+    """随机姿态序列；坐标取 1/64 的整数倍，float32 可以精确保存"""
+    frames = []
+    for _ in range(num_frames):
+        if rng.random() < 0.15:
+            frames.append({"canvas_height": 768, "canvas_width": 512})
+            continue
+        people = []
+        for _ in range(int(rng.integers(0, 4))):
+            person = {}
+            for key, count in zip(PART_KEYS, (18, 70, 21, 21)):
+                count = int(rng.choice([0, count]))
+                person[key] = (rng.integers(0, 64 * 512, count * 3) / 64).tolist()
+            if with_ids and rng.random() < 0.7:
+                person["id"] = int(rng.integers(0, 20))
+            people.append(person)
+        frames.append({"people": people, "canvas_height": 768, "canvas_width": 512})
+    return frames
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_jsonl_round_trip(tmp_path, seed):
+    frames = random_frames(np.random.default_rng(seed), 12)
+    frames[0]["source"] = "camera-1"
+    path = tmp_path / "poses.jsonl"
+    assert write_pose_jsonl(path, iter(frames)) == len(frames)
+    assert read_pose_jsonl(path) == frames
+    assert len(path.read_text().splitlines()) == len(frames)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_npz_round_trip(tmp_path, seed):
+    frames = random_frames(np.random.default_rng(seed), 12)
+    path = tmp_path / "poses.npz"
+    write_pose_npz(path, frames, width=512, height=768)
+    poses, header, ids = read_pose_npz(path)
+    assert poses.to_keypoints() == frames
+    assert header["width"] == 512 and header["height"] == 768 and header["num_frames"] == len(frames)
+    assert header["part_keys"] == list(PART_KEYS)
+    for frame, row in zip(frames, ids.tolist()):
+        expected = [person.get("id", -1) for person in frame.get("people", [])]
+        assert row[:len(expected)] == expected
+
+
+def test_npz_without_ids_has_no_extras(tmp_path):
+    frames = random_frames(np.random.default_rng(0), 4, with_ids=False)
+    write_pose_npz(tmp_path / "poses.npz", frames)
+    poses, _, ids = read_pose_npz(tmp_path / "poses.npz")
+    assert poses.extras is None and (ids == -1).all()
+    assert poses.to_keypoints() == frames
+
+
+def test_resolve_output_path_substitutes_date_tokens(tmp_path, monkeypatch):
+    now = time.struct_time((2026, 3, 7, 9, 5, 4, 5, 66, -1))
+    monkeypatch.setattr(pose_io.time, "localtime", lambda: now)
+    output_dir = str(tmp_path)
+    folder, filename, subfolder = pose_io.resolve_output_path(
+        output_dir, "poses/%date:yyyy-MM-dd%/%year%%month%%day%_%hour%%minute%%second%_%width%x%height%", 512, 768)
+    assert subfolder == os.path.join("poses", "2026-03-07")
+    assert filename == "20260307_090504_512x768"
+    assert folder == os.path.join(output_dir, "poses", "2026-03-07")
+    assert pose_io.resolve_output_path(output_dir, "%date:yy.M.d hh-mm-ss%")[1] == "26.3.7 09-05-04"
+
+
+@pytest.mark.parametrize("export_mode", ["sequence_jsonl", "sequence_npz"])
+def test_save_pose_to_json_writes_readable_sequences(comfy_host, export_mode):
+    import torch
+    from olo import OLO_OpenPoseEditorPlus
+
+    frames = random_frames(np.random.default_rng(1), 6)
+    image = torch.zeros(1, 768, 512, 3)
+    filename = OLO_OpenPoseEditorPlus.OLO_SavePoseToJson().save_json(frames, image, "poses/pose", export_mode)["result"][0]
+    path = os.path.join(comfy_host.get_output_directory(), filename)
+    if export_mode == "sequence_jsonl":
+        assert read_pose_jsonl(path) == frames
+    else:
+        poses, header, _ = read_pose_npz(path)
+        assert poses.to_keypoints() == frames
+        assert (header["width"], header["height"]) == (512, 768)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_binary_round_trip(tmp_path, seed):
+    frames = random_frames(np.random.default_rng(seed), 15)
+    path = tmp_path / "poses.olopose"
+    write_pose_binary(path, frames, source="test")
+    mapped = MappedPoseFrames(str(path))
+    assert len(mapped) == len(frames)
+    assert list(mapped) == frames
+    assert mapped[-1] == frames[-1] and mapped[2:9:3] == frames[2:9:3]
+    assert mapped.header["source"] == "test"
+
+    # 只读取选中的帧时，人物 id 也随之保留
+    for indices in (range(len(frames)), range(3, 11), range(1, 15, 4), np.array([14, 0, 7, 7])):
+        assert mapped.pose_sequence(indices).to_keypoints() == [frames[i] for i in indices]
+
+
+def test_binary_round_trip_of_empty_sequence(tmp_path):
+    path = tmp_path / "empty.olopose"
+    write_pose_binary(path, [])
+    mapped = MappedPoseFrames(str(path))
+    assert len(mapped) == 0 and list(mapped) == []
+
+
+def test_binary_header_checks(tmp_path):
+    path = tmp_path / "bad.olopose"
+    path.write_bytes(b"not a pose file")
+    with pytest.raises(ValueError):
+        read_pose_binary_header(str(path))
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_save_and_load_pose_sequence_nodes(comfy_host, zero_copy):
+    from olo import OLO_PoseFile
+
+    frames = random_frames(np.random.default_rng(2), 10)
+    filename = OLO_PoseFile.OLO_SavePoseSequence().save(frames)["result"][0]
+    path = os.path.join(comfy_host.get_output_directory(), filename)
+    loaded, count = OLO_PoseFile.OLO_LoadPoseSequence().load(path, "::3", zero_copy=zero_copy)
+    assert count == 4 and list(loaded) == frames[::3]
+    assert isinstance(loaded, list) != zero_copy
@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pytest
+
+from olo.pose_sequence import PoseSequence, PART_KEYS
+
+
+def make_frames():
+    return [{"people": [{"pose_keypoints_2d": [0.1 * i, 0.2, 1.0, 0.3, 0.4, 1.0]}],
+             "canvas_width": 512, "canvas_height": 512} for i in range(4)]
+
+
+def test_frame_hashes_follow_frame_content():
+    frames = make_frames()
+    hashes = PoseSequence.from_keypoints(frames).frame_hashes()
+    assert len(set(hashes)) == 4
+    assert PoseSequence.from_keypoints(make_frames()).frame_hashes() == hashes
+
+    frames[2]["people"][0]["pose_keypoints_2d"][0] = 0.9
+    changed = PoseSequence.from_keypoints(frames).frame_hashes()
+    assert [a == b for a, b in zip(hashes, changed)] == [True, True, False, True]
+
+    frames[1]["canvas_width"] = 256
+    frames[3]["people"] = []
+    changed = PoseSequence.from_keypoints(frames).frame_hashes()
+    assert [a == b for a, b in zip(hashes, changed)] == [True, False, False, False]
+
+
+def test_from_keypoints_accepts_array_fields():
+    frames = make_frames()
+    as_arrays = [{"people": [{"pose_keypoints_2d": np.asarray(frame["people"][0]["pose_keypoints_2d"]),
+                              "face_keypoints_2d": np.zeros(0), "hand_left_keypoints_2d": np.ones(63)}],
+                  "canvas_width": 512, "canvas_height": 512} for frame in frames]
+    poses = PoseSequence.from_keypoints(as_arrays)
+    expected = PoseSequence.from_keypoints(frames)
+    assert np.array_equal(poses.part("pose_keypoints_2d"), expected.part("pose_keypoints_2d"))
+    assert poses.part_lengths[0, 0].tolist() == [2, 0, 21, 0]
+    assert np.array_equal(poses.part("hand_left_keypoints_2d"), np.ones((4, 1, 21, 3)))
+
+
+def test_frame_hashes_extra_arrays():
+    poses = PoseSequence.from_keypoints(make_frames())
+    ids = np.zeros((4, 1), dtype=np.int64)
+    base = poses.frame_hashes(ids)
+    ids[1, 0] = 7
+    assert [a == b for a, b in zip(base, poses.frame_hashes(ids))] == [True, False, True, True]
+    assert PoseSequence.from_keypoints([]).frame_hashes() == []
+
+
+def test_frame_hashes_ignore_padding_from_other_frames():
+    hashes = PoseSequence.from_keypoints(make_frames()).frame_hashes()
+    frames = make_frames()
+    frames[0]["people"].append({"pose_keypoints_2d": [0.5, 0.5, 1.0] * 3, "hand_left_keypoints_2d": [0.1, 0.1, 1.0]})
+    changed = PoseSequence.from_keypoints(frames).frame_hashes()
+    assert [a == b for a, b in zip(hashes, changed)] == [False, True, True, True]
+
+
+def make_tracked_frames():
+    frames = make_frames()
+    for f, frame in enumerate(frames):
+        frame["people"][0]["id"] = 7
+        frame["people"].append({"pose_keypoints_2d": [0.5, 0.5, 1.0], "id": 3, "score": 0.9})
+        frame["frame_index"] = f
+        for person in frame["people"]:
+            for key in PART_KEYS[1:]:
+                person.setdefault(key, [])
+    frames[1]["people"][1].pop("id")
+    return frames
+
+
+def test_round_trip_keeps_extra_person_and_frame_keys():
+    frames = make_tracked_frames()
+    poses = PoseSequence.from_keypoints(frames)
+    assert poses.to_keypoints() == frames
+    assert json.loads(PoseSequence.from_json(poses.to_json()).to_json()) == frames
+    assert poses.copy().to_keypoints() == frames
+    assert poses.take(np.array([3, 1])).to_keypoints() == [frames[3], frames[1]]
+    assert PoseSequence.from_keypoints(make_frames()).extras is None
+
+
+def test_normalized_poses_keep_track_ids():
+    from olo.util import pose_normalized
+
+    frames = make_tracked_frames()
+    for frame in frames:
+        for person in frame["people"]:
+            person["pose_keypoints_2d"] = [v * 512 for v in person["pose_keypoints_2d"]]
+    normalized = json.loads(pose_normalized(json.dumps(frames)))
+    assert [[person.get("id") for person in frame["people"]] for frame in normalized] == [[7, 3], [7, None], [7, 3], [7, 3]]
+    assert normalized[0]["people"][0]["pose_keypoints_2d"][3] == pytest.approx(0.3)
@@ -0,0 +1,72 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from olo.pose_tracking import (linear_sum_assignment, track_frames, assign_track_ids, track_slots,
+                               _NO_MATCH_COST)
+
+
+def brute_force_cost(cost):
+    """枚举所有匹配，返回最小总代价"""
+    n, m = cost.shape
+    if n <= m:
+        return min(cost[np.arange(n), list(cols)].sum() for cols in itertools.permutations(range(m), n))
+    return min(cost[list(rows), np.arange(m)].sum() for rows in itertools.permutations(range(n), m))
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_linear_sum_assignment_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n, m = (int(v) for v in rng.integers(1, 6, size=2))
+    cost = rng.random((n, m))
+    if seed % 2:
+        cost[rng.random((n, m)) < 0.3] = _NO_MATCH_COST
+    if seed % 3 == 0:
+        cost = np.round(cost * 4) / 4  # 大量相同代价
+
+    rows, cols = linear_sum_assignment(cost)
+    assert len(rows) == len(cols) == min(n, m)
+    assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+    assert np.all(np.diff(rows) > 0)
+    assert cost[rows, cols].sum() == pytest.approx(brute_force_cost(cost))
+
+
+def test_linear_sum_assignment_empty():
+    rows, cols = linear_sum_assignment(np.zeros((0, 3)))
+    assert rows.size == 0 and cols.size == 0
+
+
+def make_person(x, y):
+    """在 (x, y) 附近生成 18 个身体关键点"""
+    offsets = np.linspace(0.0, 0.1, 18)
+    points = np.stack([x + offsets, y + offsets[::-1], np.ones(18)], axis=1)
+    return {"pose_keypoints_2d": points.reshape(-1).tolist()}
+
+
+def test_tracking_follows_people_when_list_order_swaps():
+    frames = []
+    for t in range(6):
+        left, right = make_person(0.1 + 0.01 * t, 0.2), make_person(0.6 - 0.01 * t, 0.2)
+        people = [left, right] if t % 2 == 0 else [right, left]
+        frames.append({"people": people, "canvas_width": 512, "canvas_height": 512})
+
+    ids = track_frames(frames)
+    left_ids = [ids[t, 0 if t % 2 == 0 else 1] for t in range(6)]
+    right_ids = [ids[t, 1 if t % 2 == 0 else 0] for t in range(6)]
+    assert len(set(left_ids)) == 1 and len(set(right_ids)) == 1
+    assert left_ids[0] != right_ids[0]
+
+    aligned = assign_track_ids(frames, ids, align_people=True)
+    for t, frame in enumerate(aligned):
+        assert [person["id"] for person in frame["people"]] == [left_ids[0], right_ids[0]]
+
+
+def test_track_slots_are_reused_after_a_track_ends():
+    # 每帧一个新人物，轨迹编号一直增长，但同时只存在一条轨迹
+    ids = np.arange(1000).reshape(-1, 1)
+    assert (track_slots(ids) == 0).all()
+
+    ids = np.array([[0, 1], [0, -1], [2, 0], [-1, -1]])
+    slots = track_slots(ids)
+    assert slots.tolist() == [[0, 1], [0, -1], [1, 0], [-1, -1]]
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from olo.pose_view import PoseSequenceView
+from olo.OLO_KeypointSelector import OLO_KeypointSelector
+
+
+def make_frames(count):
+    return [{"people": [], "canvas_width": 512, "canvas_height": 512, "frame": i} for i in range(count)]
+
+
+def random_slice(rng, count):
+    start, stop = (int(v) if rng.random() < 0.8 else None for v in rng.integers(-count - 2, count + 3, 2))
+    step = int(rng.choice([1, 2, 3, -1, -2, 5])) if rng.random() < 0.8 else None
+    return slice(start, stop, step)
+
+
+def slice_text(s):
+    return ":".join("" if v is None else str(v) for v in (s.start, s.stop, s.step))
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_select_matches_list_indexing(seed):
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(1, 30))
+    frames = make_frames(count)
+    view = PoseSequenceView(frames)
+
+    s = random_slice(rng, count)
+    assert view.select(s).to_list() == frames[s]
+    assert view.select(slice_text(s)).to_list() == frames[s]
+    assert view[s].to_list() == frames[s]
+
+    indices = rng.integers(-count, count, int(rng.integers(0, 10))).tolist()
+    assert view.select(indices).to_list() == [frames[i] for i in indices]
+    if indices:
+        assert view.select(", ".join(map(str, indices))).to_list() == [frames[i] for i in indices]
+
+    mask = rng.random(count) < 0.5
+    expected = [frame for frame, keep in zip(frames, mask) if keep]
+    assert view.select(mask).to_list() == expected
+    assert view.select("mask:" + "".join("1" if keep else "0" for keep in mask)).to_list() == expected
+
+    # 切片的切片、下标列表的切片都与对列表依次切片相同
+    inner = random_slice(rng, len(frames[s]))
+    assert view.select(s).select(inner).to_list() == frames[s][inner]
+    assert view.select(indices).select(inner).to_list() == [frames[i] for i in indices][inner]
+    assert all(a is b for a, b in zip(view.select(s), frames[s]))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rewrite_then_select_matches_list(seed):
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(2, 25))
+    frames = make_frames(count)
+    positions = rng.choice(count, int(rng.integers(1, count)), replace=False).tolist()
+    rewrites = {p: {"people": [], "rewritten": p} for p in positions}
+    expected = [rewrites.get(i, frame) for i, frame in enumerate(frames)]
+
+    view = PoseSequenceView(frames).rewrite(rewrites)
+    assert view.to_list() == expected
+    s = random_slice(rng, count)
+    assert view.select(s).to_list() == expected[s]
+    mask = rng.random(count) < 0.5
+    assert view.select(mask).to_list() == [frame for frame, keep in zip(expected, mask) if keep]
+    assert [frame["frame"] for frame in frames] == list(range(count))
+
+
+def test_mixed_selection_string():
+    frames = make_frames(50)
+    view = PoseSequenceView(frames)
+    assert view.select("0:10:3, 20, -1, 40:").to_list() == frames[0:10:3] + [frames[20], frames[-1]] + frames[40:]
+    with pytest.raises(IndexError):
+        view.select([50])
+    with pytest.raises(IndexError):
+        view.select("mask:0101")
+    with pytest.raises(ValueError):
+        view.select("::0")
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_keypoint_selector_matches_list_operations(zero_copy):
+    frames = make_frames(12)
+    rewrite = [{"people": [], "rewritten": i} for i in range(3)]
+    updated, single, index, selected = OLO_KeypointSelector().process(
+        frames, 4, 0, rewrite, frame_selection="1::3", frame_rewrite_selection="2, 5, -1", zero_copy=zero_copy)
+    expected = list(frames)
+    expected[2], expected[5], expected[-1] = rewrite
+    assert list(updated) == expected and list(selected) == frames[1::3]
+    assert single is frames[4] and index == 4
+    assert isinstance(updated, PoseSequenceView if zero_copy else list)
@@ -0,0 +1,47 @@
+import numpy as np
+
+from olo.render_cache import ByteLRUCache, copy_pose_data, pack_layer, unpack_layer
+
+
+def test_copy_pose_data_is_independent():
+    frames = [{"people": [{"pose_keypoints_2d": [1.0, 2.0, 1.0], "id": 3}],
+               "canvas_height": 768, "canvas_width": 512}]
+    copied = copy_pose_data(frames)
+    assert copied == frames
+    copied[0]["people"][0]["pose_keypoints_2d"][0] = 99.0
+    copied[0]["people"].append({})
+    copied[0]["canvas_width"] = 1
+    assert frames == [{"people": [{"pose_keypoints_2d": [1.0, 2.0, 1.0], "id": 3}],
+                       "canvas_height": 768, "canvas_width": 512}]
+
+
+def test_cached_pose_data_survives_downstream_edits():
+    cache = ByteLRUCache(1024)
+    cache.put("pose", {"people": [{"pose_keypoints_2d": [1.0, 2.0, 1.0]}]})
+    output = copy_pose_data(cache.get("pose"))
+    output["people"][0]["pose_keypoints_2d"].clear()
+    assert cache.get("pose")["people"][0]["pose_keypoints_2d"] == [1.0, 2.0, 1.0]
+
+
+def test_pack_layer_round_trip():
+    canvas = np.zeros((40, 30, 3), dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    canvas[rng.random((40, 30)) < 0.2] = rng.integers(1, 256, size=3, dtype=np.uint8)
+    canvas[5, 10:25] = (0, 0, 7)
+    canvas[-1, -1] = (255, 0, 0)
+    packed = pack_layer(canvas)
+    restored = unpack_layer(packed)
+    assert restored.dtype == np.uint8 and np.array_equal(restored, canvas)
+    restored[:] = 0
+    assert np.array_equal(unpack_layer(packed), canvas)
+    assert not unpack_layer(pack_layer(np.zeros((4, 4, 3), dtype=np.uint8))).any()
+
+
+def test_cache_counts_hits_and_disabled_cache_stores_nothing():
+    cache = ByteLRUCache(1024)
+    cache.put("a", b"x" * 10)
+    assert cache.get("a") == b"x" * 10 and cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.resize(0)
+    cache.put("c", b"", nbytes=0)
+    assert len(cache) == 0
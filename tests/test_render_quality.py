@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from olo.render_quality import get_render_quality
+
+HAND_PEAKS = np.stack([np.linspace(0.2, 0.8, 21), np.linspace(0.3, 0.7, 21)], axis=1)
+
+
+@pytest.fixture
+def util(comfy_host):
+    import olo.util
+    return olo.util
+
+
+def test_draft_half_line_width_is_positive():
+    quality = get_render_quality("draft_half")
+    assert [quality.line_width(size) for size in (1, 2, 3, 4)] == [1, 1, 2, 2]
+
+
+@pytest.mark.parametrize("hand_marker_size", [0, 1])
+def test_draft_half_handpose_small_markers_draw_edges(util, hand_marker_size):
+    # 手腕和指尖之外的边都画出来，而不只是关节点（关节点为红色 (0, 0, 255)）
+    canvas = util.draw_handpose(np.zeros((128, 128, 3), dtype=np.uint8), [HAND_PEAKS], hand_marker_size, "draft_half")
+    assert canvas.shape == (128, 128, 3)
+    edge_pixels = canvas[..., :2].any(axis=-1)
+    assert edge_pixels.sum() > 20
+
+
+@pytest.mark.parametrize("render_quality", ["fast", "antialiased", "supersample_2x", "draft_half"])
+def test_draw_pose_small_markers_draw_every_layer(util, render_quality):
+    body = np.column_stack([np.linspace(0.3, 0.7, 18), np.linspace(0.2, 0.8, 18)])
+    face = np.column_stack([np.linspace(0.45, 0.55, 10), np.full(10, 0.15)])
+    pose = dict(bodies=dict(candidate=body.tolist(), subset=[list(range(18))]), faces=[face], hands=[HAND_PEAKS])
+    empty = dict(bodies=dict(candidate=[], subset=[]), faces=[], hands=[])
+    canvas = util.draw_pose(pose, 128, 96, 1, 1, 1, render_quality)
+    assert canvas.shape == (128, 96, 3)
+    for layer in ("bodies", "faces", "hands"):
+        only = dict(empty, **{layer: pose[layer]})
+        assert util.draw_pose(only, 128, 96, 1, 1, 1, render_quality).any(), layer
@@ -0,0 +1,344 @@
+import json
+import math
+
+import cv2
+import matplotlib.colors
+import numpy as np
+import pytest
+import torch
+
+from olo.keypoint_schema import BODY_LIMB_SEQ, BODY_COLORS, HAND_EDGES
+
+
+@pytest.fixture
+def util(comfy_host):
+    import olo.util
+    return olo.util
+
+
+def reference_bodypose(canvas, candidate, subset, pose_marker_size):
+    """原先逐人物、逐肢体的 draw_bodypose；人物的 subset 比关节序号短时视为关节缺失"""
+    H, W, C = canvas.shape
+    candidate = np.array(candidate)
+
+    def joint(person, i):
+        return int(person[i]) if i < len(person) else -1
+
+    for i in range(17):
+        for person in subset:
+            index = np.array([joint(person, j) for j in BODY_LIMB_SEQ[i]])
+            if -1 in index:
+                continue
+            Y = candidate[index, 0] * float(W)
+            X = candidate[index, 1] * float(H)
+            mX = np.mean(X)
+            mY = np.mean(Y)
+            length = ((X[0] - X[1]) ** 2 + (Y[0] - Y[1]) ** 2) ** 0.5
+            angle = math.degrees(math.atan2(X[0] - X[1], Y[0] - Y[1]))
+            polygon = cv2.ellipse2Poly((int(mY), int(mX)), (int(length / 2), pose_marker_size), int(angle), 0, 360, 1)
+            cv2.fillConvexPoly(canvas, polygon, BODY_COLORS[i])
+
+    canvas = (canvas * 0.6).astype(np.uint8)
+
+    for i in range(18):
+        for person in subset:
+            index = joint(person, i)
+            if index == -1:
+                continue
+            x, y = candidate[index][0:2]
+            cv2.circle(canvas, (int(x * W), int(y * H)), pose_marker_size, BODY_COLORS[i], thickness=-1)
+    return canvas
+
+
+def random_bodies(rng, lengths):
+    """生成若干人物的 candidate 和 subset，subset 的长度由 lengths 给出，约 20% 的关节缺失"""
+    candidate, subset = [], []
+    for length in lengths:
+        person = []
+        for _ in range(length):
+            if rng.random() < 0.2:
+                person.append(-1)
+            else:
+                person.append(len(candidate))
+                candidate.append(rng.uniform(0.05, 0.95, 2).tolist())
+        subset.append(person)
+    return candidate, subset
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_draw_bodypose_accepts_ragged_subset(util, seed):
+    rng = np.random.default_rng(seed)
+    candidate, subset = random_bodies(rng, [18, int(rng.integers(1, 18)), 18, int(rng.integers(1, 18))])
+    expected = reference_bodypose(np.zeros((96, 128, 3), dtype=np.uint8), candidate, subset, 3)
+    result = util.draw_bodypose(np.zeros((96, 128, 3), dtype=np.uint8), candidate, subset, 3)
+    assert np.array_equal(result, expected)
+
+
+def test_subset_array_pads_short_people(util):
+    padded = util.subset_array([[0, 1, -1], list(range(2, 22))])
+    assert padded.shape == (2, 20)
+    assert padded[0, :3].tolist() == [0, 1, -1] and (padded[0, 3:] == -1).all()
+    assert util.subset_array([[]]).shape == (1, 18)
+
+
+def reference_handpose(canvas, all_hand_peaks, hand_marker_size):
+    """原先逐条边、逐个关键点的 draw_handpose"""
+    H, W, C = canvas.shape
+    eps = 0.01
+    for peaks in all_hand_peaks:
+        peaks = np.array(peaks)
+        for ie, e in enumerate(HAND_EDGES.tolist()):
+            x1, y1 = peaks[e[0]]
+            x2, y2 = peaks[e[1]]
+            x1, y1, x2, y2 = int(x1 * W), int(y1 * H), int(x2 * W), int(y2 * H)
+            if x1 > eps and y1 > eps and x2 > eps and y2 > eps:
+                color = matplotlib.colors.hsv_to_rgb([ie / float(len(HAND_EDGES)), 1.0, 1.0]) * 255
+                cv2.line(canvas, (x1, y1), (x2, y2), color, thickness=1 if hand_marker_size == 0 else hand_marker_size)
+        joint_size = hand_marker_size + 1 if hand_marker_size < 2 else hand_marker_size + 2
+        for x, y in peaks:
+            x, y = int(x * W), int(y * H)
+            if x > eps and y > eps:
+                cv2.circle(canvas, (x, y), joint_size, (0, 0, 255), thickness=-1)
+    return canvas
+
+
+def reference_facepose(canvas, all_lmks, face_marker_size):
+    """原先逐个关键点的 draw_facepose"""
+    H, W, C = canvas.shape
+    for lmks in all_lmks:
+        for x, y in np.array(lmks):
+            x, y = int(x * W), int(y * H)
+            if x > 0.01 and y > 0.01:
+                cv2.circle(canvas, (x, y), face_marker_size, (255, 255, 255), thickness=-1)
+    return canvas
+
+
+def random_peaks(rng, groups, count):
+    """生成若干组归一化关键点，部分点落在原点附近或画面外，用来覆盖有效性判断"""
+    all_peaks = []
+    for _ in range(groups):
+        peaks = rng.uniform(-0.05, 1.05, (count, 2))
+        peaks[rng.random(count) < 0.15] = 0.0
+        all_peaks.append(peaks.tolist())
+    return all_peaks
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fill_limbs_matches_per_limb_ellipses(util, seed):
+    rng = np.random.default_rng(seed)
+    n = 30
+    limb_ids = rng.integers(0, 17, n)
+    centers = rng.uniform(-10, 140, (n, 2))
+    half_lengths = rng.uniform(0, 60, n)
+    angles = rng.uniform(-180, 180, n)
+    stickwidth = int(rng.integers(1, 8))
+
+    expected = np.zeros((100, 130, 3), dtype=np.uint8)
+    for limb, (x, y), half_length, angle in zip(limb_ids, centers, half_lengths, angles):
+        polygon = cv2.ellipse2Poly((int(x), int(y)), (int(half_length), stickwidth), int(angle), 0, 360, 1)
+        cv2.fillConvexPoly(expected, polygon, BODY_COLORS[limb])
+    result = util.fill_limbs(np.zeros((100, 130, 3), dtype=np.uint8), limb_ids, centers, half_lengths, angles,
+                             stickwidth, BODY_COLORS)
+    assert np.array_equal(result, expected)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_draw_circles_matches_per_point_circles(util, seed):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(-5, 135, (40, 2))
+    colors = [tuple(int(c) for c in rng.integers(0, 256, 3)) for _ in range(len(points))]
+    radius = int(rng.integers(0, 6))
+
+    expected = np.zeros((100, 130, 3), dtype=np.uint8)
+    for (x, y), color in zip(points, colors):
+        cv2.circle(expected, (int(x), int(y)), radius, color, thickness=-1)
+    result = util.draw_circles(np.zeros((100, 130, 3), dtype=np.uint8), points, radius, colors)
+    assert np.array_equal(result, expected)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("marker_size", [0, 1, 2, 4])
+def test_draw_handpose_and_facepose_match_reference(util, seed, marker_size):
+    rng = np.random.default_rng(seed)
+    hands = random_peaks(rng, 3, 21)
+    faces = random_peaks(rng, 2, 68)
+
+    expected = reference_handpose(np.zeros((120, 90, 3), dtype=np.uint8), hands, marker_size)
+    assert np.array_equal(util.draw_handpose(np.zeros((120, 90, 3), dtype=np.uint8), hands, marker_size), expected)
+    expected = reference_facepose(np.zeros((120, 90, 3), dtype=np.uint8), faces, marker_size)
+    assert np.array_equal(util.draw_facepose(np.zeros((120, 90, 3), dtype=np.uint8), faces, marker_size), expected)
+
+
+def reference_extend_scalelist(scalelist_behavior, frames, scale_values, match_scalelist_method, only_scale_pose_index):
+    """
+    原先逐帧逐人物的 extend_scalelist，包含向量化时修正的两处问题：
+    'images' 模式整帧缩放时按帧取值并生成列表；负数 only_scale_pose_index 按本帧的人物取值
+    """
+    scale_lists = [[] for _ in scale_values]
+    num_imgs = 0
+    num_poses = 0
+    for img in frames:
+        if 'people' not in img:
+            for scale_list in scale_lists:
+                scale_list.append([0.0])
+            continue
+        n = len(img['people'])
+        k = only_scale_pose_index
+        targeted = k < n and k >= -n
+        for i, scales in enumerate(scale_values):
+            subscales = [1.0] * n
+            position = num_poses + k % n if targeted and scalelist_behavior == 'poses' else num_poses
+            if scalelist_behavior != 'poses':
+                position = num_imgs
+            frame_end = num_poses + n if scalelist_behavior == 'poses' else num_imgs + 1
+            if not isinstance(scales, list):
+                values = [scales] * n
+            elif len(scales) >= frame_end:
+                values = scales[position:position + n] if scalelist_behavior == 'poses' else [scales[position]] * n
+            elif match_scalelist_method == 'no extend':
+                values = [1.0] * n
+            elif match_scalelist_method == 'loop extend':
+                extended = scales * math.ceil((frame_end + n) / len(scales))
+                values = extended[position:position + n] if scalelist_behavior == 'poses' else [extended[position]] * n
+            else:
+                values = [scales[-1]] * n
+            if targeted:
+                subscales[k] = values[0]
+            else:
+                subscales = list(values)
+            scale_lists[i].append(subscales)
+        num_poses += n
+        num_imgs += 1
+    return scale_lists
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_extend_scalelist_matches_reference(util, seed):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(int(rng.integers(1, 8))):
+        if rng.random() < 0.15:
+            frames.append({"canvas_width": 512, "canvas_height": 512})
+        else:
+            frames.append({"people": [{} for _ in range(int(rng.integers(0, 4)))],
+                           "canvas_width": 512, "canvas_height": 512})
+    scale_values = [float(np.round(rng.uniform(0.5, 2), 2)) if rng.random() < 0.3
+                    else np.round(rng.uniform(0.5, 2, int(rng.integers(1, 12))), 2).tolist() for _ in range(4)]
+    behavior = ("poses", "images")[seed % 2]
+    method = ("no extend", "loop extend", "clamp extend")[seed % 3]
+    index = int(rng.choice([99, 0, 1, 2, -1, -2]))
+
+    expected = reference_extend_scalelist(behavior, frames, scale_values, method, index)
+    assert util.extend_scalelist(behavior, json.dumps(frames), *scale_values, method, index) == expected
+    assert util.extend_scalelist(behavior, frames, *scale_values, method, index) == expected
+
+
+PART_KEYS = ("pose_keypoints_2d", "face_keypoints_2d", "hand_left_keypoints_2d", "hand_right_keypoints_2d")
+
+
+def reference_pose_normalized(frames):
+    """原先逐帧的 pose_normalized：帧内任一数值大于 2.0 时把 x、y 除以画布尺寸"""
+    frames = json.loads(json.dumps(frames))
+    for image in frames:
+        if 'people' not in image:
+            continue
+        values = [v for figure in image['people'] for key in PART_KEYS for v in (figure.get(key) or [])]
+        if values and max(values) > 2.0:
+            for figure in image['people']:
+                for key in PART_KEYS:
+                    points = figure.get(key)
+                    for i in range(0, len(points or []), 3):
+                        points[i] = points[i] / float(image['canvas_width'])
+                        points[i + 1] = points[i + 1] / float(image['canvas_height'])
+    return frames
+
+
+def parts_of(frames):
+    """每帧每个人物的各字段数值，缺失或为 None 的字段视为空列表"""
+    return [[[np.asarray(person.get(key) or [], dtype=np.float64) for key in PART_KEYS]
+             for person in frame.get('people', [])] for frame in frames]
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_pose_normalized_matches_reference(util, seed):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(int(rng.integers(1, 6))):
+        W, H = int(rng.integers(64, 1024)), int(rng.integers(64, 1024))
+        if rng.random() < 0.15:
+            frames.append({"canvas_width": W, "canvas_height": H})
+            continue
+        pixel = rng.random() < 0.5
+        people = []
+        for _ in range(int(rng.integers(0, 3))):
+            person = {}
+            for key, count in zip(PART_KEYS, (18, 68, 21, 21)):
+                if rng.random() < 0.25:
+                    person[key] = None if rng.random() < 0.5 else []
+                    continue
+                points = np.column_stack([rng.uniform(0, W if pixel else 1, count), rng.uniform(0, H if pixel else 1, count),
+                                          rng.uniform(0, 1, count)])
+                person[key] = points.ravel().tolist()
+            people.append(person)
+        frames.append({"people": people, "canvas_width": W, "canvas_height": H})
+
+    expected = parts_of(reference_pose_normalized(frames))
+    for result in (json.loads(util.pose_normalized(json.dumps(frames))),
+                   util.pose_normalized(util.PoseSequence.from_keypoints(frames)).to_keypoints()):
+        result = parts_of(result)
+        assert len(result) == len(expected)
+        for frame, expected_frame in zip(result, expected):
+            assert len(frame) == len(expected_frame)
+            for person, expected_person in zip(frame, expected_frame):
+                for part, expected_part in zip(person, expected_person):
+                    np.testing.assert_allclose(part, expected_part, rtol=1e-12)
+
+
+def make_pose_frames(rng, num_frames, size=(160, 128)):
+    frames = []
+    for _ in range(num_frames):
+        people = []
+        for _ in range(int(rng.integers(1, 3))):
+            person = {}
+            for key, count in zip(PART_KEYS, (18, 68, 21, 21)):
+                points = np.column_stack([rng.uniform(0.1, 0.9, count), rng.uniform(0.1, 0.9, count), np.ones(count)])
+                person[key] = points.ravel().tolist()
+            people.append(person)
+        frames.append({"people": people, "canvas_width": size[1], "canvas_height": size[0]})
+    return frames
+
+
+@pytest.mark.parametrize("render_quality", ["fast", "antialiased"])
+def test_draw_pose_json_threads_match_serial_render(util, render_quality):
+    frames = make_pose_frames(np.random.default_rng(0), 9)
+    scales = util.extend_scalelist("poses", frames, [0.8, 1.2], 1.1, 0.9, 1.0, "loop extend", 99)
+    args = (json.dumps(frames), 256, True, True, True, 3, 2, 2, *scales)
+    serial_images, serial_scaled = util.draw_pose_json(*args, num_workers=1, quality=render_quality)
+    for workers in (0, 4):
+        images, scaled = util.draw_pose_json(*args, num_workers=workers, quality=render_quality)
+        assert scaled == serial_scaled
+        assert len(images) == len(serial_images) == 9
+        assert all(np.array_equal(a, b) for a, b in zip(images, serial_images))
+    assert serial_images[0].shape == (320, 256, 3)
+
+
+def test_draw_pose_json_stops_at_frame_without_people(util):
+    frames = make_pose_frames(np.random.default_rng(1), 5)
+    del frames[3]["people"]
+    scales = util.extend_scalelist("poses", frames, 1.0, 1.0, 1.0, 1.0, "loop extend", 99)
+    images = util.draw_pose_json(json.dumps(frames), -1, True, True, True, 3, 2, 2, *scales, num_workers=3)
+    assert isinstance(images, list) and len(images) == 3
+
+
+@pytest.mark.parametrize("shape", [(1, 8, 6, 3), (5, 33, 17, 3)])
+def test_images_to_tensor_matches_stacked_division(util, shape):
+    frames = list(np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8))
+    expected = torch.from_numpy(np.stack(frames).astype(np.float32) / 255)
+    for source, count in ((frames, None), (np.stack(frames), None), ((f for f in frames), len(frames))):
+        images = util.images_to_tensor(source, count)
+        assert images.dtype == torch.float32
+        assert torch.equal(images, expected)
+
+
+def test_images_to_tensor_empty(util):
+    assert util.images_to_tensor([]).shape == (0, 0, 0, 3)
@@ -1,420 +1,464 @@
-import math
+import os
 import json
 import numpy as np
+import torch
 import matplotlib
 import cv2
+from concurrent.futures import ThreadPoolExecutor
 from comfy.utils import ProgressBar
 from typing import List, Dict
+from .pose_sequence import PoseSequence, canvas_value
+from .keypoint_schema import BODY_LIMB_SEQ, BODY_COLORS, HAND_EDGES, HAND_EDGE_COLORS
+from .render_quality import get_render_quality
+from .render_cache import pack_layer, unpack_layer
 
 eps = 0.01
 
-def extend_scalelist(scalelist_behavior, pose_json, hands_scale, body_scale, head_scale, overall_scale, match_scalelist_method, only_scale_pose_index) -> List[list]:
-    if pose_json.startswith('{'):
-        pose_json = '[{}]'.format(pose_json)
-    poses = json.loads(pose_json)
-    # initialize scale lists
-    hands_scalelist, body_scalelist, head_scalelist, overall_scalelist = [], [], [], []
-    num_imgs = 0
-    num_poses = 0
-    scale_values = [hands_scale, body_scale, head_scale, overall_scale]
-    scale_lists = [hands_scalelist, body_scalelist, head_scalelist, overall_scalelist]
-    for img in poses:
-        default_scale = 0.0
-        default_num_person = 1
-        if 'people' in img:
-            default_scale = 1.0
-            default_num_person = len(img['people'])
-            subscales = [default_scale]*default_num_person
-            if scalelist_behavior == 'poses':
-                for i, scales in enumerate(scale_values):
-                    if isinstance(scales, (list, tuple)):
-                        if len(scales) >= num_poses + default_num_person:
-                            if only_scale_pose_index<default_num_person and only_scale_pose_index >= -default_num_person:
-                                subscales[only_scale_pose_index] = scales[num_poses + only_scale_pose_index]
-                            else:
-                                subscales = scales[num_poses:num_poses + default_num_person]
-                        else:
-                            if match_scalelist_method == 'no extend':
-                                subscales = [default_scale]*default_num_person
-                            elif match_scalelist_method == 'loop extend':
-                                extend_scaleslist = scales*math.ceil((num_poses+default_num_person) / len(scales))
-                                if only_scale_pose_index<default_num_person and only_scale_pose_index >= -default_num_person:
-                                    subscales[only_scale_pose_index] = extend_scaleslist[num_poses + only_scale_pose_index]
-                                else:
-                                    subscales = extend_scaleslist[num_poses:num_poses + default_num_person]
-                            elif match_scalelist_method == 'clamp extend':
-                                if only_scale_pose_index<default_num_person and only_scale_pose_index >= -default_num_person:
-                                    subscales[only_scale_pose_index] = scales[-1]
-                                else:
-                                    subscales = [scales[-1]] * default_num_person
-                    else:
-                        if only_scale_pose_index<default_num_person and only_scale_pose_index >= -default_num_person:
-                            subscales[only_scale_pose_index] = scales
-                        else:
-                            subscales = [scales] * default_num_person
-
-                    scale_lists[i].append(subscales.copy())
-            else:
-                for i, scales in enumerate(scale_values):
-                    if isinstance(scales, (list, tuple)):
-                        if len(scales) >= num_imgs + 1:
-                            if only_scale_pose_index<default_num_person and only_scale_pose_index >= -default_num_person:
-                                subscales[only_scale_pose_index] = scales[num_imgs]
-                            else:
-                                subscales = scales[num_poses]*default_num_person
-                        else:
-                            if match_scalelist_method == 'no extend':
-                                subscales = [default_scale]*default_num_person
-                            elif match_scalelist_method == 'loop extend':
-                                extend_scaleslist = scales*math.ceil((num_imgs+1) / len(scales))
-                                if only_scale_pose_index<default_num_person and only_scale_pose_index >= -default_num_person:
-                                    subscales[only_scale_pose_index] = extend_scaleslist[num_imgs]
-                                else:
-                                    subscales = extend_scaleslist[num_imgs]*default_num_person
-                            elif match_scalelist_method == 'clamp extend':
-                                if only_scale_pose_index<default_num_person and only_scale_pose_index >= -default_num_person:
-                                    subscales[only_scale_pose_index] = scales[-1]
-                                else:
-                                    subscales = [scales[-1]] * default_num_person
-                    else:
-                        if only_scale_pose_index<default_num_person and only_scale_pose_index >= -default_num_person:
-                            subscales[only_scale_pose_index] = scales
-                        else:
-                            subscales = [scales] * default_num_person
-
-                    scale_lists[i].append(subscales.copy())
-
-            num_poses += default_num_person
-            num_imgs += 1
-        else:
-            # if no people in image
-            for i in range(len(scale_values)):
-                scale_lists[i].append([default_scale])
+def _people_counts(pose_json):
+    """
+    返回每帧的人数和是否带有 "people" 字段
+
+    支持 PoseSequence、POSE_KEYPOINT（帧字典或帧字典列表）和 JSON 字符串，前两者不会再解析 JSON。
+    """
+    if isinstance(pose_json, PoseSequence):
+        return pose_json.people_counts.astype(np.int64), pose_json.has_people.astype(bool)
+    if isinstance(pose_json, str):
+        if pose_json.startswith('{'):
+            pose_json = '[{}]'.format(pose_json)
+        pose_json = json.loads(pose_json)
+    if isinstance(pose_json, dict):
+        pose_json = [pose_json]
+    has_people = np.array(['people' in img for img in pose_json], dtype=bool)
+    counts = np.array([len(img['people'] or []) if 'people' in img else 0 for img in pose_json], dtype=np.int64)
+    return counts, has_people
+
+def _expand_scale(scales, positions, covered, match_scalelist_method):
+    """
+    按位置从缩放列表中取值，一次处理所有人物
+
+    Args:
+        scales: 缩放值或缩放值列表
+        positions: 每个人物在缩放列表中对应的位置
+        covered: 每个人物所在帧是否被缩放列表完整覆盖
+        match_scalelist_method: 缩放列表长度不足时的扩展方式
+
+    Returns:
+        np.array: 每个人物的缩放值
+    """
+    if not isinstance(scales, (list, tuple)):
+        return np.full(len(positions), scales, dtype=np.float64)
+    values = np.asarray(scales, dtype=np.float64)
+    if not len(values):
+        return np.ones(len(positions), dtype=np.float64)
+    out = np.ones(len(positions), dtype=np.float64)
+    out[covered] = values[positions[covered]]
+    rest = ~covered
+    if match_scalelist_method == 'loop extend':
+        out[rest] = values[positions[rest] % len(values)]
+    elif match_scalelist_method == 'clamp extend':
+        out[rest] = values[-1]
+    return out
 
+def extend_scalelist(scalelist_behavior, pose_json, hands_scale, body_scale, head_scale, overall_scale, match_scalelist_method, only_scale_pose_index) -> List[list]:
+    """
+    为每帧每个人物生成 手部 / 身体 / 头部 / 整体 的缩放值
+
+    scalelist_behavior 为 'poses' 时缩放列表按人物依次对应（跨帧累计），为 'images' 时按帧对应、同一帧内的人物共用一个值。
+    only_scale_pose_index 在帧内人数范围内时（支持负数）只缩放该人物，其余人物保持 1.0。
+    列表长度不足时按 match_scalelist_method 处理：no extend 为 1.0，loop extend 循环取值，clamp extend 使用最后一个值。
+    没有 "people" 字段的帧返回 [0.0]。
+
+    所有帧的人数先统计为数组，缩放值按位置一次性取出，再切分回每帧的列表。
+
+    Returns:
+        list: [hands_scalelist, body_scalelist, head_scalelist, overall_scalelist]，每个都是每帧一个人物缩放值列表
+    """
+    counts, has_people = _people_counts(pose_json)
+    people_counts = counts[has_people]
+
+    # 每个人物所在的帧（只统计带 people 的帧）、帧内序号，以及此前累计的人数和帧数
+    frame_of_person = np.repeat(np.arange(len(people_counts)), people_counts)
+    pose_offsets = np.cumsum(people_counts) - people_counts
+    local_index = np.arange(len(frame_of_person)) - pose_offsets[frame_of_person]
+    frame_counts = people_counts[frame_of_person]
+
+    # 只缩放指定人物：索引在帧内人数范围内时生效，负数从该帧的最后一个人物算起
+    k = only_scale_pose_index
+    index_frames = (k < people_counts) & (k >= -people_counts)
+    targeted = ~index_frames[frame_of_person] | (local_index == np.mod(k, np.maximum(frame_counts, 1)))
+
+    if scalelist_behavior == 'poses':
+        positions = pose_offsets[frame_of_person] + local_index
+        frame_end = pose_offsets + people_counts
+    else:
+        positions = frame_of_person
+        frame_end = np.arange(len(people_counts)) + 1
+
+    bounds = np.cumsum(people_counts)[:-1].tolist()
+    scale_lists = []
+    for scales in (hands_scale, body_scale, head_scale, overall_scale):
+        length = len(scales) if isinstance(scales, (list, tuple)) else 0
+        covered = (length >= frame_end)[frame_of_person]
+        values = np.where(targeted, _expand_scale(scales, positions, covered, match_scalelist_method), 1.0).tolist()
+        people_scales = iter([values[start:stop] for start, stop in zip([0] + bounds, bounds + [len(values)])])
+        scale_lists.append([next(people_scales) if has else [0.0] for has in has_people.tolist()])
     return scale_lists
 
-def pose_normalized(pose_json):
-    if pose_json.startswith('{'):
-        pose_json = '[{}]'.format(pose_json)
-    images = json.loads(pose_json)
-    for image in images:
-        if 'people' not in image:
-            continue
-        figures = image['people']
-        H = image['canvas_height']
-        W = image['canvas_width']
-        normalized = 0.0
-        for figure in figures:
-            if 'pose_keypoints_2d' in figure:
-                body = figure['pose_keypoints_2d']
-                if body:
-                    normalized = max(body)
-                    if normalized > 2.0:
-                        break
-            if 'face_keypoints_2d' in figure:
-                face = figure['face_keypoints_2d']
-                if face:
-                    normalized = max(face)
-                    if normalized > 2.0:
-                        break
-            if 'hand_left_keypoints_2d' in figure:
-                lhand = figure['hand_left_keypoints_2d']
-                if lhand:
-                    normalized = max(lhand)
-                    if normalized > 2.0:
-                        break
-            if 'hand_right_keypoints_2d' in figure:
-                rhand = figure['hand_right_keypoints_2d']
-                if rhand:
-                    normalized = max(rhand)
-                    if normalized > 2.0:
-                        break
-        if normalized > 2.0:
-            for figure in figures:
-                if 'pose_keypoints_2d' in figure:
-                    body = figure['pose_keypoints_2d']
-                    if body is not None:
-                        for i in range(0, len(body), 3):
-                            body[i] = body[i] / float(W)
-                            body[i+1] = body[i+1] / float(H)
-                if 'face_keypoints_2d' in figure:
-                    face = figure['face_keypoints_2d']
-                    if face is not None:
-                        for i in range(0, len(face), 3):
-                            face[i] = face[i] / float(W)
-                            face[i+1] = face[i+1] / float(H)
-                if 'hand_left_keypoints_2d' in figure:
-                    lhand = figure['hand_left_keypoints_2d']
-                    if lhand is not None:
-                        for i in range(0, len(lhand), 3):
-                            lhand[i] = lhand[i] / float(W)
-                            lhand[i+1] = lhand[i+1] / float(H)
-                if 'hand_right_keypoints_2d' in figure:
-                    rhand = figure['hand_right_keypoints_2d']
-                    if rhand is not None:
-                        for i in range(0, len(rhand), 3):
-                            rhand[i] = rhand[i] / float(W)
-                            rhand[i+1] = rhand[i+1] / float(H)
-    return json.dumps(images)
+def pose_normalized(pose_json, coordinate_space="auto"):
+    if isinstance(pose_json, PoseSequence):
+        return pose_sequence_normalized(pose_json, coordinate_space)
+    return pose_sequence_normalized(PoseSequence.from_json(pose_json), coordinate_space).to_json()
 
 def scale(point, scale_factor, pivot):
     return [(point[i] - pivot[i])*scale_factor + pivot[i] for i in range(len(point))]
 
-def draw_pose_json(pose_json, resolution_x, show_body, show_face, show_hands, pose_marker_size, face_marker_size, hand_marker_size, hands_scalelist, body_scalelist, head_scalelist, overall_scalelist):
+def scale_points(points, scale_factor, pivot):
+    return (points - pivot)*scale_factor + pivot
+
+def pose_sequence_normalized(poses, coordinate_space="auto"):
+    """
+    将像素坐标的帧归一化到 0~1，所有帧在一次数组运算中完成
+
+    Args:
+        poses: PoseSequence
+        coordinate_space: "auto" 按帧检测，帧内任一数值大于 2.0 即视为像素坐标；
+            "normalized" 表示已经归一化，直接跳过检测；"pixel" 表示所有帧都是像素坐标
+
+    Returns:
+        PoseSequence: 归一化后的新序列
+    """
+    H, W = poses.canvas_sizes[:, 0], poses.canvas_sizes[:, 1]
+    missing = poses.has_people & ((H == 0) | (W == 0))
+    if missing.any():
+        raise KeyError('canvas_height' if (H[missing] == 0).any() else 'canvas_width')
+    if coordinate_space == "normalized":
+        return poses
+
+    poses = poses.copy()
+    mask = poses.point_mask()
+    if coordinate_space == "pixel":
+        pixel = poses.has_people.copy()
+    elif coordinate_space == "auto":
+        values = np.where(mask[..., None], poses.keypoints, -np.inf)
+        pixel = poses.has_people & (values.reshape(len(poses), -1).max(axis=1, initial=-np.inf) > 2.0)
+    else:
+        raise ValueError(f"Unknown coordinate space: {coordinate_space}")
+
+    divide = mask & pixel[:, None, None]
+    size = np.stack([np.where(pixel, W, 1.0), np.where(pixel, H, 1.0)], axis=1)[:, None, None, :]
+    xy = poses.keypoints[..., :2]
+    poses.keypoints[..., :2] = np.where(divide[..., None], xy / size, xy)
+    return poses
+
+def _scalelist_array(scalelist, people_counts, max_people):
+    values = np.ones((len(people_counts), max_people), dtype=np.float64)
+    for f, count in enumerate(people_counts.tolist()):
+        if count:
+            values[f, :count] = scalelist[f][:count]
+    return values[:, :, None]
+
+def scale_pose_sequence(poses, hands_scalelist, body_scalelist, head_scalelist, overall_scalelist):
+    """
+    按缩放列表一次性缩放所有帧所有人物的 body/face/hands
+
+    face 跟随缩放后的头部移动并以其为中心缩放，左右手分别以缩放后的手腕为中心缩放，
+    最后整体以画面中心缩放。
+
+    Returns:
+        PoseSequence: 缩放后的新序列
+    """
+    scaled = poses.copy()
+    P = poses.max_people
+    hands_scale = _scalelist_array(hands_scalelist, poses.people_counts, P)
+    body_scale = _scalelist_array(body_scalelist, poses.people_counts, P)
+    head_scale = _scalelist_array(head_scalelist, poses.people_counts, P)
+    overall_scale = _scalelist_array(overall_scalelist, poses.people_counts, P)
+
+    overall_pivot = np.array([0.5, 0.5])
+    body_len = poses.part_lengths[:, :, 0, None]
+    has_body = body_len > 0
+
+    body = poses.part('pose_keypoints_2d')[..., :2]
+    body_scaled = scale_points(body, body_scale[..., None], overall_pivot)
+    body_scaled = scale_points(body_scaled, overall_scale[..., None], overall_pivot)
+    scaled.part('pose_keypoints_2d')[..., :2] = body_scaled * poses.part_mask('pose_keypoints_2d')[..., None]
+
+    def anchor(index, min_points, default_pivot, factor=1.0):
+        # 返回 (偏移量, 缩放中心)，人物没有对应身体关键点时使用默认值
+        if body.shape[2] <= index:
+            return np.zeros((len(poses), P, 2)), np.broadcast_to(default_pivot, (len(poses), P, 2))
+        valid = has_body & (body_len >= min_points)
+        offset = np.where(valid, (body_scaled[:, :, index] - body[:, :, index]) * factor, 0.0)
+        pivot = np.where(valid, body_scaled[:, :, index], default_pivot)
+        return offset, pivot
+
+    face_offset, face_pivot = anchor(0, 1, np.array([0.5, 0.5]), factor=0.8)
+    lhand_offset, lhand_pivot = anchor(7, 8, np.array([0.25, 0.5]))
+    rhand_offset, rhand_pivot = anchor(4, 5, np.array([0.75, 0.5]))
+
+    for key, offset, pivot, part_scale in (('face_keypoints_2d', face_offset, face_pivot, head_scale),
+                                           ('hand_left_keypoints_2d', lhand_offset, lhand_pivot, hands_scale),
+                                           ('hand_right_keypoints_2d', rhand_offset, rhand_pivot, hands_scale)):
+        points = poses.part(key)[..., :2] + offset[:, :, None]
+        points = scale_points(points, part_scale[..., None], pivot[:, :, None])
+        points = scale_points(points, overall_scale[..., None], overall_pivot)
+        scaled.part(key)[..., :2] = points * poses.part_mask(key)[..., None]
+    return scaled
+
+def draw_pose_frame(poses, img_idx, show_body, show_face, show_hands, pose_marker_size, face_marker_size, hand_marker_size, quality=None):
+    H, W = (canvas_value(v) for v in poses.canvas_sizes[img_idx])
+
+    candidate = []
+    subset = []
+    faces = []
+    hands = []
+    for body, face, lhand, rhand in poses.frame_people(img_idx):
+        if len(body):
+            subset.append(np.where(body[:, 2] > 0, np.arange(len(body)) + len(candidate), -1))
+            candidate.extend(body[:, :2])
+        if len(face):
+            faces.append(face[:, :2])
+        if len(lhand):
+            hands.append(lhand[:, :2])
+        if len(rhand):
+            hands.append(rhand[:, :2])
+
+    bodies = dict(candidate=candidate, subset=subset or [[]])
+    pose = dict(bodies=bodies if show_body else {'candidate':[], 'subset':[]}, faces=faces if show_face else [], hands=hands if show_hands else [])
+
+    return draw_pose(pose, H, W, pose_marker_size, face_marker_size, hand_marker_size, quality)
+
+def draw_pose_json(pose_json, resolution_x, show_body, show_face, show_hands, pose_marker_size, face_marker_size, hand_marker_size, hands_scalelist, body_scalelist, head_scalelist, overall_scalelist, num_workers=1, quality=None, frame_cache=None):
     pose_imgs = []
     pose_scaled = []
 
     if pose_json:
-        if pose_json.startswith('{'):
-            pose_json = '[{}]'.format(pose_json)
-        images = json.loads(pose_json)
-        pbar = ProgressBar(len(images))
-        for img_idx, image in enumerate(images):
-            if 'people' not in image:
-                pbar.update(len(images))
-                return pose_imgs
-            figures = image['people']
-            H = image['canvas_height']
-            W = image['canvas_width']
-
-            bodies = []
-            candidate = []
-            subset = [[]]
-            faces = []
-            hands = []
-
-            openpose_json = []
-            for pose_idx, figure in enumerate(figures):
-                body_scale = body_scalelist[img_idx][pose_idx]
-                hands_scale = hands_scalelist[img_idx][pose_idx]
-                head_scale = head_scalelist[img_idx][pose_idx]
-                overall_scale = overall_scalelist[img_idx][pose_idx]
-                body = []
-                face = []
-                lhand = []
-                rhand = []
-                if 'pose_keypoints_2d' in figure:
-                    body = figure['pose_keypoints_2d']
-                    if body is None:
-                        body = []
-                if 'face_keypoints_2d' in figure:
-                    face = figure['face_keypoints_2d']
-                    if face is None:
-                        face = []
-                if 'hand_left_keypoints_2d' in figure:
-                    lhand = figure['hand_left_keypoints_2d']
-                    if lhand is None:
-                        lhand = []
-                if 'hand_right_keypoints_2d' in figure:
-                    rhand = figure['hand_right_keypoints_2d']
-                    if rhand is None:
-                        rhand = []
-
-                body_scaled = body.copy()
-                face_scaled = face.copy()
-                lhand_scaled = lhand.copy()
-                rhand_scaled = rhand.copy()
-
-                face_offset = [0, 0]
-                lhand_offset = [0, 0]
-                rhand_offset = [0, 0]
-
-                overall_pivot = [0.5, 0.5]
-                lhand_pivot = [0.25, 0.5]
-                rhand_pivot = [0.75, 0.5]
-                face_pivot = [0.5, 0.5]
-
-                if body:
-                    candidate_start_idx = len(candidate)
-
-                    for i in range(0,len(body),3):
-                        p_scaled = scale(body[i:i+2], body_scale, overall_pivot)
-                        p_scaled = scale(p_scaled, overall_scale, overall_pivot)
-                        body_scaled[i:i+2] = p_scaled
-                        candidate.append(p_scaled)
-
-                    figure_head_idx = candidate_start_idx
-                    if figure_head_idx < len(candidate):
-                        factor = 0.8
-                        face_offset = [(candidate[figure_head_idx][0] - body[0])*factor, (candidate[figure_head_idx][1] - body[1])*factor]
-                        face_pivot = candidate[figure_head_idx]
-
-                    wrist_left_idx = candidate_start_idx + 7
-                    wrist_right_idx = candidate_start_idx + 4
-
-                    if wrist_left_idx < len(candidate) and len(body) > 22:
-                        lhand_offset = [candidate[wrist_left_idx][0] - body[21], candidate[wrist_left_idx][1] - body[22]]
-                        lhand_pivot = candidate[wrist_left_idx]
-
-                    if wrist_right_idx < len(candidate) and len(body) > 13:
-                        rhand_offset = [candidate[wrist_right_idx][0] - body[12], candidate[wrist_right_idx][1] - body[13]]
-                        rhand_pivot = candidate[wrist_right_idx]
-
-                    if not subset[0]:
-                        subset[0].extend([candidate_start_idx+(i//3) if body[i+2]>0 else -1 for i in range(0,len(body),3)])
-                    else:
-                        new_subset = [candidate_start_idx+(i//3) if body[i+2]>0 else -1 for i in range(0,len(body),3)]
-                        subset.append(new_subset)
-
-                if face:
-                    f = []
-                    for i in range(0,len(face),3):
-                        p = face[i:i+2]
-                        p_offset = [p[0] + face_offset[0], p[1] + face_offset[1]]
-                        p_scaled = scale(p_offset, head_scale, face_pivot)
-                        p_scaled = scale(p_scaled, overall_scale, overall_pivot)
-                        face_scaled[i:i+2] = p_scaled
-                        f.append(p_scaled)
-                    faces.append(f)
-
-                if lhand:
-                    lh = []
-                    for i in range(0, len(lhand), 3):
-                        p = lhand[i:i+2]
-                        p_offset = [p[0] + lhand_offset[0], p[1] + lhand_offset[1]]
-                        p_scaled = scale(p_offset, hands_scale, lhand_pivot)
-                        p_scaled = scale(p_scaled, overall_scale, overall_pivot)
-                        lhand_scaled[i:i+2] = p_scaled
-                        lh.append(p_scaled)
-                    hands.append(lh)
-
-                if rhand:
-                    rh = []
-                    for i in range(0, len(rhand), 3):
-                        p = rhand[i:i+2]
-                        p_offset = [p[0] + rhand_offset[0], p[1] + rhand_offset[1]]
-                        p_scaled = scale(p_offset, hands_scale, rhand_pivot)
-                        p_scaled = scale(p_scaled, overall_scale, overall_pivot)
-                        rhand_scaled[i:i+2] = p_scaled
-                        rh.append(p_scaled)
-                    hands.append(rh)
-                openpose_json.append(dict(pose_keypoints_2d=body_scaled, face_keypoints_2d=face_scaled, hand_left_keypoints_2d=lhand_scaled, hand_right_keypoints_2d=rhand_scaled))
-
-            bodies = dict(candidate=candidate, subset=subset)
-            pose = dict(bodies=bodies, faces=faces, hands=hands)
-            pose = dict(bodies=bodies if show_body else {'candidate':[], 'subset':[]}, faces=faces if show_face else [], hands=hands if show_hands else [])
-
-            W_scaled = resolution_x
-            if resolution_x < 64:
-                W_scaled = W
-            H_scaled = int(H*(W_scaled*1.0/W))
-            openpose_json = {
-                            'people': openpose_json,
-                            'canvas_height': H_scaled,
-                            'canvas_width': W_scaled,
-                            }
-
-            pose_img = draw_pose(pose, H_scaled, W_scaled, pose_marker_size, face_marker_size, hand_marker_size)
-            pose_imgs.append(pose_img)
-            pose_scaled.append(openpose_json)
-            pbar.update(1)
+        poses = pose_json if isinstance(pose_json, PoseSequence) else PoseSequence.from_json(pose_json)
+        total = len(poses)
+        pbar = ProgressBar(total)
+        # 遇到没有 people 的帧时停止，只绘制它之前的帧
+        num_frames = int(np.argmin(poses.has_people)) if not poses.has_people.all() else len(poses)
+        poses = poses.take(slice(0, num_frames))
+        for f in range(num_frames):
+            if not poses.canvas_sizes[f, 0]:
+                raise KeyError('canvas_height')
+            if not poses.canvas_sizes[f, 1]:
+                raise KeyError('canvas_width')
+
+        scaled = scale_pose_sequence(poses, hands_scalelist, body_scalelist, head_scalelist, overall_scalelist)
+        H, W = poses.canvas_sizes[:, 0], poses.canvas_sizes[:, 1]
+        W_scaled = W if resolution_x < 64 else np.full_like(W, resolution_x)
+        scaled.canvas_sizes = np.stack([np.trunc(H*(W_scaled*1.0/W)), W_scaled], axis=1)
+        draw_args = (show_body, show_face, show_hands, pose_marker_size, face_marker_size, hand_marker_size, quality)
+        frame_hashes = scaled.frame_hashes() if frame_cache is not None else None
+
+        def render(img_idx):
+            # 有帧缓存时按缩放后的单帧内容和绘制参数查找，内容没变的帧直接复用；图层压缩后缓存
+            if frame_hashes is None:
+                return draw_pose_frame(scaled, img_idx, *draw_args)
+            key = ("olo_frame", frame_hashes[img_idx], repr(draw_args))
+            packed = frame_cache.get(key)
+            if packed is None:
+                pose_img = draw_pose_frame(scaled, img_idx, *draw_args)
+                frame_cache.put(key, pack_layer(pose_img))
+                return pose_img
+            return unpack_layer(packed)
+
+        if num_workers is None or num_workers < 1:
+            num_workers = os.cpu_count() or 1
+        num_workers = min(num_workers, num_frames)
+        if num_workers > 1:
+            # 每帧只依赖自己的数据，cv2 绘制时会释放 GIL，按帧分发到线程池；map 保证结果按帧顺序返回
+            executor = ThreadPoolExecutor(max_workers=num_workers)
+            results = executor.map(render, range(num_frames))
+        else:
+            executor = None
+            results = (render(img_idx) for img_idx in range(num_frames))
+
+        try:
+            for pose_img in results:
+                pose_imgs.append(pose_img)
+                pbar.update(1)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        if num_frames < total:
+            pbar.update(total)
+            return pose_imgs
+        pose_scaled = scaled.to_keypoints()
 
     return pose_imgs, pose_scaled
 
-def draw_pose(pose, H, W, pose_marker_size, face_marker_size, hand_marker_size):
+def draw_pose(pose, H, W, pose_marker_size, face_marker_size, hand_marker_size, quality=None):
+    # 超采样 / 草稿模式在内部分辨率上绘制，最后缩放回 H x W
+    quality = get_render_quality(quality)
     bodies = pose['bodies']
     faces = pose['faces']
     hands = pose['hands']
     candidate = bodies['candidate']
     subset = bodies['subset']
-    canvas = np.zeros(shape=(H, W, 3), dtype=np.uint8)
+    canvas = np.zeros(shape=quality.internal_size(H, W) + (3,), dtype=np.uint8)
 
     if len(candidate) > 0:
-        canvas = draw_bodypose(canvas, candidate, subset, pose_marker_size)
+        canvas = draw_bodypose(canvas, candidate, subset, pose_marker_size, quality)
 
     if len(hands) > 0:
-        canvas = draw_handpose(canvas, hands, hand_marker_size)
+        canvas = draw_handpose(canvas, hands, hand_marker_size, quality)
 
     if len(faces) > 0:
-        canvas = draw_facepose(canvas, faces, face_marker_size)
+        canvas = draw_facepose(canvas, faces, face_marker_size, quality)
+
+    return quality.finish(canvas, H, W)
+
+def images_to_tensor(frames, num_frames=None):
+    """
+    将 uint8 图像帧组装成 ComfyUI 的 IMAGE 张量
+
+    第一帧到达时按其尺寸一次性分配 (N, H, W, 3) 的 float32 张量，之后每帧直接换算写入自己的位置，
+    不再产生堆叠数组、float 副本和除法结果等整批大小的中间数组。frames 可以是列表、(N, H, W, 3) 数组或生成器。
+
+    Args:
+        frames: 可迭代的 (H, W, 3) uint8 图像帧
+        num_frames: 帧数，frames 没有长度（生成器）时必须提供
+
+    Returns:
+        torch.Tensor: (N, H, W, 3) 取值 0~1 的 float32 张量
+    """
+    if num_frames is None:
+        num_frames = len(frames)
+    images = None
+    images_np = None
+    for i, frame in enumerate(frames):
+        if images is None:
+            images = torch.empty((num_frames,) + tuple(frame.shape), dtype=torch.float32)
+            images_np = images.numpy()
+        np.divide(frame, np.float32(255), out=images_np[i], dtype=np.float32)
+    if images is None:
+        return torch.zeros((0, 0, 0, 3), dtype=torch.float32)
+    return images
+
+def subset_array(subset, num_joints=18):
+    """
+    把 subset 转换为 (人数, 关节数) 的整数数组
+
+    每个人物的长度可以不同（与原先逐人物处理时一样接受参差不齐的输入），不足 num_joints 或
+    短于最长人物的部分补 -1，视为关节缺失；已经是足够宽的二维数组时直接返回。
+    """
+    if isinstance(subset, np.ndarray) and subset.ndim == 2 and subset.shape[1] >= num_joints:
+        return subset
+    rows = [np.asarray(row).reshape(-1) for row in subset]
+    array = np.full((len(rows), max([num_joints] + [len(row) for row in rows])), -1, dtype=np.int64)
+    for n, row in enumerate(rows):
+        array[n, :len(row)] = row
+    return array
+
+
+def limb_geometry(candidate, subset, W, H, limb_seq=BODY_LIMB_SEQ[:17]):
+    """
+    一次性计算所有人物所有肢体的椭圆参数
+
+    Returns:
+        (肢体序号, 中心点, 半长轴, 角度)，按 肢体 x 人物 的绘制顺序排列，只包含有效肢体；
+        数值保留浮点精度，由 fill_limbs 按绘制质量转换为整数
+    """
+    index = subset_array(subset)[:, limb_seq].transpose(1, 0, 2)  # (limbs, people, 2)
+    valid = ~(index == -1).any(axis=2)
+    limb_ids = np.nonzero(valid)[0]
+    index = index[valid].astype(int)
+    Y = candidate[index, 0] * float(W)
+    X = candidate[index, 1] * float(H)
+    mX = (X[:, 0] + X[:, 1]) / 2
+    mY = (Y[:, 0] + Y[:, 1]) / 2
+    length = ((X[:, 0] - X[:, 1]) ** 2 + (Y[:, 0] - Y[:, 1]) ** 2) ** 0.5
+    angle = np.degrees(np.arctan2(X[:, 0] - X[:, 1], Y[:, 0] - Y[:, 1]))
+    centers = np.stack([mY, mX], axis=1)
+    return limb_ids, centers, length / 2, angle
+
+
+def joint_geometry(candidate, subset, W, H, num_joints=18):
+    """
+    一次性计算所有人物的关节点像素坐标
+
+    Returns:
+        (关节序号, 浮点像素坐标)，按 关节 x 人物 的绘制顺序排列，只包含有效关节
+    """
+    index = subset_array(subset, num_joints)[:, :num_joints].T
+    valid = index != -1
+    joint_ids = np.nonzero(valid)[0]
+    points = candidate[index[valid].astype(int), :2] * np.array([W, H])
+    return joint_ids, points
+
+
+def peaks_geometry(all_peaks, W, H):
+    """将多组归一化关键点一次性转换为浮点像素坐标，返回每组的坐标和有效性掩码（按截断后的整数坐标判断）"""
+    lengths = [len(peaks) for peaks in all_peaks]
+    if not lengths:
+        return []
+    points = np.concatenate([np.reshape(np.asarray(peaks, dtype=np.float64), (-1, 2)) for peaks in all_peaks])
+    points = points * np.array([W, H])
+    valid = (points.astype(int) > eps).all(axis=1)
+    bounds = np.cumsum(lengths)[:-1]
+    return list(zip(np.split(points, bounds), np.split(valid, bounds)))
+
+
+def fill_limbs(canvas, limb_ids, centers, half_lengths, angles, stickwidth, colors, quality=None):
+    quality = get_render_quality(quality)
+    centers = quality.fixed(centers)
+    half_lengths = quality.fixed(half_lengths)
+    stickwidth = int(quality.fixed(stickwidth))
+    for limb, center, half_length, angle in zip(limb_ids.tolist(), centers.tolist(), half_lengths.tolist(), angles.astype(int).tolist()):
+        polygon = cv2.ellipse2Poly(tuple(center), (half_length, stickwidth), angle, 0, 360, 1)
+        cv2.fillConvexPoly(canvas, polygon, colors[limb], lineType=quality.line_type, shift=quality.shift)
+    return canvas
+
 
+def draw_circles(canvas, points, radius, colors, quality=None):
+    quality = get_render_quality(quality)
+    radius = int(quality.fixed(radius))
+    for point, color in zip(quality.fixed(points).tolist(), colors):
+        cv2.circle(canvas, tuple(point), radius, color, thickness=-1, lineType=quality.line_type, shift=quality.shift)
     return canvas
 
-def draw_bodypose(canvas, candidate, subset, pose_marker_size):
+
+def draw_bodypose(canvas, candidate, subset, pose_marker_size, quality=None):
+    quality = get_render_quality(quality)
+    pose_marker_size = quality.size(pose_marker_size)
     H, W, C = canvas.shape
     candidate = np.array(candidate)
-    subset = np.array(subset)
+    subset = subset_array(subset)
 
     # stickwidth = 4
 
-    limbSeq = [[2, 3], [2, 6], [3, 4], [4, 5], [6, 7], [7, 8], [2, 9], [9, 10], \
-               [10, 11], [2, 12], [12, 13], [13, 14], [2, 1], [1, 15], [15, 17], \
-               [1, 16], [16, 18], [3, 17], [6, 18]]
-
-    colors = [[255, 0, 0], [255, 85, 0], [255, 170, 0], [255, 255, 0], [170, 255, 0], [85, 255, 0], [0, 255, 0], \
-              [0, 255, 85], [0, 255, 170], [0, 255, 255], [0, 170, 255], [0, 85, 255], [0, 0, 255], [85, 0, 255], \
-              [170, 0, 255], [255, 0, 255], [255, 0, 170], [255, 0, 85]]
-
-    for i in range(17):
-        for n in range(len(subset)):
-            index = subset[n][np.array(limbSeq[i]) - 1]
-            if -1 in index:
-                continue
-            Y = candidate[index.astype(int), 0] * float(W)
-            X = candidate[index.astype(int), 1] * float(H)
-            mX = np.mean(X)
-            mY = np.mean(Y)
-            length = ((X[0] - X[1]) ** 2 + (Y[0] - Y[1]) ** 2) ** 0.5
-            angle = math.degrees(math.atan2(X[0] - X[1], Y[0] - Y[1]))
-            polygon = cv2.ellipse2Poly((int(mY), int(mX)), (int(length / 2), pose_marker_size), int(angle), 0, 360, 1)
-            cv2.fillConvexPoly(canvas, polygon, colors[i])
+    canvas = fill_limbs(canvas, *limb_geometry(candidate, subset, W, H), pose_marker_size, BODY_COLORS, quality)
 
     canvas = (canvas * 0.6).astype(np.uint8)
 
-    for i in range(18):
-        for n in range(len(subset)):
-            index = int(subset[n][i])
-            if index == -1:
-                continue
-            x, y = candidate[index][0:2]
-            x = int(x * W)
-            y = int(y * H)
-            cv2.circle(canvas, (int(x), int(y)), pose_marker_size, colors[i], thickness=-1)
-
-    return canvas
+    joint_ids, points = joint_geometry(candidate, subset, W, H)
+    return draw_circles(canvas, points, pose_marker_size, [BODY_COLORS[i] for i in joint_ids.tolist()], quality)
 
 
-def draw_handpose(canvas, all_hand_peaks, hand_marker_size):
+def draw_handpose(canvas, all_hand_peaks, hand_marker_size, quality=None):
+    quality = get_render_quality(quality)
     H, W, C = canvas.shape
-
-    edges = [[0, 1], [1, 2], [2, 3], [3, 4], [0, 5], [5, 6], [6, 7], [7, 8], [0, 9], [9, 10], \
-             [10, 11], [11, 12], [0, 13], [13, 14], [14, 15], [15, 16], [0, 17], [17, 18], [18, 19], [19, 20]]
-
-    for peaks in all_hand_peaks:
-        peaks = np.array(peaks)
-
-        for ie, e in enumerate(edges):
-            x1, y1 = peaks[e[0]]
-            x2, y2 = peaks[e[1]]
-            x1 = int(x1 * W)
-            y1 = int(y1 * H)
-            x2 = int(x2 * W)
-            y2 = int(y2 * H)
-            if x1 > eps and y1 > eps and x2 > eps and y2 > eps:
-                cv2.line(canvas, (x1, y1), (x2, y2), matplotlib.colors.hsv_to_rgb([ie / float(len(edges)), 1.0, 1.0]) * 255, thickness=1 if hand_marker_size == 0 else hand_marker_size)
-
-        joint_size=0
-        if hand_marker_size < 2:
-            joint_size = hand_marker_size + 1
-        else:
-            joint_size = hand_marker_size + 2
-        for i, keyponit in enumerate(peaks):
-            x, y = keyponit
-            x = int(x * W)
-            y = int(y * H)
-            if x > eps and y > eps:
-                cv2.circle(canvas, (x, y), joint_size, (0, 0, 255), thickness=-1)
+    thickness = quality.line_width(1 if hand_marker_size == 0 else hand_marker_size)
+
+    joint_size = quality.size(hand_marker_size + 1 if hand_marker_size < 2 else hand_marker_size + 2)
+    for points, valid in peaks_geometry(all_hand_peaks, W, H):
+        edge_valid = valid[HAND_EDGES].all(axis=1)
+        fixed_points = quality.fixed(points)
+        for ie in np.nonzero(edge_valid)[0].tolist():
+            p1, p2 = HAND_EDGES[ie]
+            cv2.line(canvas, tuple(fixed_points[p1].tolist()), tuple(fixed_points[p2].tolist()), HAND_EDGE_COLORS[ie],
+                     thickness=thickness, lineType=quality.line_type, shift=quality.shift)
+        canvas = draw_circles(canvas, points[valid], joint_size, [(0, 0, 255)] * int(valid.sum()), quality)
     return canvas
 
 
-def draw_facepose(canvas, all_lmks, face_marker_size):
+def draw_facepose(canvas, all_lmks, face_marker_size, quality=None):
+    quality = get_render_quality(quality)
+    face_marker_size = quality.size(face_marker_size)
     H, W, C = canvas.shape
-    for lmks in all_lmks:
-        lmks = np.array(lmks)
-        for lmk in lmks:
-            x, y = lmk
-            x = int(x * W)
-            y = int(y * H)
-            if x > eps and y > eps:
-                cv2.circle(canvas, (x, y), face_marker_size, (255, 255, 255), thickness=-1)
-    return canvas
\ No newline at end of file
+    for points, valid in peaks_geometry(all_lmks, W, H):
+        canvas = draw_circles(canvas, points[valid], face_marker_size, [(255, 255, 255)] * int(valid.sum()), quality)
+    return canvas